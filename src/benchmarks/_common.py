@@ -0,0 +1,41 @@
+"""
+Benchmark skriptləri üçün ümumi köməkçilər
+"""
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_env(sqlite: bool = True) -> None:
+    """src-ni path-ə əlavə et və config.py-ın tələb etdiyi dəyişənləri təyin et.
+
+    config import olunmamışdan əvvəl çağırılmalıdır.
+    """
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if sqlite:
+        os.environ.setdefault("FORCE_SQLITE", "1")
+        os.environ.setdefault("SQLITE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="dsmf-bench-"), "bench.db"))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Sadə nearest-rank percentile (values sıralanmamış ola bilər)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def format_latencies(label: str, values_ms: list[float]) -> str:
+    return (
+        f"{label:<28} n={len(values_ms):<6} "
+        f"p50={percentile(values_ms, 50):8.2f}ms  "
+        f"p95={percentile(values_ms, 95):8.2f}ms  "
+        f"p99={percentile(values_ms, 99):8.2f}ms  "
+        f"max={max(values_ms) if values_ms else 0.0:8.2f}ms"
+    )
@@ -0,0 +1,133 @@
+"""
+Sinxron və asinxron DB qatının eyni anda gələn update-lər altında gecikmə müqayisəsi
+
+Hər simulyasiya olunmuş update /start və icraçı axınındakı kimi qara siyahı
+yoxlaması edir, müraciəti ID ilə oxuyur və Telegram sorğusunu (asyncio.sleep)
+imitasiya edir. Eyni zamanda event loop-un gecikməsi (lag) ölçülür: sinxron
+rejimdə hər DB sorğusu bütün digər söhbətləri dayandırır.
+
+Qeyd: lokal SQLite faylında sorğu mikrosaniyələr çəkdiyi üçün aiosqlite-ın thread
+keçidi əsasən overhead kimi görünür; fərq şəbəkə üzərindən PostgreSQL-də (Railway
+proxy) ortaya çıxır.
+
+İstifadə:
+    python src/benchmarks/async_db_latency.py --updates 2000 --concurrency 200
+    DATABASE_URL=postgresql://... python src/benchmarks/async_db_latency.py --backend postgres
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from _common import format_latencies, setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--updates", type=int, default=2000, help="ümumi update sayı")
+    parser.add_argument("--concurrency", type=int, default=200, help="eyni anda işlənən update sayı")
+    parser.add_argument("--seed", type=int, default=200, help="əvvəlcədən yazılan müraciət sayı")
+    parser.add_argument("--telegram-ms", type=float, default=20.0, help="imitasiya olunan Telegram API gecikməsi")
+    return parser.parse_args()
+
+
+def _load_backend(backend: str, seed: int):
+    """Sinxron və asinxron funksiya cütlərini qaytar, test məlumatı yaz"""
+    import db_async
+    from config import BAKU_TZ
+
+    now = datetime.now(BAKU_TZ)
+    if backend == "sqlite":
+        from db_sqlite import (
+            init_sqlite_db,
+            save_application_sqlite,
+            get_application_by_id_sqlite,
+            is_user_blacklisted_sqlite,
+        )
+        init_sqlite_db()
+        ids = [
+            save_application_sqlite(
+                user_telegram_id=1000 + i % 50, user_username="bench", fullname="Test Test",
+                phone="+994501234567", fin="ABC1234", id_photo_file_id="", form_type="Şikayət",
+                subject="bench", body="benchmark müraciəti", created_at=now,
+            )["id"]
+            for i in range(seed)
+        ]
+        sync_ops = (get_application_by_id_sqlite, is_user_blacklisted_sqlite)
+        async_ops = (db_async.get_application_by_id_sqlite, db_async.is_user_blacklisted_sqlite)
+    else:
+        from db_operations import init_db, save_application, get_application_by_id, is_user_blacklisted
+        init_db()
+        ids = [
+            save_application(
+                user_telegram_id=1000 + i % 50, user_username="bench", fullname="Test Test",
+                phone="+994501234567", fin="ABC1234", form_type="Şikayət",
+                body="benchmark müraciəti", created_at=now,
+            ).id
+            for i in range(seed)
+        ]
+        sync_ops = (get_application_by_id, is_user_blacklisted)
+        async_ops = (db_async.get_application_by_id, db_async.is_user_blacklisted)
+    return ids, sync_ops, async_ops, db_async
+
+
+async def _run(mode: str, ids, ops, updates: int, concurrency: int, telegram_s: float):
+    get_app, is_blacklisted = ops
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    lags: list[float] = []
+    running = True
+
+    async def monitor():
+        # 1ms-lik yuxu nə qədər gecikirsə, loop o qədər bloklanıb
+        while running:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - t0 - 0.001) * 1000)
+
+    async def one_update(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            uid = 1000 + i % 50
+            app_id = ids[i % len(ids)]
+            if mode == "sync":
+                is_blacklisted(uid)
+                get_app(app_id)
+            else:
+                await is_blacklisted(uid)
+                await get_app(app_id)
+            await asyncio.sleep(telegram_s)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    mon = asyncio.create_task(monitor())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_update(i) for i in range(updates)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await mon
+    return latencies, lags, elapsed
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=args.backend == "sqlite")
+    ids, sync_ops, async_ops, db_async = _load_backend(args.backend, args.seed)
+
+    async def both():
+        results = {}
+        for mode, ops in (("sync", sync_ops), ("async", async_ops)):
+            results[mode] = await _run(mode, ids, ops, args.updates, args.concurrency, args.telegram_ms / 1000)
+        await db_async.dispose_async_engines()
+        return results
+
+    results = asyncio.run(both())
+    print(f"backend={args.backend} updates={args.updates} concurrency={args.concurrency} telegram={args.telegram_ms}ms")
+    for mode, (latencies, lags, elapsed) in results.items():
+        print(format_latencies(f"[{mode}] update latency", latencies))
+        print(format_latencies(f"[{mode}] event loop lag", lags))
+        print(f"[{mode}] throughput: {args.updates / elapsed:.1f} update/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+/export formatlarının ölçü və vaxt müqayisəsi (csv, csv.gz, parquet)
+
+SQLite-a test müraciətləri yazılır, sonra hər format eyni axın (iter_applications)
+üzərindən export olunur. Telegram-a yükləmə vaxtı verilən uplink sürəti ilə
+təxmin edilir.
+
+İstifadə:
+    python src/benchmarks/export_formats.py --rows 100000
+"""
+import argparse
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from _common import setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="test müraciətlərinin sayı")
+    parser.add_argument("--uplink-mbps", type=float, default=10.0, help="Telegram-a yükləmə sürəti (Mbit/s)")
+    return parser.parse_args()
+
+
+def _seed(rows: int) -> None:
+    import db_sqlite
+    from config import BAKU_TZ
+
+    db_sqlite.init_sqlite_db()
+    now = datetime.now(BAKU_TZ)
+    forms = ("Şikayət", "Təklif", "Ərizə")
+    statuses = ("completed", "pending", "rejected")
+
+    def row(i: int):
+        ts = (now - timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+        body = f"Müraciət №{i}: ünvan, təfərrüatlar və xahiş mətni. " * 3
+        return (
+            1000 + i % 5000, "bench", "Ad Soyad Ata", f"+99450{i % 10_000_000:07d}", "ABC1234", "",
+            forms[i % 3], "", body, statuses[i % 3], ts, ts,
+        )
+
+    with sqlite3.connect(db_sqlite.SQLITE_DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO applications (user_telegram_id, user_username, fullname, phone, fin, id_photo_file_id, "
+            "form_type, subject, body, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            (row(i) for i in range(rows)),
+        )
+
+
+async def _measure(fmt: str):
+    import exporter
+    from repository import create_repository
+
+    repo = create_repository(use_sqlite=True)
+    started = time.perf_counter()
+    size = parts = rows = 0
+    async for part, count in exporter.export_parts(repo.iter_applications(), fmt):
+        with part:
+            part.seek(0, 2)
+            size += part.tell()
+        parts += 1
+        rows += count
+    return rows, parts, size, time.perf_counter() - started
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=True)
+    _seed(args.rows)
+
+    import db_async
+    import exporter
+
+    async def run_all():
+        results = {}
+        for fmt in exporter.EXPORT_FORMATS:
+            if not exporter.format_available(fmt):
+                print(f"[{fmt}] atlandı: pyarrow quraşdırılmayıb")
+                continue
+            results[fmt] = await _measure(fmt)
+        await db_async.dispose_async_engines()
+        return results
+
+    results = asyncio.run(run_all())
+    baseline = results.get("csv", (0, 0, 0, 0))[2] or 1
+    print(f"rows={args.rows} uplink={args.uplink_mbps}Mbit/s")
+    for fmt, (rows, parts, size, elapsed) in results.items():
+        upload_s = size * 8 / (args.uplink_mbps * 1_000_000)
+        print(
+            f"[{fmt:<7}] {size / 1e6:8.2f} MB ({size / baseline:6.1%} of csv)  parts={parts}  "
+            f"export={elapsed:6.2f}s  upload≈{upload_s:6.2f}s  rows={rows}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Hot sorğular üçün composite/partial index-lərin təsiri: EXPLAIN planları və vaxtlar
+
+Milyonlarla test müraciəti yazılır, sonra üç sorğu (count_user_rejections,
+count_user_recent_applications, get_overdue_applications) əvvəl yalnız köhnə
+tək sütunlu index-lərlə, sonra migrations/add_composite_indexes ilə ölçülür.
+Hesabat (planlar + p50/p95) `--out` faylına da yazılır.
+
+Məlumat paylanması real botu təqlid edir: müraciətlərin çoxu bağlıdır, açıq
+olanlar əsasən son günlərdədir, SLA aşan müraciət azdır.
+
+İstifadə:
+    python src/benchmarks/index_plans.py --rows 2000000
+    DATABASE_URL=postgresql://... python src/benchmarks/index_plans.py --backend postgres --rows 5000000
+PostgreSQL-də hər şey ayrıca `dsmf_bench` sxemində yaradılır və sonda silinir.
+"""
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from _common import format_latencies, setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="test müraciətlərinin sayı")
+    parser.add_argument("--users", type=int, default=200_000, help="fərqli istifadəçi sayı")
+    parser.add_argument("--repeat", type=int, default=200, help="hər sorğunun təkrar sayı")
+    parser.add_argument("--out", default="index_plans_report.txt", help="hesabat faylı")
+    parser.add_argument("--keep", action="store_true", help="PostgreSQL bench sxemini silmə")
+    return parser.parse_args()
+
+
+class SqliteBench:
+    name = "sqlite"
+
+    def __init__(self, args):
+        import db_sqlite
+        from migrations import add_composite_indexes as mig
+
+        self.mig = mig
+        db_sqlite.init_sqlite_db()
+        self.conn = sqlite3.connect(db_sqlite.SQLITE_DB_PATH)
+        self.drop_indexes()
+        self.now = datetime.now()
+        self.queries = {
+            "count_user_rejections": (
+                "SELECT COUNT(*) FROM applications "
+                "WHERE user_telegram_id=? AND status='rejected' AND created_at >= ?",
+                lambda uid: (uid, self._ts(self.now - timedelta(days=30))),
+            ),
+            "count_user_recent_applications": (
+                "SELECT COUNT(*) FROM applications WHERE user_telegram_id=? AND created_at >= ?",
+                lambda uid: (uid, self._ts(self.now - timedelta(hours=24))),
+            ),
+            "get_overdue_applications": (
+                f"SELECT * FROM applications WHERE {mig.OPEN_STATUS_PREDICATE_SQLITE} "
+                "AND created_at <= ? ORDER BY created_at",
+                lambda uid: (self._ts(self.now - timedelta(days=3)),),
+            ),
+        }
+
+    @staticmethod
+    def _ts(dt: datetime) -> str:
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    def seed(self, rows: int, users: int) -> None:
+        def gen():
+            for g in range(1, rows + 1):
+                created = self.now - timedelta(seconds=(g * 7919) % (730 * 86400))
+                if g % 10_000 == 0 or created > self.now - timedelta(days=5):
+                    status = "pending"
+                else:
+                    status = "rejected" if g % 7 == 0 else "completed"
+                ts = self._ts(created)
+                yield (1000 + g % users, "bench", "Ad Soyad", "+994501234567", "ABC1234", "",
+                       "Şikayət", "", "benchmark", status, ts, ts)
+        self.conn.executemany(
+            "INSERT INTO applications (user_telegram_id, user_username, fullname, phone, fin, id_photo_file_id, "
+            "form_type, subject, body, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            gen(),
+        )
+        self.conn.commit()
+        self.conn.execute("ANALYZE")
+
+    def drop_indexes(self) -> None:
+        for name, _, _ in self.mig.SQLITE_INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def create_indexes(self) -> None:
+        self.mig.create_sqlite_indexes(self.conn)
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+
+    def explain(self, sql: str, params) -> str:
+        rows = self.conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return "\n".join(f"  {r[-1]}" for r in rows)
+
+    def run(self, sql: str, params) -> None:
+        self.conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class PostgresBench:
+    name = "postgres"
+
+    def __init__(self, args):
+        from sqlalchemy import create_engine, text
+        from database import Base
+        from db_operations import DATABASE_URL
+        from migrations import add_composite_indexes as mig
+
+        self.text = text
+        self.mig = mig
+        self.keep = args.keep
+        # Bütün connection-lar (migration-ın açdıqları da) bench sxemində işləyir
+        self.engine = create_engine(DATABASE_URL, echo=False, connect_args={"options": "-csearch_path=dsmf_bench"})
+        self.conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        self.conn.execute(text("DROP SCHEMA IF EXISTS dsmf_bench CASCADE"))
+        self.conn.execute(text("CREATE SCHEMA dsmf_bench"))
+        Base.metadata.create_all(self.conn)
+        self.drop_indexes()
+        self.queries = {
+            "count_user_rejections": (
+                "SELECT COUNT(*) FROM applications WHERE user_telegram_id = :uid "
+                "AND status = 'REJECTED' AND created_at >= now()::timestamp - interval '30 days'",
+                lambda uid: {"uid": uid},
+            ),
+            "count_user_recent_applications": (
+                "SELECT COUNT(*) FROM applications WHERE user_telegram_id = :uid "
+                "AND created_at >= now()::timestamp - interval '24 hours'",
+                lambda uid: {"uid": uid},
+            ),
+            "get_overdue_applications": (
+                f"SELECT * FROM applications WHERE {mig.OPEN_STATUS_PREDICATE_PG} "
+                "AND created_at <= now()::timestamp - interval '3 days' ORDER BY created_at",
+                lambda uid: {},
+            ),
+        }
+
+    def seed(self, rows: int, users: int) -> None:
+        # Sətirlər server tərəfində generate_series ilə yaradılır
+        self.conn.execute(self.text("""
+            INSERT INTO applications (user_telegram_id, user_username, fullname, phone, fin, form_type,
+                                      body, status, created_at, updated_at)
+            SELECT 1000 + g % :users, 'bench', 'Ad Soyad', '+994501234567', 'ABC1234', 'COMPLAINT', 'benchmark',
+                   (CASE WHEN g % 10000 = 0 OR ts > now()::timestamp - interval '5 days' THEN 'PENDING'
+                         WHEN g % 7 = 0 THEN 'REJECTED' ELSE 'COMPLETED' END)::applicationstatus,
+                   ts, ts
+            FROM (SELECT g, now()::timestamp - ((g * 7919) % (730 * 86400)) * interval '1 second' AS ts
+                  FROM generate_series(1, :rows) g) s
+        """), {"rows": rows, "users": users})
+        self.conn.execute(self.text("ANALYZE applications"))
+
+    def drop_indexes(self) -> None:
+        for name, _, _ in self.mig.PG_INDEXES:
+            self.conn.execute(self.text(f"DROP INDEX IF EXISTS {name}"))
+
+    def create_indexes(self) -> None:
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            self.mig.create_pg_indexes(conn)
+        self.conn.execute(self.text("ANALYZE applications"))
+
+    def explain(self, sql: str, params) -> str:
+        rows = self.conn.execute(self.text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).fetchall()
+        return "\n".join(f"  {r[0]}" for r in rows)
+
+    def run(self, sql: str, params) -> None:
+        self.conn.execute(self.text(sql), params).fetchall()
+
+    def close(self) -> None:
+        if not self.keep:
+            self.conn.execute(self.text("DROP SCHEMA IF EXISTS dsmf_bench CASCADE"))
+        self.conn.close()
+        self.engine.dispose()
+
+
+def _measure(bench, label: str, repeat: int, users: int, report: list[str]) -> dict[str, list[float]]:
+    rng = random.Random(42)
+    timings: dict[str, list[float]] = {}
+    report.append(f"===== {label} =====")
+    for name, (sql, params_for) in bench.queries.items():
+        report.append(f"-- {name}\n{bench.explain(sql, params_for(1000 + rng.randrange(users)))}")
+        values = []
+        for _ in range(repeat):
+            params = params_for(1000 + rng.randrange(users))
+            t0 = time.perf_counter()
+            bench.run(sql, params)
+            values.append((time.perf_counter() - t0) * 1000)
+        timings[name] = values
+        report.append(format_latencies(name, values))
+    return timings
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=args.backend == "sqlite")
+    bench = SqliteBench(args) if args.backend == "sqlite" else PostgresBench(args)
+    report = [f"backend={bench.name} rows={args.rows} users={args.users} repeat={args.repeat}"]
+    try:
+        t0 = time.perf_counter()
+        bench.seed(args.rows, args.users)
+        report.append(f"seed: {time.perf_counter() - t0:.1f}s")
+        _measure(bench, "əvvəl (tək sütunlu index-lər)", args.repeat, args.users, report)
+        t0 = time.perf_counter()
+        bench.create_indexes()
+        report.append(f"index yaradılması: {time.perf_counter() - t0:.1f}s")
+        _measure(bench, "sonra (composite + partial index-lər)", args.repeat, args.users, report)
+    finally:
+        bench.close()
+    text = "\n".join(report)
+    print(text)
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
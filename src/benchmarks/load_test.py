@@ -0,0 +1,378 @@
+"""
+Yük testi - sintetik vətəndaş və icraçı söhbətlərini real `build_app()` üzərində işlət
+
+Şəbəkə yoxdur: Bot API saxta backend-dir (`FakeBotRequest`, istəyə görə gecikmə ilə),
+update-lər birbaşa `Application.process_update`-ə verilir. Ssenarilər:
+- `intake` - hər vətəndaş /start → FULLNAME → ... → CONFIRM (9 update), eyni anda `--concurrency`;
+- `reply` / `reject` - icraçı qrupda düyməni basır və DM-də cavab / imtina səbəbi yazır (2 update).
+
+Hər ssenari üçün: throughput, update gecikməsi (p50/p95/p99), söhbət başına SQL
+sorğuları (SQLAlchemy `before_cursor_execute`), `db_async` əməliyyatları və Bot API
+çağırışları. Nəticə JSON kimi saxlanıla və sonrakı ölçmələrlə müqayisə oluna bilər.
+
+İstifadə:
+    python src/benchmarks/load_test.py --citizens 2000 --concurrency 200 --save-baseline baseline.json
+    python src/benchmarks/load_test.py --citizens 2000 --concurrency 200 --baseline baseline.json
+    # PostgreSQL (lokal, məs. docker run -p 5432:5432 -e POSTGRES_PASSWORD=x postgres:16):
+    DATABASE_URL=postgresql://postgres:x@localhost:5432/postgres \\
+        python src/benchmarks/load_test.py --backend postgres
+
+Çıxan mesaj limitləri (OUTBOUND_*) default olaraq qaldırılır ki, öz kodumuz ölçülsün;
+Telegram limitləri ilə ölçmək üçün `--real-limits`.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from _common import format_latencies, percentile, setup_env
+
+EXECUTOR_CHAT_ID = -100_555_000
+CITIZEN_BASE = 7_000_000
+EXECUTOR_BASE = 8_000_000
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--citizens", type=int, default=1000, help="anketi tamamlayan vətəndaşların sayı")
+    parser.add_argument("--executors", type=int, default=20, help="paralel cavab verən icraçıların sayı")
+    parser.add_argument("--answers", type=int, default=None, help="cavablanan müraciətlər (default: hamısı)")
+    parser.add_argument("--concurrency", type=int, default=200, help="eyni anda gedən söhbətlər")
+    parser.add_argument("--telegram-ms", type=float, default=0.0, help="saxta Bot API cavabının gecikməsi")
+    parser.add_argument("--real-limits", action="store_true", help="OUTBOUND_* limitlərini dəyişmə")
+    parser.add_argument("--save-baseline", metavar="FILE", help="nəticəni JSON kimi yaz")
+    parser.add_argument("--baseline", metavar="FILE", help="nəticəni bu JSON ilə müqayisə et")
+    return parser.parse_args()
+
+
+def _setup(args) -> None:
+    """config import olunmamışdan əvvəl mühit dəyişənləri"""
+    setup_env(sqlite=args.backend == "sqlite")
+    os.environ.setdefault("EXECUTOR_CHAT_ID", str(EXECUTOR_CHAT_ID))
+    os.environ.setdefault("PERSISTENCE_PATH", os.path.join(tempfile.mkdtemp(prefix="dsmf-load-"), "state.db"))
+    if not args.real_limits:
+        for name in ("OUTBOUND_GLOBAL_PER_SECOND", "OUTBOUND_CHAT_PER_SECOND", "OUTBOUND_GROUP_PER_MINUTE"):
+            os.environ.setdefault(name, "1000000")
+
+
+# ================== Saxta Bot API ==================
+
+def _fake_request_class():
+    from telegram.request import BaseRequest
+
+    class FakeBotRequest(BaseRequest):
+        """Bot API cavablarını yerində qurur; metod sayları `calls`-da"""
+
+        def __init__(self, delay: float) -> None:
+            self.delay = delay
+            self.calls: Counter = Counter()
+            self._ids = itertools.count(1)
+
+        async def initialize(self) -> None:
+            pass
+
+        async def shutdown(self) -> None:
+            pass
+
+        async def do_request(self, url, method, request_data=None, *args, **kwargs):
+            api_method = url.rsplit("/", 1)[-1]
+            self.calls[api_method] += 1
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            params = request_data.parameters if request_data else {}
+            if api_method == "getMe":
+                result = {"id": 1, "is_bot": True, "first_name": "DSMF", "username": "dsmf_load_bot"}
+            elif api_method.startswith(("send", "edit")):
+                chat_id = int(params.get("chat_id") or 1)
+                result = {
+                    "message_id": next(self._ids),
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+                    "text": str(params.get("text") or params.get("caption") or ""),
+                }
+            else:
+                result = True
+            return 200, json.dumps({"ok": True, "result": result}).encode()
+
+    return FakeBotRequest
+
+
+# ================== Update-lər ==================
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+
+def _user(uid: int) -> dict:
+    return {"id": uid, "is_bot": False, "first_name": "Test", "username": f"u{uid}"}
+
+
+def _message(uid: int, text=None, photo=False, chat_id=None) -> dict:
+    chat_id = chat_id or uid
+    msg = {
+        "message_id": next(_message_ids),
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+        "from": _user(uid),
+    }
+    if text is not None:
+        msg["text"] = text
+        if text.startswith("/"):
+            msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    if photo:
+        msg["photo"] = [{"file_id": f"PHOTO{uid}", "file_unique_id": f"p{uid}", "width": 640, "height": 480}]
+    return {"update_id": next(_update_ids), "message": msg}
+
+
+def _callback(uid: int, data: str, chat_id=None, caption=None) -> dict:
+    msg = _message(uid, chat_id=chat_id)["message"]
+    if caption is not None:
+        msg["caption"] = caption
+        msg["photo"] = [{"file_id": "PHOTO", "file_unique_id": "p", "width": 640, "height": 480}]
+    return {
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_message_ids)), "chat_instance": "load", "data": data, "from": _user(uid), "message": msg,
+        },
+    }
+
+
+def _intake(uid: int) -> list[dict]:
+    return [
+        _message(uid, "/start"),
+        _message(uid, "Məmmədov Əli Vəli"),
+        _message(uid, "+994501234567"),
+        _callback(uid, "id_type_id"),
+        _message(uid, "ABC1234"),
+        _message(uid, photo=True),
+        _callback(uid, "type_complaint"),
+        _message(uid, "Yük testi üçün sintetik şikayət mətni, kifayət qədər uzun"),
+        _callback(uid, "confirm"),
+    ]
+
+
+def _answer(executor: int, app_id: int, reject: bool) -> list[dict]:
+    caption = f"Sıra №: {app_id}\n🟡 Status: Gözləyir"
+    action = "exec_reject" if reject else "exec_reply"
+    text = "Sənədlər natamamdır" if reject else "Müraciətiniz araşdırıldı, cavab belədir"
+    return [_callback(executor, f"{action}:{app_id}", chat_id=EXECUTOR_CHAT_ID, caption=caption),
+            _message(executor, text)]
+
+
+# ================== Ölçmə ==================
+
+class Scenario:
+    """Bir ssenarinin update gecikmələri və sayğacları"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies_ms: list[float] = []
+        self.conversations = 0
+        self.elapsed = 0.0
+        self.sql = 0
+        self.db_ops = 0
+        self.api_calls: Counter = Counter()
+
+    def result(self) -> dict:
+        n = max(self.conversations, 1)
+        return {
+            "conversations": self.conversations,
+            "updates": len(self.latencies_ms),
+            "throughput_per_s": round(self.conversations / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 3),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 3),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 3),
+            "max_ms": round(max(self.latencies_ms, default=0.0), 3),
+            "sql_per_conversation": round(self.sql / n, 2),
+            "db_ops_per_conversation": round(self.db_ops / n, 2),
+            "api_calls_per_conversation": round(sum(self.api_calls.values()) / n, 2),
+        }
+
+
+class SqlCounter:
+    """Bütün engine-lərdə icra olunan SQL ifadələrinin sayı"""
+
+    def __init__(self) -> None:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        self.count = 0
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def _db_ops() -> int:
+    import metrics
+
+    return sum(m.count for m in metrics.snapshot("db_seconds") if m.name == "db_seconds")
+
+
+async def _drain(app) -> None:
+    """Fonda gedən icraçı bildirişləri və çıxan mesaj növbəsi bitsin"""
+    while True:
+        pending = [t for t in asyncio.all_tasks() if t.get_name() == "executor-dispatch" and not t.done()]
+        if not pending and not len(app.bot_data["sender"]):
+            return
+        await asyncio.sleep(0.01)
+
+
+async def _run(app, scenario: Scenario, conversations: list[list[dict]], concurrency: int,
+               sql: SqlCounter, fake) -> None:
+    from telegram import Update
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def converse(updates: list[dict]) -> None:
+        async with sem:
+            for data in updates:
+                update = Update.de_json(data, app.bot)
+                started = time.perf_counter()
+                await app.process_update(update)
+                scenario.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    sql_before, ops_before, calls_before = sql.count, _db_ops(), fake.calls.copy()
+    started = time.perf_counter()
+    await asyncio.gather(*(converse(c) for c in conversations))
+    await _drain(app)
+    scenario.elapsed = time.perf_counter() - started
+    scenario.conversations = len(conversations)
+    scenario.sql = sql.count - sql_before
+    scenario.db_ops = _db_ops() - ops_before
+    scenario.api_calls = fake.calls - calls_before
+
+
+async def _pending_ids(repo, citizens: int) -> list[int]:
+    """Bu testdə yaranan müraciətlər (PostgreSQL-də cədvəldə başqa sətirlər də ola bilər)"""
+    from database import ApplicationStatus
+
+    lo, hi = CITIZEN_BASE, CITIZEN_BASE + citizens
+    return [
+        rec.id async for rec in repo.iter_applications()
+        if lo <= rec.user_telegram_id < hi and rec.status == ApplicationStatus.PENDING
+    ]
+
+
+async def _main(args) -> dict:
+    import bot
+    import db_async
+    from repository import create_repository
+
+    if args.backend == "sqlite":
+        from db_sqlite import init_sqlite_db
+        init_sqlite_db()
+    else:
+        from db_operations import init_db
+        init_db()
+    sql = SqlCounter()
+    fake = _fake_request_class()(args.telegram_ms / 1000)
+    app = bot.build_app(request=fake)
+    app.bot_data["repo"] = create_repository(use_sqlite=args.backend == "sqlite")
+    scenarios = [Scenario("intake"), Scenario("reply"), Scenario("reject")]
+    # webserver.run_webhook-dakı ardıcıllıq: initialize -> post_init -> start ... stop -> shutdown -> post_shutdown
+    async with app:
+        await app.post_init(app)
+        # Keşlər fonda yüklənir; ölçmə isti vəziyyətdən başlasın
+        await app.bot_data["cache_warmup"]
+        await app.start()
+        intake, reply, reject = scenarios
+        await _run(app, intake, [_intake(CITIZEN_BASE + i) for i in range(args.citizens)],
+                   args.concurrency, sql, fake)
+
+        ids = await _pending_ids(app.bot_data["repo"], args.citizens)
+        if args.answers is not None:
+            ids = ids[:args.answers]
+        # İcraçılar növbə ilə: hər icraçının söhbəti ardıcıldır, icraçılar paralel
+        half = len(ids) // 2
+        for scenario, chunk, is_reject in ((reply, ids[:half], False), (reject, ids[half:], True)):
+            conversations = [_answer(EXECUTOR_BASE + i % args.executors, app_id, is_reject)
+                             for i, app_id in enumerate(chunk)]
+            lanes = [list(itertools.chain.from_iterable(conversations[i::args.executors]))
+                     for i in range(args.executors)]
+            await _run(app, scenario, [lane for lane in lanes if lane], args.executors, sql, fake)
+            scenario.conversations = len(conversations)
+        await app.stop()
+    await app.post_shutdown(app)
+    await db_async.dispose_async_engines()
+    return {
+        "meta": {
+            "backend": args.backend,
+            "citizens": args.citizens,
+            "executors": args.executors,
+            "concurrency": args.concurrency,
+            "telegram_ms": args.telegram_ms,
+            "real_limits": args.real_limits,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {s.name: s.result() for s in scenarios},
+        "_latencies": {s.name: s.latencies_ms for s in scenarios},
+    }
+
+
+# ================== Hesabat ==================
+
+# Müqayisədə "daha yaxşı" istiqaməti: +1 böyük yaxşıdır, -1 kiçik
+# Gecikmələr qaçışdan qaçışa ~10% dəyişir - NOISE_PCT-dən kiçik fərqlər "=" göstərilir
+NOISE_PCT = 5.0
+_COMPARED = (
+    ("throughput_per_s", +1),
+    ("p50_ms", -1),
+    ("p95_ms", -1),
+    ("p99_ms", -1),
+    ("sql_per_conversation", -1),
+    ("api_calls_per_conversation", -1),
+)
+
+
+def _report(result: dict) -> None:
+    meta = result["meta"]
+    print(f"backend={meta['backend']} citizens={meta['citizens']} executors={meta['executors']} "
+          f"concurrency={meta['concurrency']} telegram_ms={meta['telegram_ms']}")
+    for name, stats in result["scenarios"].items():
+        print(format_latencies(f"{name} (update)", result["_latencies"][name]))
+        print(f"  {stats['conversations']} söhbət, {stats['throughput_per_s']:.1f} söhbət/s, "
+              f"SQL/söhbət {stats['sql_per_conversation']}, db_async/söhbət {stats['db_ops_per_conversation']}, "
+              f"Bot API/söhbət {stats['api_calls_per_conversation']}")
+
+
+def _compare(result: dict, baseline: dict) -> None:
+    base_meta = baseline.get("meta", {})
+    print(f"\nBaseline ilə müqayisə ({base_meta.get('created_at', '?')}, backend={base_meta.get('backend', '?')}):")
+    for name, stats in result["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        parts = []
+        for key, direction in _COMPARED:
+            before, after = old.get(key), stats.get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            mark = "✅" if change * direction > NOISE_PCT else "⚠️" if change * direction < -NOISE_PCT else "="
+            parts.append(f"{key} {before:g}→{after:g} ({change:+.1f}% {mark})")
+        print(f"  {name}: " + "; ".join(parts))
+
+
+def main():
+    args = _parse_args()
+    _setup(args)
+    result = asyncio.run(_main(args))
+    _report(result)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            _compare(result, json.load(f))
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in result.items() if not k.startswith("_")}, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline yazıldı: {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    main()
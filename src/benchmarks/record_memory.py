@@ -0,0 +1,177 @@
+"""
+Yarımçıq anket (ApplicationData) və müraciət sətirlərinin (ApplicationRecord) yaddaş ölçüsü
+
+Köhnə forma (adi dataclass, `SELECT *` -> `dict(row)` -> record) ilə indiki forma
+(slots, sütunlar birbaşa record-a) müqayisə olunur: obyekt başına saxlanılan bayt
+(tracemalloc) və N sətrin oxunma vaxtı.
+
+İstifadə:
+    python src/benchmarks/record_memory.py --users 20000 --rows 100000
+"""
+import argparse
+import asyncio
+import dataclasses
+import sqlite3
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from _common import setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20_000, help="yarımçıq anketlərin sayı")
+    parser.add_argument("--rows", type=int, default=100_000, help="test müraciətlərinin sayı")
+    return parser.parse_args()
+
+
+def _legacy(cls, **kwargs):
+    """Eyni sahələrlə slots-suz dataclass (dəyişiklikdən əvvəlki forma)"""
+    return dataclasses.make_dataclass(
+        f"Legacy{cls.__name__}",
+        [(f.name, f.type, dataclasses.field(default=f.default)) for f in dataclasses.fields(cls)],
+        **kwargs,
+    )
+
+
+def _retained(build) -> tuple[int, list]:
+    """`build()` nəticəsinin saxladığı bayt (nəticə qaytarılır ki, ölçü zamanı silinməsin)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, objs
+
+
+def _conversations(users: int) -> None:
+    from bot import ApplicationData, FormType
+
+    legacy_cls = _legacy(ApplicationData)
+    now = datetime.now()
+
+    def fill(cls):
+        def build():
+            objs = []
+            for i in range(users):
+                app = cls()
+                app.fullname = f"Ad Soyad {i}"
+                app.phone = "+994501234567"
+                app.id_type = "ID"
+                app.code = app.fin = "ABC1234"
+                app.form_type = FormType.COMPLAINT
+                app.timestamp = now
+                app.user_telegram_id = 1000 + i
+                objs.append(app)
+            return objs
+        return build
+
+    print(f"Yarımçıq anketlər (n={users}):")
+    for label, cls in (("dataclass", legacy_cls), ("dataclass(slots=True)", ApplicationData)):
+        size, _ = _retained(fill(cls))
+        print(f"  {label:<24} {size / users:8.0f} B/anket")
+
+
+def _seed(rows: int) -> None:
+    import db_sqlite
+    from config import BAKU_TZ
+
+    db_sqlite.init_sqlite_db()
+    now = datetime.now(BAKU_TZ)
+    forms = ("Şikayət", "Təklif", "Ərizə")
+    statuses = ("completed", "pending", "rejected")
+
+    def row(i: int):
+        ts = (now - timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+        return (
+            1000 + i % 5000, "bench", "Ad Soyad Ata", f"+99450{i % 10_000_000:07d}", "ABC1234", "",
+            forms[i % 3], "", f"Müraciət №{i}", statuses[i % 3], ts, ts,
+        )
+
+    with sqlite3.connect(db_sqlite.SQLITE_DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO applications (user_telegram_id, user_username, fullname, phone, fin, id_photo_file_id, "
+            "form_type, subject, body, status, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            (row(i) for i in range(rows)),
+        )
+
+
+async def _legacy_records(legacy_cls) -> list:
+    """Köhnə yol: `SELECT *` -> dict(row) -> açar sözlərlə record"""
+    import db_async
+    from database import ApplicationStatus
+    from repository import _SQLITE_STATUS_REVERSE
+
+    records = []
+    async with db_async.get_sqlite_async_engine().connect() as conn:
+        result = await conn.stream(db_async.text("SELECT * FROM applications ORDER BY id"))
+        async for mapping in result.mappings():
+            row = dict(mapping)
+            records.append(legacy_cls(
+                id=row["id"],
+                user_telegram_id=row["user_telegram_id"],
+                user_username=row.get("user_username"),
+                fullname=row.get("fullname") or "",
+                phone=row.get("phone") or "",
+                fin=row.get("fin") or "",
+                form_type=db_async.form_type_to_db(row.get("form_type")),
+                body=row.get("body") or "",
+                status=_SQLITE_STATUS_REVERSE.get(row.get("status") or "", ApplicationStatus.PENDING),
+                notes=row.get("notes"),
+                reply_text=row.get("reply_text"),
+                created_at=db_async.parse_sqlite_dt(row.get("created_at")),
+                updated_at=db_async.parse_sqlite_dt(row.get("updated_at") or row.get("created_at")),
+                id_photo_file_id=row.get("id_photo_file_id") or None,
+            ))
+    return records
+
+
+async def _current_records() -> list:
+    from repository import create_repository
+
+    return [rec async for rec in create_repository(use_sqlite=True).iter_applications()]
+
+
+async def _rows(rows: int) -> None:
+    from repository import ApplicationRecord
+
+    legacy_cls = _legacy(ApplicationRecord, frozen=True)
+    print(f"Müraciət sətirləri (n={rows}):")
+    for label, factory in (
+        ("dict(row) + dataclass", lambda: _legacy_records(legacy_cls)),
+        ("tuple + slots record", _current_records),
+    ):
+        await factory()  # isinmə: engine / pool yaradılsın
+        started = time.perf_counter()
+        await factory()
+        elapsed = time.perf_counter() - started
+        # Vaxt tracemalloc-suz ölçülür (o, hər allokasiyanı yavaşladır)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        records = await factory()
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f"  {label:<24} {size / len(records):8.0f} B/sətir   {elapsed:6.2f}s")
+        del records
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=True)
+    _conversations(args.users)
+    _seed(args.rows)
+
+    import db_async
+
+    async def run_all():
+        try:
+            await _rows(args.rows)
+        finally:
+            await db_async.dispose_async_engines()
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
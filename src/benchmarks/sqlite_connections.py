@@ -0,0 +1,170 @@
+"""
+SQLite fallback: hər çağırışda yeni connection vs daimi (pool) connection + WAL
+
+Bir "/start + təsdiq" axını təqlid olunur: qara siyahı yoxlaması, son 24 saatın
+sayı, müraciətin yazılması, ID ilə oxunması və statusun yenilənməsi. İki qat ölçülür:
+- sinxron `db_sqlite` (köhnə: hər çağırışda `sqlite3.connect`, rollback journal;
+  yeni: thread-ə bağlı connection, WAL + pragmalar);
+- asinxron `db_async` (köhnə: SQLAlchemy default NullPool - hər sorğuda yeni aiosqlite
+  connection və thread; yeni: AsyncAdaptedQueuePool + pragmalar).
+Hər rejim ayrıca DB faylında işləyir, çünki WAL faylda qalıcıdır.
+
+İstifadə:
+    python src/benchmarks/sqlite_connections.py --flows 2000 --threads 4
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from _common import format_latencies, setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flows", type=int, default=2000, help="hər rejimdə axın sayı")
+    parser.add_argument("--threads", type=int, default=4, help="sinxron qatda paralel thread sayı")
+    parser.add_argument("--concurrency", type=int, default=20, help="asinxron qatda eyni anda axın sayı")
+    return parser.parse_args()
+
+
+@contextmanager
+def _per_call_connection():
+    """Köhnə get_sqlite_connection: hər çağırışda açılıb bağlanır, pragmasız"""
+    import db_sqlite
+
+    conn = sqlite3.connect(db_sqlite.SQLITE_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _fresh_db(mode: str, per_call: bool) -> str:
+    """Yeni DB faylı; per_call=True olanda köhnə connection ilə yaradılır (rollback journal)"""
+    import db_sqlite
+
+    path = os.path.join(tempfile.mkdtemp(prefix=f"dsmf-{mode}-"), "bench.db")
+    db_sqlite.close_sqlite_connection()
+    db_sqlite.SQLITE_DB_PATH = path
+    pooled = db_sqlite.get_sqlite_connection
+    if per_call:
+        db_sqlite.get_sqlite_connection = _per_call_connection
+    db_sqlite.init_sqlite_db()
+    db_sqlite.get_sqlite_connection = pooled
+    db_sqlite.close_sqlite_connection()
+    return path
+
+
+def _sync_flow(uid: int) -> None:
+    import db_sqlite
+    from config import BAKU_TZ
+
+    db_sqlite.is_user_blacklisted_sqlite(uid)
+    db_sqlite.count_user_recent_applications_sqlite(uid, hours=24)
+    app = db_sqlite.save_application_sqlite(
+        user_telegram_id=uid, user_username="bench", fullname="Test Test", phone="+994501234567",
+        fin="ABC1234", id_photo_file_id="", form_type="Şikayət", subject="bench",
+        body="benchmark müraciəti", created_at=datetime.now(BAKU_TZ),
+    )
+    db_sqlite.get_application_by_id_sqlite(app["id"])
+    db_sqlite.update_application_status_sqlite(app["id"], "processing")
+
+
+def run_sync(mode: str, flows: int, threads: int):
+    import db_sqlite
+
+    _fresh_db(mode, per_call=mode == "connect")
+    pooled = db_sqlite.get_sqlite_connection
+    if mode == "connect":
+        # db_sqlite funksiyaları adı çağırış anında axtarır
+        db_sqlite.get_sqlite_connection = _per_call_connection
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker(n: int, offset: int):
+        local = []
+        for i in range(n):
+            t0 = time.perf_counter()
+            _sync_flow(1000 + (offset + i) % 50)
+            local.append((time.perf_counter() - t0) * 1000)
+        db_sqlite.close_sqlite_connection()
+        with lock:
+            latencies.extend(local)
+
+    per_thread = flows // threads
+    pool = [threading.Thread(target=worker, args=(per_thread, t * per_thread)) for t in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    db_sqlite.get_sqlite_connection = pooled
+    return latencies, elapsed
+
+
+async def run_async(mode: str, flows: int, concurrency: int):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    import db_async
+    from config import BAKU_TZ
+
+    path = _fresh_db(f"async-{mode}", per_call=mode == "connect")
+    db_async.SQLITE_DB_PATH = path
+    await db_async.dispose_async_engines()
+    if mode == "connect":
+        # SQLAlchemy 2.0-ın aiosqlite default-u, pragmasız
+        db_async._sqlite_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def flow(i: int):
+        uid = 1000 + i % 50
+        async with sem:
+            t0 = time.perf_counter()
+            await db_async.is_user_blacklisted_sqlite(uid)
+            await db_async.count_user_recent_applications_sqlite(uid, hours=24)
+            app = await db_async.save_application_sqlite(
+                user_telegram_id=uid, user_username="bench", fullname="Test Test", phone="+994501234567",
+                fin="ABC1234", id_photo_file_id="", form_type="Şikayət", subject="bench",
+                body="benchmark müraciəti", created_at=datetime.now(BAKU_TZ),
+            )
+            await db_async.get_application_by_id_sqlite(app.id)
+            await db_async.update_application_status_sqlite(app.id, "processing")
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(flow(i) for i in range(flows)))
+    elapsed = time.perf_counter() - started
+    await db_async.dispose_async_engines()
+    return latencies, elapsed
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=True)
+    print(f"flows={args.flows} threads={args.threads} concurrency={args.concurrency}")
+    for mode in ("connect", "persistent"):
+        latencies, elapsed = run_sync(mode, args.flows, args.threads)
+        print(format_latencies(f"[sync {mode}] flow", latencies))
+        print(f"[sync {mode}] throughput: {len(latencies) / elapsed:.1f} flow/s")
+    for mode in ("connect", "pooled"):
+        latencies, elapsed = asyncio.run(run_async(mode, args.flows, args.concurrency))
+        print(format_latencies(f"[async {mode}] flow", latencies))
+        print(f"[async {mode}] throughput: {len(latencies) / elapsed:.1f} flow/s")
+
+
+if __name__ == "__main__":
+    main()
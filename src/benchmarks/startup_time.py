@@ -0,0 +1,154 @@
+"""
+Soyuq start müddəti - import, DB init və update qəbuluna hazır olana qədər fazalar
+
+Hər ölçmə ayrıca Python prosesində aparılır (import keşi yoxdur). İlk proses boş
+bazada işləyir (cədvəllər, index-lər, sxem versiyası yazılır), qalanları restartdır
+(sxem aktualdır - yalnız versiya oxunur). Fazalar:
+- `import config` / `import bot` - modulların yüklənməsi (config `telegram.warnings` ilə PTB-ni də yükləyir);
+- `db init` - `init_sqlite_db()` və ya `init_db()`;
+- `build_app` - handler-lər, persistence, repository, getUpdates üçün httpx klienti (SSL konteksti);
+- `initialize + post_init` - update qəbulundan əvvəlki son addım (Bot API saxtadır, bax: load_test.py);
+- `keş yüklənməsi` - fonda, update qəbulu ilə paralel gedir.
+
+İstifadə:
+    python src/benchmarks/startup_time.py --runs 5
+    python src/benchmarks/startup_time.py --imports 15        # ən ağır top-level import-lar
+    DATABASE_URL=postgresql://... python src/benchmarks/startup_time.py --backend postgres
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import SRC_DIR, setup_env
+
+PHASES = (
+    ("import_config", "import config"),
+    ("import_bot", "import bot"),
+    ("db_init", "db init"),
+    ("build_app", "build_app"),
+    ("post_init", "initialize + post_init"),
+    ("ready", "→ update qəbuluna hazır"),
+    ("cache_warmup", "keş yüklənməsi (fonda)"),
+)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--runs", type=int, default=5, help="restart ölçmələrinin sayı")
+    parser.add_argument("--imports", type=int, default=0, metavar="N",
+                        help="`-X importtime` ilə ən ağır N top-level import-u göstər")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# ================== Ölçülən proses ==================
+
+def _child(backend: str) -> None:
+    import asyncio
+    import importlib
+
+    phases: dict[str, float] = {}
+    mark = time.perf_counter()
+
+    def lap(name: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        phases[name] = (now - mark) * 1000
+        mark = now
+
+    importlib.import_module("config")
+    lap("import_config")
+    import bot
+    lap("import_bot")
+    if backend == "sqlite":
+        from db_sqlite import init_sqlite_db
+        init_sqlite_db()
+    else:
+        from db_operations import init_db
+        init_db()
+    lap("db_init")
+
+    from load_test import _fake_request_class
+    from repository import create_repository
+
+    app = bot.build_app(request=_fake_request_class()(0))
+    app.bot_data["repo"] = create_repository(use_sqlite=backend == "sqlite")
+    lap("build_app")
+
+    async def serve() -> None:
+        await app.initialize()
+        await app.post_init(app)
+        lap("post_init")
+        phases["ready"] = sum(phases.values())
+        await app.bot_data["cache_warmup"]
+        lap("cache_warmup")
+        await app.shutdown()
+        await app.post_shutdown(app)
+
+    asyncio.run(serve())
+    print(json.dumps(phases))
+
+
+# ================== Hesabat ==================
+
+def _spawn(backend: str) -> dict[str, float]:
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--backend", backend],
+        capture_output=True, text=True, check=True, env=os.environ,
+    )
+    phases = json.loads(out.stdout.strip().splitlines()[-1])
+    phases["process"] = (time.perf_counter() - started) * 1000
+    return phases
+
+
+def _heaviest_imports(limit: int) -> list[tuple[str, float]]:
+    """`python -X importtime -c 'import bot'` - birbaşa import olunan modulların kumulyativ vaxtı"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bot"],
+        capture_output=True, text=True, cwd=SRC_DIR, env=os.environ,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Yalnız `bot`-un birbaşa import etdikləri (girinti: " bot", "   config", "     ...")
+        if len(name) - len(name.lstrip()) != 3 or not cumulative.strip().isdigit():
+            continue
+        rows.append((name.strip(), int(cumulative) / 1000))
+    rows.sort(key=lambda item: item[1], reverse=True)
+    return rows[:limit]
+
+
+def main():
+    args = _parse_args()
+    setup_env(sqlite=args.backend == "sqlite")
+    os.environ.setdefault("EXECUTOR_CHAT_ID", "-100555000")
+    os.environ.setdefault("PERSISTENCE_PATH", os.path.join(tempfile.mkdtemp(prefix="dsmf-startup-"), "state.db"))
+    if args.child:
+        _child(args.backend)
+        return
+
+    first = _spawn(args.backend)
+    restarts = [_spawn(args.backend) for _ in range(args.runs)]
+    print(f"backend={args.backend} restart={args.runs}")
+    print(f"{'faza':<32} {'ilk start':>10} {'restart p50':>12} {'min':>8}")
+    for key, label in PHASES + (("process", "proses (python daxil)"),):
+        values = [r[key] for r in restarts]
+        print(f"{label:<32} {first[key]:>8.1f}ms {statistics.median(values):>10.1f}ms {min(values):>6.1f}ms")
+
+    if args.imports:
+        print("\nƏn ağır import-lar (kumulyativ, `import bot`):")
+        for name, ms in _heaviest_imports(args.imports):
+            print(f"  {name:<40} {ms:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
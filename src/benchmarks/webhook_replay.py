@@ -0,0 +1,93 @@
+"""
+Yazılmış (və ya sintetik) update-ləri lokal webhook serverinə POST et
+
+Bot əvvəlcə webhook rejimində, WEBHOOK_URL-siz işə salınır (set_webhook çağırılmır):
+    RUN_MODE=webhook PORT=8080 python run.py
+sonra update-lər göndərilir:
+    python src/benchmarks/webhook_replay.py --file updates.jsonl
+    python src/benchmarks/webhook_replay.py --synthetic 500 --concurrency 50
+
+`updates.jsonl` - hər sətirdə bir Telegram Update JSON-u (getUpdates cavabındakı kimi).
+Secret token bot ilə eyni qaydada (WEBHOOK_SECRET və ya BOT_TOKEN-dən) hesablanır, ona
+görə eyni .env ilə işə salınmalıdır. Hər POST-un cavab vaxtı və status kodları çap olunur.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from _common import format_latencies, setup_env
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="default: http://127.0.0.1:$PORT$WEBHOOK_PATH")
+    parser.add_argument("--file", help="JSONL faylı (hər sətirdə bir update)")
+    parser.add_argument("--synthetic", type=int, default=100, help="--file yoxdursa: /help update-lərinin sayı")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--bad-secret", action="store_true", help="səhv secret ilə göndər (403 gözlənilir)")
+    return parser.parse_args()
+
+
+def _synthetic(n: int) -> list[dict]:
+    now = int(time.time())
+    return [
+        {
+            "update_id": 900_000 + i,
+            "message": {
+                "message_id": i + 1,
+                "date": now,
+                "chat": {"id": 10_000 + i, "type": "private"},
+                "from": {"id": 10_000 + i, "is_bot": False, "first_name": "Test"},
+                "text": "/help",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+async def _replay(url: str, secret: str, updates: list[dict], concurrency: int):
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def post(update: dict):
+            async with sem:
+                t0 = time.perf_counter()
+                resp = await client.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": secret})
+                latencies.append((time.perf_counter() - t0) * 1000)
+                statuses[resp.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(u) for u in updates))
+        return latencies, statuses, time.perf_counter() - started
+
+
+def main():
+    args = _parse_args()
+    # Secret bot ilə eyni BOT_TOKEN-dən hesablanmalıdır
+    from dotenv import load_dotenv
+    load_dotenv()
+    setup_env(sqlite=True)
+    from config import WEBHOOK_PATH, WEBHOOK_PORT
+    from webserver import webhook_secret
+
+    url = args.url or f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}"
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            updates = [json.loads(line) for line in f if line.strip()]
+    else:
+        updates = _synthetic(args.synthetic)
+    secret = "wrong" if args.bad_secret else webhook_secret()
+    latencies, statuses, elapsed = asyncio.run(_replay(url, secret, updates, args.concurrency))
+    print(f"url={url} updates={len(updates)} concurrency={args.concurrency}")
+    print(format_latencies("POST latency", latencies))
+    print(f"status: {dict(statuses)}  throughput: {len(updates) / elapsed:.1f} update/s")
+
+
+if __name__ == "__main__":
+    main()
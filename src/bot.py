@@ -1,10 +1,14 @@
+import asyncio
+import functools
+import importlib.util
 import logging
+import time
+import uuid
 from dataclasses import dataclass
 from enum import Enum, auto
 from typing import Optional, Any, Dict
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-import phonenumbers
 from telegram import (
     Update,
     InlineKeyboardButton,
@@ -12,6 +16,7 @@ from telegram import (
     ReplyKeyboardRemove,
 )
 from telegram.error import Conflict
+from telegram.request import BaseRequest
 from telegram.ext import (
     Application,
     ApplicationBuilder,
@@ -21,6 +26,7 @@ from telegram.ext import (
     ConversationHandler,
     filters,
     CallbackQueryHandler,
+    TypeHandler,
 )
 
 from config import (
@@ -39,10 +45,39 @@ from config import (
     MAX_DAILY_SUBMISSIONS,
     MAX_MONTHLY_SUBMISSIONS,
     ADMIN_USER_IDS,
+    BLACKLIST_REFRESH_SECONDS,
+    DB_POOL_METRICS_SECONDS,
+    RUN_MODE,
+    OUTBOUND_GLOBAL_PER_SECOND,
+    OUTBOUND_CHAT_PER_SECOND,
+    OUTBOUND_GROUP_PER_MINUTE,
+    OUTBOUND_MAX_RETRIES,
+    OUTBOUND_WORKERS,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETRY_BASE_SECONDS,
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_USERS,
+    SESSION_SWEEP_SECONDS,
+    PERSISTENCE_PATH,
+    PERSISTENCE_UPDATE_SECONDS,
+    SHARED_STATE,
+    REDIS_URL,
+    SHARED_SYNC_SECONDS,
+    SLA_DAYS,
+    METRICS_PORT,
+    METRICS_LISTEN,
+    QUERY_BUDGET,
     setup_logging,
 )
+from sender import OutboundSender
+from session_store import SessionStore
+from persistence import SharedPersistence, SqlitePersistence, register_types, set_conversation_state
+from shared_state import BLACKLIST_VERSION_KEY, EXECUTOR_CHAT_KEY, SharedState, create_shared_state
+from instrumentation import InstrumentedRequest, format_report, instrument_handlers, instrument_module
+import metrics
 import re
-from telegram.error import BadRequest
 
 setup_logging()
 logger = logging.getLogger("dsmf-bot")
@@ -62,7 +97,8 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
     if error and isinstance(error, Conflict):
         logger.warning(
             "⚠️ Polling Conflict: Başqa bot instance-ı işləyir. "
-            "Railway-də yalnız 1 replica olmalıdır, ya da əvvəlki deployment-ı durdurmalısınız."
+            "Polling rejimində yalnız 1 replica olmalıdır, ya da əvvəlki deployment-ı durdurmalısınız. "
+            "Bir neçə worker üçün RUN_MODE=webhook və SHARED_STATE istifadə edin (bax: DEPLOYMENT.md)."
         )
         return  # Bu xətaları mute edirik
     
@@ -85,6 +121,70 @@ def _ud(context: ContextTypes.DEFAULT_TYPE) -> Dict[str, Any]:
         context.user_data = d  # type: ignore[attr-defined]
     return d
 
+def _repo(context: ContextTypes.DEFAULT_TYPE) -> Optional["ApplicationRepository"]:
+    """main()-də seçilmiş repository (DB deaktivdirsə None)."""
+    if not DB_ENABLED:
+        return None
+    bot_data = getattr(context, "bot_data", None)
+    return bot_data.get("repo") if isinstance(bot_data, dict) else None
+
+def _sender(context: ContextTypes.DEFAULT_TYPE) -> OutboundSender:
+    """build_app()-də yaradılmış çıxan mesaj növbəsi (bax: sender.py)"""
+    return context.bot_data["sender"]
+
+def _shared(context: ContextTypes.DEFAULT_TYPE) -> Optional[SharedState]:
+    """Scale-out rejimində worker-lərin ümumi store-u (SHARED_STATE boşdursa None)"""
+    return context.bot_data.get("shared")
+
+def _on_chat_migrated(application: Application, old_id: int, new_id: int) -> None:
+    """Qrup supergroup-a köçəndə icraçı chat ID-sini runtime-da yenilə (scale-out: bütün worker-lərdə)"""
+    global EXECUTOR_CHAT_ID_RT
+    if old_id == EXECUTOR_CHAT_ID_RT:
+        logger.warning(f"➡️ Yeni supergroup ID aşkarlandı: {new_id} — runtime yenilənir. .env-də EXECUTOR_CHAT_ID dəyərini də buna dəyişin.")
+        EXECUTOR_CHAT_ID_RT = new_id
+        shared = application.bot_data.get("shared")
+        if shared is not None:
+            # Digər worker-lər növbəti sinxronizasiyada götürür (bax: _sync_shared_state)
+            application.create_task(shared.set_many({EXECUTOR_CHAT_KEY: str(new_id)}), name="executor-chat-publish")
+
+async def _publish_blacklist_change(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Scale-out: qara siyahı dəyişdi - digər worker-lər keşlərini DB-dən yeniləsin"""
+    shared = _shared(context)
+    if shared is None:
+        return
+    version = uuid.uuid4().hex
+    context.bot_data["blacklist_version"] = version  # öz dəyişikliyimizi yenidən yükləməyək
+    try:
+        await shared.set_many({BLACKLIST_VERSION_KEY: version})
+    except Exception as e:
+        # Digər worker-lər BLACKLIST_REFRESH_SECONDS ərzində onsuz da yeniləyir
+        logger.warning(f"Qara siyahı versiyası yayılmadı: {e}")
+
+def _fmt_created(rec: "ApplicationRecord", fmt: str = '%d.%m.%y %H:%M:%S') -> str:
+    """Müraciət tarixini Bakı vaxtı ilə göstər (naive dəyər UTC sayılır)"""
+    dt = rec.created_at
+    if dt is None:
+        return ''
+    try:
+        if getattr(dt, 'tzinfo', None) is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(BAKU_TZ).strftime(fmt)
+    except Exception:
+        return dt.strftime(fmt)
+
+def _summary_dm_text(rec: "ApplicationRecord", footer: str, body_label: str = "✍️ Müraciət mətni") -> str:
+    """İcraçıya DM-də göstərilən müraciət xülasəsi"""
+    return (
+        "📋 Müraciət xülasəsi:\n"
+        f"👤 {rec.fullname}\n"
+        f"📱 Mobil nömrə: {rec.phone}\n"
+        f"🆔 FIN: {rec.fin}\n"
+        f"{body_label}: {rec.body}\n\n"
+        f"⏰ {_fmt_created(rec)}\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        f"{footer}"
+    )
+
 # Database yüklənməsi (PostgreSQL əsas, SQLite fallback); lokal test üçün FORCE_SQLITE dəstəyi
 DB_ENABLED = False
 USE_SQLITE = False
@@ -94,11 +194,7 @@ _FORCE_SQLITE = _os.getenv("FORCE_SQLITE", "0").lower() in ("1", "true", "yes")
 
 if _FORCE_SQLITE:
     try:
-        from db_sqlite import (
-            save_application_sqlite,
-            init_sqlite_db,
-            export_to_json as sqlite_export_json,
-        )
+        from db_sqlite import init_sqlite_db
         DB_ENABLED = True
         USE_SQLITE = True
         logger.info("✅ FORCE_SQLITE aktivdir; SQLite istifadə olunacaq")
@@ -106,18 +202,15 @@ if _FORCE_SQLITE:
         logger.error(f"❌ SQLite yüklənmədi: {e2}. DB deaktivdir.")
         DB_ENABLED = False
 else:
-    try:
-        from db_operations import save_application, init_db
+    # db_operations (psycopg2 + sync engine) yalnız main()-də sxem yoxlaması üçün import olunur
+    _missing = [m for m in ("sqlalchemy", "psycopg2") if importlib.util.find_spec(m) is None]
+    if not _missing:
         DB_ENABLED = True
         logger.info("✅ PostgreSQL modulu yükləndi")
-    except ImportError as e:
-        logger.warning(f"⚠️ PostgreSQL yüklənmədi: {e}")
+    else:
+        logger.warning(f"⚠️ PostgreSQL yüklənmədi: {', '.join(_missing)} quraşdırılmayıb")
         try:
-            from db_sqlite import (
-                save_application_sqlite,
-                init_sqlite_db,
-                export_to_json as sqlite_export_json,
-            )
+            from db_sqlite import init_sqlite_db
             DB_ENABLED = True
             USE_SQLITE = True
             logger.info("✅ SQLite fallback aktivləşdi")
@@ -125,6 +218,18 @@ else:
             logger.error(f"❌ SQLite də yüklənmədi: {e2}. DB deaktivdir.")
             DB_ENABLED = False
 
+# Handler-lər DB-yə yalnız repository (async qat) vasitəsilə müraciət edir
+if DB_ENABLED:
+    try:
+        import db_async
+        from database import ApplicationStatus
+        from repository import ApplicationRecord, ApplicationRepository, create_repository
+        import stats as stats_counters
+        from exporter import EXPORT_FORMATS, WatermarkTracker, export_parts, format_available
+    except ImportError as e3:
+        logger.error(f"❌ Async DB modulu yüklənmədi: {e3}. DB deaktivdir.")
+        DB_ENABLED = False
+
 class FormType(str, Enum):
     COMPLAINT = "Şikayət"
     SUGGESTION = "Təklif"
@@ -145,7 +250,9 @@ class States(Enum):
     EXEC_REJECT_REASON = auto()
     EXEC_EDIT_REPLY_TEXT = auto()
 
-@dataclass
+# Hər yarımçıq anket üçün bir obyekt yaddaşda (və persistence-də) saxlanılır - __dict__-siz.
+# Handler-lər sahələri addım-addım doldurur, ona görə dəyişkən qalır.
+@dataclass(slots=True)
 class ApplicationData:
     fullname: Optional[str] = None
     phone: Optional[str] = None
@@ -183,6 +290,9 @@ class ApplicationData:
             f"{time_str}"
         )
 
+# user_data və söhbət vəziyyətlərində saxlanılan tiplər (persistence JSON-u üçün)
+register_types(ApplicationData, FormType, States)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     global ADMIN_USER_IDS
     msg = update.effective_message
@@ -199,19 +309,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     is_admin = uid in ADMIN_USER_IDS if uid else False
     logger.info(f"Admin check: is_admin={is_admin}")
 
+    repo = _repo(context)
     # Qara siyahı yoxlaması
-    if uid and DB_ENABLED:
+    if uid and repo is not None:
         try:
             from config import ADMIN_USER_IDS
             if uid not in ADMIN_USER_IDS:
-                blacklisted = False
-                if USE_SQLITE:
-                    from db_sqlite import is_user_blacklisted_sqlite
-                    blacklisted = is_user_blacklisted_sqlite(uid)  # type: ignore[possibly-unbound]
-                else:
-                    from db_operations import is_user_blacklisted
-                    blacklisted = is_user_blacklisted(uid)  # type: ignore[possibly-unbound]
-                if blacklisted:
+                if await repo.is_user_blacklisted(uid):
                     await msg.reply_text(
                         "⚠️ Müraciətləriniz müvəqqəti qəbul edilmir. Xahiş edirik daha sonra yenidən yoxlayın.",
                         reply_markup=ReplyKeyboardRemove(),
@@ -233,51 +337,11 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 if context.user_data is not None:
                     context.user_data["exec_app_id"] = app_id
                 # Müraciət xülasəsini DM-də göstər və cavabı istə
-                app_text: Optional[str] = None
-                sqlite_photo_id: Optional[str] = None
-                if USE_SQLITE:
-                    from db_sqlite import get_application_by_id_sqlite
-                    app_data = get_application_by_id_sqlite(app_id)
-                    if app_data:
-                        time_str = str(app_data.get('created_at', ''))
-                        app_text = (
-                            "📋 Müraciət xülasəsi:\n"
-                            f"👤 {app_data.get('fullname', '')}\n"
-                            f"📱 Mobil nömrə: {app_data.get('phone', '')}\n"
-                            f"🆔 FIN: {app_data.get('fin', '')}\n"
-                            f"✍️ Məzmun: {app_data.get('body', '')}\n\n"
-                            f"⏰ {time_str}\n"
-                            "━━━━━━━━━━━━━━━━━━━━\n"
-                            "📝 Cavab mətni yazın:"
-                        )
-                        raw = app_data.get('id_photo_file_id')
-                        if isinstance(raw, str) and raw:
-                            sqlite_photo_id = raw
-                else:
-                    from db_operations import get_application_by_id
-                    app = get_application_by_id(app_id)
-                    if app:
-                        try:
-                            from datetime import timezone
-                            dt = app.created_at
-                            if dt is not None and getattr(dt, 'tzinfo', None) is None:
-                                dt = dt.replace(tzinfo=timezone.utc)
-                            time_str = dt.astimezone(BAKU_TZ).strftime('%d.%m.%y %H:%M:%S') if dt is not None else ''  # type: ignore[union-attr]
-                        except Exception:
-                            time_str = app.created_at.strftime('%d.%m.%y %H:%M:%S') if (app.created_at is not None) else ''  # type: ignore[union-attr]
-                        app_text = (
-                            "📋 Müraciət xülasəsi:\n"
-                            f"👤 {app.fullname}\n"
-                            f"📱 Mobil nömrə: {app.phone}\n"
-                            f"🆔 FIN: {app.fin}\n"
-                            f"✍️ Məzmun: {app.body}\n\n"
-                            f"⏰ {time_str}\n"
-                            "━━━━━━━━━━━━━━━━━━━━\n"
-                            "📝 Cavab mətni yazın:"
-                        )
-                if app_text:
-                    if sqlite_photo_id:
-                        await msg.reply_photo(photo=sqlite_photo_id, caption=app_text)
+                rec = await repo.get_application_by_id(app_id) if repo is not None else None
+                if rec:
+                    app_text = _summary_dm_text(rec, "📝 Cavab mətni yazın:", body_label="✍️ Məzmun")
+                    if rec.id_photo_file_id:
+                        await msg.reply_photo(photo=rec.id_photo_file_id, caption=app_text)
                     else:
                         await msg.reply_text(app_text)
                 # State-i əsas exec_conv_reply izləyir (per_user). Burada dialoqa keçmirik.
@@ -301,21 +365,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 if context.user_data is not None:
                     context.user_data["exec_app_id"] = app_id
                 # Mövcud cavabı göstər
-                existing_text = None
-                if USE_SQLITE:
-                    from db_sqlite import get_application_by_id_sqlite
-                    app_data = get_application_by_id_sqlite(app_id)
-                    if app_data:
-                        existing_text = (app_data.get('reply_text') or '') if isinstance(app_data, dict) else ''
-                else:
-                    from db_operations import get_application_by_id
-                    app = get_application_by_id(app_id)
-                    if app:
-                        try:
-                            existing_text = app.reply_text  # type: ignore[attr-defined]
-                        except Exception:
-                            existing_text = None
-                existing_text_str = str(existing_text) if existing_text is not None else ""
+                rec = await repo.get_application_by_id(app_id) if repo is not None else None
+                existing_text_str = (rec.reply_text or "") if rec else ""
                 if len(existing_text_str) > 0:
                     await msg.reply_text(f"Mövcud cavab:\n\n{existing_text_str}\n\n✏️ Yeni cavabı yazın:")
                 else:
@@ -325,6 +376,23 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             except Exception:
                 pass
 
+    # Müraciət limiti (yaddaşdakı sürüşən pəncərə, DB sorğusu yoxdur)
+    if uid and repo is not None and not is_admin:
+        if _shared(context) is not None or not repo.rate_limiter.seeded:
+            # Scale-out: istifadəçinin digər worker-lərdə göndərdikləri də sayılsın;
+            # startup-da pəncərələr hələ yüklənməyibsə də istifadəçininki DB-dən oxunur
+            try:
+                await repo.refresh_user_submissions(uid)
+            except Exception as e:
+                logger.warning(f"Müraciət limiti pəncərəsi yenilənmədi: {e}")
+        exceeded = repo.rate_limiter.check(uid)
+        if exceeded:
+            window, limit = exceeded
+            key = "daily_limit_exceeded" if window.days < 30 else "monthly_limit_exceeded"
+            logger.info(f"Müraciət limiti aşıldı: user_id={uid} limit={limit} pəncərə={window}")
+            await msg.reply_text(MESSAGES[key].format(limit=limit), reply_markup=ReplyKeyboardRemove())
+            return ConversationHandler.END
+
     await msg.reply_text(
         MESSAGES["welcome"],
         reply_markup=ReplyKeyboardRemove(),
@@ -350,6 +418,8 @@ async def collect_fullname(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return States.PHONE
 
 def validate_az_phone(number: str) -> bool:
+    # phonenumbers metadata-sı ağırdır - ilk telefon yoxlamasında yüklənir, startup-da yox
+    import phonenumbers
     try:
         parsed = phonenumbers.parse(number, None)
         return phonenumbers.is_valid_number(parsed) and number.startswith("+994")
@@ -504,23 +574,41 @@ async def confirm_or_edit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not query:
         logger.warning("confirm_or_edit: callback_query yoxdur")
         return ConversationHandler.END
-    await query.answer()
     app: Optional[ApplicationData] = _ud(context).get("app")  # type: ignore[index]
-    if not app:
+    if not app or not app.fullname or not app.phone or not app.fin:
+        # Vəziyyət silinib (TTL / LRU) - yarımçıq anket göndərilmir
+        await query.answer()
         logger.warning("confirm_or_edit: app məlumatı yoxdur")
+        await query.edit_message_text(MESSAGES["session_expired"])
         return ConversationHandler.END
     if query.data == "cancel":
+        await query.answer()
         await query.edit_message_text(MESSAGES["cancelled"])
         return ConversationHandler.END
     if query.data == "edit":
+        await query.answer()
         # Mövzu addımı ləğv olundu – birbaşa mətni yenidən yazmağı istəyirik
         await query.edit_message_text("Zəhmət olmasa müraciət mətnini yenidən yazın:")
         return States.BODY
-    # confirm
-    await query.edit_message_text(MESSAGES["confirm_sent"])
+    # confirm: yaz -> təsdiqlə (bir round trip) -> qayıt. İcraçı bildirişi fonda gedir.
+    started = time.perf_counter()
+
+    # Status göstəricisi - yaradılma tarixinə görə
+    # 10+ gün əvvəl yaradılıbsa, "Vaxtı keçir"
+    days_old = (datetime.now(BAKU_TZ) - app.timestamp).days if app.timestamp else 0
+    if days_old >= 10:
+        status_line = "\n🔴 Status: Vaxtı keçir"
+    else:
+        status_line = "\n🟡 Status: Gözləyir"
+    caption_body = app.summary_text(include_time=False) + status_line + "\n\n"
+    if not EXECUTOR_CHAT_ID_RT:
+        logger.warning("EXECUTOR_CHAT_ID təyin edilməyib; icraçılara göndərilmədi")
+    # İcraçı bildirişi müraciətlə eyni tranzaksiyada outbox-a yazılır, outbox_job göndərir
+    notification = {"caption": caption_body, "photo": app.id_photo_file_id} if EXECUTOR_CHAT_ID_RT else None
 
     # Database-ə yaz (PostgreSQL və ya SQLite)
-    if DB_ENABLED:
+    repo = _repo(context)
+    if repo is not None:
         try:
             # Type narrowing / boş olmamalı
             assert all([
@@ -533,117 +621,61 @@ async def confirm_or_edit(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 app.body,
                 app.timestamp,
             ]), "Boş sahə var"
-            if USE_SQLITE:
-                # SQLite fallback
-                db_app = save_application_sqlite(  # type: ignore[possibly-unbound]
-                    user_telegram_id=query.from_user.id,
-                    user_username=query.from_user.username or "",
-                    fullname=app.fullname,  # type: ignore[arg-type]
-                    phone=app.phone,  # type: ignore[arg-type]
-                    fin=app.fin,  # type: ignore[arg-type]
-                    id_photo_file_id=app.id_photo_file_id,  # type: ignore[arg-type]
-                    form_type=app.form_type,  # type: ignore[arg-type]
-                    subject=app.subject,  # type: ignore[arg-type]
-                    body=app.body,  # type: ignore[arg-type]
-                    created_at=app.timestamp,  # type: ignore[arg-type]
-                )
-                logger.info(f"✅ SQLite-a yazıldı: ID={db_app['id']}")
-                caption_prefix = f"Sıra №: {db_app['id']}\n"
-                db_id = db_app["id"]
-            else:
-                # PostgreSQL
-                db_app = save_application(  # type: ignore[possibly-unbound]
-                    user_telegram_id=query.from_user.id,
-                    user_username=query.from_user.username or "",
-                    fullname=app.fullname,  # type: ignore[arg-type]
-                    phone=app.phone,  # type: ignore[arg-type]
-                    fin=app.fin,  # type: ignore[arg-type]
-                    form_type=app.form_type,  # type: ignore[arg-type]
-                    body=app.body,  # type: ignore[arg-type]
-                    created_at=app.timestamp,  # type: ignore[arg-type]
-                )
-                logger.info(f"✅ PostgreSQL-ə yazıldı: ID={db_app.id}")
-                caption_prefix = f"Sıra №: {db_app.id}\n"
-                db_id = db_app.id  # type: ignore[assignment]
+            db_app = await repo.save_application(
+                user_telegram_id=query.from_user.id,
+                user_username=query.from_user.username or "",
+                fullname=app.fullname,  # type: ignore[arg-type]
+                phone=app.phone,  # type: ignore[arg-type]
+                fin=app.fin,  # type: ignore[arg-type]
+                id_photo_file_id=app.id_photo_file_id,  # type: ignore[arg-type]
+                form_type=app.form_type,  # type: ignore[arg-type]
+                subject=app.subject,  # type: ignore[arg-type]
+                body=app.body,  # type: ignore[arg-type]
+                created_at=app.timestamp,  # type: ignore[arg-type]
+                notification=notification,
+            )
+            logger.info(f"✅ Müraciət yazıldı ({repo.name}): ID={db_app.id}")
         except Exception as e:
             logger.error(f"❌ DB error: {e}")
             caption_prefix = "⚠️ DB xətası\n"
-            db_id = None
+        else:
+            caption_prefix = None
+            if notification is not None:
+                # Növbəti periodik yoxlamanı gözləmədən fonda göndər
+                _kick_outbox(context)
     else:
         caption_prefix = ""
-        db_id = None
 
-    # Status göstəricisi - yaradılma tarixinə görə
-    # 10+ gün əvvəl yaradılıbsa, "Vaxtı keçir"
-    days_old = (datetime.now(BAKU_TZ) - app.timestamp).days if app.timestamp else 0
-    if days_old >= 10:
-        status_line = "\n🔴 Status: Vaxtı keçir"
-    else:
-        status_line = "\n🟡 Status: Gözləyir"
-    
-    caption = (
-        caption_prefix +
-        app.summary_text(include_time=False) +
-        status_line +
-        "\n\n"
-    )
+    if notification is not None and caption_prefix is not None:
+        # DB yoxdur / yazılmadı: outbox-suz, birbaşa növbəyə (düymələrsiz - müraciətin ID-si yoxdur)
+        logger.info(f"İcraçılara göndərilir: chat_id={EXECUTOR_CHAT_ID_RT}, photo_present={bool(app.id_photo_file_id)}")
+        _submit_executor_notification(context, caption_prefix + caption_body, app.id_photo_file_id, None)
+        metrics.counter("executor_dispatch_total", "İcraçı bildirişləri", result="direct").inc()
 
-    # İcraçı qrupuna mesaj + foto (yalnız EXECUTOR_CHAT_ID düzgün olduqda)
-    global EXECUTOR_CHAT_ID_RT
-    if EXECUTOR_CHAT_ID_RT:
-        # İcraçıların cavab verməsi üçün inline düymələr
-        kb = None
-        if db_id is not None:  # None check for type safety
-            buttons = [
-                [
-                    InlineKeyboardButton("✉️ Cavablandır", callback_data=f"exec_reply:{db_id}"),
-                    InlineKeyboardButton("🚫 İmtina", callback_data=f"exec_reject:{db_id}"),
-                ]
-            ]
-            kb = InlineKeyboardMarkup(buttons)
-        try:
-            logger.info(f"İcraçılara göndərilir: chat_id={EXECUTOR_CHAT_ID_RT}, photo_present={bool(app.id_photo_file_id)}")
-            # Foto varsa foto ilə göndər, yoxdursa mətn
-            if app.id_photo_file_id:
-                await context.bot.send_photo(
-                    chat_id=EXECUTOR_CHAT_ID_RT,
-                    photo=app.id_photo_file_id,
-                    caption=caption,
-                    reply_markup=kb,
-                )
-            else:
-                await context.bot.send_message(chat_id=EXECUTOR_CHAT_ID_RT, text=caption, reply_markup=kb)
-            logger.info("✅ İcraçı qrupuna göndərildi")
-        except Exception as send_err:
-            msg = str(send_err)
-            logger.error(f"❌ İcraçı qrupuna göndərmə xətası: {msg}")
-            # Qrup superqrupa miqrasiya edəndə yeni chat id qaytarılır
-            if isinstance(send_err, BadRequest) and "migrated" in msg.lower():
-                m = re.search(r"-100\d+", msg)
-                if m:
-                    new_id = int(m.group(0))
-                    logger.warning(f"➡️ Yeni supergroup ID aşkarlandı: {new_id} — runtime yenilənir. .env-də EXECUTOR_CHAT_ID dəyərini də buna dəyişin.")
-                    EXECUTOR_CHAT_ID_RT = new_id
-                    try:
-                        if app.id_photo_file_id:
-                            await context.bot.send_photo(
-                                chat_id=EXECUTOR_CHAT_ID_RT,
-                                photo=app.id_photo_file_id,
-                                caption=caption,
-                                reply_markup=kb,
-                            )
-                        else:
-                            await context.bot.send_message(chat_id=EXECUTOR_CHAT_ID_RT, text=caption, reply_markup=kb)
-                        logger.info("✅ Yeni ID ilə icraçı qrupuna göndərildi")
-                    except Exception as retry_err:
-                        logger.error(f"❌ Yeni ID ilə göndərmə də alınmadı: {retry_err}")
-    else:
-        logger.warning("EXECUTOR_CHAT_ID təyin edilməyib; icraçılara göndərilmədi")
-
-    # (Previously sent a separate success DM here.) Now confirmation text
-    # is shown via the edited message (`confirm_sent`) so no extra DM is needed.
+    # Callback cavabı və mesajın redaktəsi paralel gedir - vətəndaş bir round trip gözləyir.
+    # (Ayrıca uğur DM-i göndərilmir, təsdiq mətni `confirm_sent`-dədir.)
+    await asyncio.gather(query.answer(), query.edit_message_text(MESSAGES["confirm_sent"]))
+    metrics.summary("confirm_handler_seconds", "Təsdiq düyməsindən cavaba qədər").observe(time.perf_counter() - started)
     return ConversationHandler.END
 
+def _executor_keyboard(app_id: int) -> InlineKeyboardMarkup:
+    """İcraçıların cavab verməsi üçün inline düymələr"""
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("✉️ Cavablandır", callback_data=f"exec_reply:{app_id}"),
+            InlineKeyboardButton("🚫 İmtina", callback_data=f"exec_reject:{app_id}"),
+        ]
+    ])
+
+def _submit_executor_notification(context: ContextTypes.DEFAULT_TYPE, caption: str,
+                                  photo: Optional[str], kb: Optional[InlineKeyboardMarkup]):
+    """İcraçı qrupuna foto (və ya mətn) - sender növbəsinə qoyur, future qaytarır"""
+    if photo:
+        return _sender(context).submit(
+            "send_photo", chat_id=EXECUTOR_CHAT_ID_RT, photo=photo, caption=caption, reply_markup=kb
+        )
+    return _sender(context).submit("send_message", chat_id=EXECUTOR_CHAT_ID_RT, text=caption, reply_markup=kb)
+
 # ================== İcraçı qrup cavab axını ==================
 async def exec_reply_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -687,68 +719,21 @@ async def exec_reply_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # DM-ə müraciətin tam mətnini göndər
     if user:
         try:
-            app_text_var: Optional[str] = None
-            app_data = None
-            
-            if USE_SQLITE:
-                from db_sqlite import get_application_by_id_sqlite
-                app_data = get_application_by_id_sqlite(app_id)
-                if app_data:
-                    time_str = str(app_data.get('created_at', ''))
-                    app_text_var = (
-                        "📋 Müraciət xülasəsi:\n"
-                        f"👤 {app_data.get('fullname', '')}\n"
-                        f"📱 Mobil nömrə: {app_data.get('phone', '')}\n"
-                        f"🆔 FIN: {app_data.get('fin', '')}\n"
-                        f"✍️ Müraciət mətni: {app_data.get('body', '')}\n\n"
-                        f"⏰ {time_str}\n"
-                        "━━━━━━━━━━━━━━━━━━━━\n"
-                        "Müraciət sizin tərəfinizdən qəbul edildi:"
-                    )
-            else:
-                from db_operations import get_application_by_id
-                app = get_application_by_id(app_id)
-                if app:
-                    # Bakı vaxtına çevir
-                    try:
-                        from config import BAKU_TZ
-                        from datetime import timezone
-                        dt = app.created_at
-                        if dt is not None and getattr(dt, 'tzinfo', None) is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        time_str = dt.astimezone(BAKU_TZ).strftime('%d.%m.%y %H:%M:%S') if dt is not None else ''  # type: ignore[union-attr]
-                    except Exception:
-                        time_str = app.created_at.strftime('%d.%m.%y %H:%M:%S') if (app.created_at is not None) else ''  # type: ignore[union-attr]
-                    app_text_var = (
-                        "📋 Müraciət xülasəsi:\n"
-                        f"👤 {app.fullname}\n"
-                        f"📱 Mobil nömrə: {app.phone}\n"
-                        f"🆔 FIN: {app.fin}\n"
-                        f"✍️ Müraciət mətni: {app.body}\n\n"
-                        f"⏰ {time_str}\n"
-                        "━━━━━━━━━━━━━━━━━━━━\n"
-                        "Müraciət sizin tərəfinizdən qəbul edildi:"
-                    )
-            
-            if app_text_var:
+            repo = _repo(context)
+            rec = await repo.get_application_by_id(app_id) if repo is not None else None
+            if rec:
+                app_text_var = _summary_dm_text(rec, "Müraciət sizin tərəfinizdən qəbul edildi:")
                 # Foto varsa DM-də foto ilə göndər, yoxdursa mətn
-                photo_id = user_store.get("exec_photo_file_id")
+                photo_id = user_store.get("exec_photo_file_id") or rec.id_photo_file_id
                 if isinstance(photo_id, str) and photo_id:
-                    await context.bot.send_photo(chat_id=user.id, photo=photo_id, caption=app_text_var)
+                    await _sender(context).send("send_photo", chat_id=user.id, photo=photo_id, caption=app_text_var)
                 else:
-                    sqlite_photo_id = None
-                    if USE_SQLITE and isinstance(app_data, dict):
-                        raw = app_data.get('id_photo_file_id')
-                        if isinstance(raw, str) and raw:
-                            sqlite_photo_id = raw
-                    if sqlite_photo_id:
-                        await context.bot.send_photo(chat_id=user.id, photo=sqlite_photo_id, caption=app_text_var)
-                    else:
-                        await context.bot.send_message(chat_id=user.id, text=app_text_var)
+                    await _sender(context).send("send_message", chat_id=user.id, text=app_text_var)
         except Exception as e:
             logger.warning(f"DM-ə müraciət göndərərkən xəta: {e}")
             if user:
-                await context.bot.send_message(
+                await _sender(context).send(
+                    "send_message",
                     chat_id=user.id,
                     text=f"📝 Cavab mətni yazın (ID={app_id}):"
                 )
@@ -796,64 +781,21 @@ async def exec_reject_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # DM-ə müraciətin tam mətnini göndər
     if user:
         try:
-            app_text: Optional[str] = None
-            sqlite_photo_id: Optional[str] = None
-            if USE_SQLITE:
-                from db_sqlite import get_application_by_id_sqlite
-                app_data = get_application_by_id_sqlite(app_id)
-                if app_data:
-                    time_str = str(app_data.get('created_at', ''))
-                    app_text = (
-                        "📋 Müraciət xülasəsi:\n"
-                        f"👤 {app_data.get('fullname', '')}\n"
-                        f"📱 Mobil nömrə: {app_data.get('phone', '')}\n"
-                        f"🆔 FIN: {app_data.get('fin', '')}\n"
-                        f"✍️ Müraciət mətni: {app_data.get('body', '')}\n\n"
-                        f"⏰ {time_str}\n"
-                        "━━━━━━━━━━━━━━━━━━━━\n"
-                        "👇 İmtina səbəbini yazın:"
-                    )
-                    raw = app_data.get('id_photo_file_id')
-                    if isinstance(raw, str) and raw:
-                        sqlite_photo_id = raw
-            else:
-                from db_operations import get_application_by_id
-                app = get_application_by_id(app_id)
-                if app:
-                    # Bakı vaxtı
-                    try:
-                        from config import BAKU_TZ
-                        from datetime import timezone
-                        dt = app.created_at
-                        if dt is not None and getattr(dt, 'tzinfo', None) is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        time_str = dt.astimezone(BAKU_TZ).strftime('%d.%m.%y %H:%M:%S') if dt is not None else ''  # type: ignore[union-attr]
-                    except Exception:
-                        time_str = app.created_at.strftime('%d.%m.%y %H:%M:%S') if (app.created_at is not None) else ''  # type: ignore[union-attr]
-                    app_text = (
-                        "📋 Müraciət xülasəsi:\n"
-                        f"👤 {app.fullname}\n"
-                        f"📱 Mobil nömrə: {app.phone}\n"
-                        f"🆔 FIN: {app.fin}\n"
-                        f"✍️ Müraciət mətni: {app.body}\n\n"
-                        f"⏰ {time_str}\n"
-                        "━━━━━━━━━━━━━━━━━━━━\n"
-                        "👇 İmtina səbəbini yazın:"
-                    )
-            
-            if app_text:
+            repo = _repo(context)
+            rec = await repo.get_application_by_id(app_id) if repo is not None else None
+            if rec:
+                app_text = _summary_dm_text(rec, "👇 İmtina səbəbini yazın:")
                 # Foto varsa DM-də foto ilə göndər
-                photo_id = user_store.get("exec_photo_file_id")
+                photo_id = user_store.get("exec_photo_file_id") or rec.id_photo_file_id
                 if isinstance(photo_id, str) and photo_id:
-                    await context.bot.send_photo(chat_id=user.id, photo=photo_id, caption=app_text)
-                elif sqlite_photo_id:
-                    await context.bot.send_photo(chat_id=user.id, photo=sqlite_photo_id, caption=app_text)
+                    await _sender(context).send("send_photo", chat_id=user.id, photo=photo_id, caption=app_text)
                 else:
-                    await context.bot.send_message(chat_id=user.id, text=app_text)
+                    await _sender(context).send("send_message", chat_id=user.id, text=app_text)
         except Exception as e:
             logger.warning(f"DM-ə müraciət göndərərkən xəta: {e}")
             if user:
-                await context.bot.send_message(
+                await _sender(context).send(
+                    "send_message",
                     chat_id=user.id,
                     text=f"🚫 İmtina səbəbini yazın (ID={app_id}):"
                 )
@@ -866,27 +808,21 @@ async def exec_collect_reply_text(update: Update, context: ContextTypes.DEFAULT_
     app_id = user_data.get("exec_app_id")
     exec_msg_id = user_data.get("exec_msg_id")
     exec_chat_id = user_data.get("exec_chat_id")
-    if not msg or not msg.text or not app_id or not from_user:
+    if not app_id:
+        # Vəziyyət silinib (TTL / LRU) - söhbət bağlanır ki, icraçının mesajları ilişib qalmasın
+        return ConversationHandler.END
+    if not msg or not msg.text or not from_user:
         return States.EXEC_REPLY_TEXT
     text = msg.text.strip()
     try:
-        if USE_SQLITE:
-            from db_sqlite import get_application_by_id_sqlite, update_application_status_sqlite
-            app = get_application_by_id_sqlite(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            await context.bot.send_message(chat_id=app["user_telegram_id"], text=f"✅ Müraciətinizə cavab:\n\n{text}")
-            update_application_status_sqlite(app_id, "completed", notes=f"Replied by @{from_user.username or from_user.id}")
-        else:
-            from db_operations import get_application_by_id, update_application_status, ApplicationStatus
-            app = get_application_by_id(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            await context.bot.send_message(chat_id=app.user_telegram_id, text=f"✅ Müraciətinizə cavab:\n\n{text}")  # type: ignore[arg-type]
-            update_application_status(app_id, ApplicationStatus.COMPLETED, notes=f"Replied by @{from_user.username or from_user.id}", reply_text=text)
-        
+        repo = _repo(context)
+        rec = await repo.get_application_by_id(app_id) if repo is not None else None
+        if repo is None or not rec:
+            await msg.reply_text("❌ Müraciət tapılmadı")
+            return ConversationHandler.END
+        await _sender(context).send("send_message", chat_id=rec.user_telegram_id, text=f"✅ Müraciətinizə cavab:\n\n{text}")
+        await repo.update_application_status(app_id, ApplicationStatus.COMPLETED, notes=f"Replied by @{from_user.username or from_user.id}", reply_text=text)
+
         # Qrup mesajında statusu yenilə və cavabı görünən et
         if exec_msg_id and exec_chat_id:
             try:
@@ -918,15 +854,18 @@ async def exec_collect_reply_text(update: Update, context: ContextTypes.DEFAULT_
                 edit_kb = InlineKeyboardMarkup([
                     [InlineKeyboardButton("✏️ Cavabı düzəlt", callback_data=f"edit_reply:{app_id}")]
                 ])
+                # Qrup mesajının redaktəsi növbəyə qoyulur (eyni mesajın ardıcıl redaktələri birləşir)
                 if has_photo:
-                    await context.bot.edit_message_caption(
+                    _sender(context).submit(
+                        "edit_message_caption",
                         chat_id=exec_chat_id,
                         message_id=exec_msg_id,
                         caption=new_content,
                         reply_markup=edit_kb
                     )
                 else:
-                    await context.bot.edit_message_text(
+                    _sender(context).submit(
+                        "edit_message_text",
                         chat_id=exec_chat_id,
                         message_id=exec_msg_id,
                         text=new_content,
@@ -975,27 +914,14 @@ async def exec_edit_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer("✏️ DM-ə keçin: cavabı yeniləmək üçün mesaj yazın", show_alert=False)
     try:
         # Mövcud cavabı əldə et
-        existing_text: Optional[str] = None
-        if USE_SQLITE:
-            from db_sqlite import get_application_by_id_sqlite
-            app_data = get_application_by_id_sqlite(app_id)
-            if app_data and isinstance(app_data, dict):
-                raw = app_data.get('reply_text')
-                if isinstance(raw, str):
-                    existing_text = raw
-        else:
-            from db_operations import get_application_by_id
-            app = get_application_by_id(app_id)
-            if app:
-                try:
-                    existing_text = app.reply_text  # type: ignore[attr-defined]
-                except Exception:
-                    existing_text = None
+        repo = _repo(context)
+        rec = await repo.get_application_by_id(app_id) if repo is not None else None
+        existing_text: Optional[str] = rec.reply_text if rec else None
         preface = "✏️ Yeni cavabı yazın:"
         if existing_text:
             preface = f"Mövcud cavab:\n\n{existing_text}\n\n✏️ Yeni cavabı yazın:"
         if user:
-            await context.bot.send_message(chat_id=user.id, text=preface)
+            await _sender(context).send("send_message", chat_id=user.id, text=preface)
     except Exception as dm_err:
         logger.warning(f"Edit DM prompt göndərilə bilmədi: {dm_err}")
     return States.EXEC_EDIT_REPLY_TEXT
@@ -1009,27 +935,21 @@ async def exec_collect_edit_reply_text(update: Update, context: ContextTypes.DEF
     app_id = user_data.get("exec_app_id")
     exec_msg_id = user_data.get("exec_msg_id")
     exec_chat_id = user_data.get("exec_chat_id")
-    if not msg or not msg.text or not app_id or not from_user:
+    if not app_id:
+        # Vəziyyət silinib (TTL / LRU) - söhbət bağlanır ki, icraçının mesajları ilişib qalmasın
+        return ConversationHandler.END
+    if not msg or not msg.text or not from_user:
         return States.EXEC_EDIT_REPLY_TEXT
     new_text = msg.text.strip()
     try:
-        if USE_SQLITE:
-            from db_sqlite import get_application_by_id_sqlite, update_application_status_sqlite
-            app = get_application_by_id_sqlite(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            # Vətəndaşa yenilənmiş cavab göndər
-            await context.bot.send_message(chat_id=app["user_telegram_id"], text=f"♻️ Yenilənmiş cavab:\n\n{new_text}")
-            update_application_status_sqlite(app_id, "completed", notes=f"Edited by @{from_user.username or from_user.id}")
-        else:
-            from db_operations import get_application_by_id, update_application_status, ApplicationStatus
-            app = get_application_by_id(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            await context.bot.send_message(chat_id=app.user_telegram_id, text=f"♻️ Yenilənmiş cavab:\n\n{new_text}")  # type: ignore[arg-type]
-            update_application_status(app_id, ApplicationStatus.COMPLETED, notes=f"Edited by @{from_user.username or from_user.id}", reply_text=new_text)
+        repo = _repo(context)
+        rec = await repo.get_application_by_id(app_id) if repo is not None else None
+        if repo is None or not rec:
+            await msg.reply_text("❌ Müraciət tapılmadı")
+            return ConversationHandler.END
+        # Vətəndaşa yenilənmiş cavab göndər
+        await _sender(context).send("send_message", chat_id=rec.user_telegram_id, text=f"♻️ Yenilənmiş cavab:\n\n{new_text}")
+        await repo.update_application_status(app_id, ApplicationStatus.COMPLETED, notes=f"Edited by @{from_user.username or from_user.id}", reply_text=new_text)
 
         # Qrup mesajında cavab mətni hissəsini yenilə
         if exec_msg_id and exec_chat_id:
@@ -1052,9 +972,9 @@ async def exec_collect_edit_reply_text(update: Update, context: ContextTypes.DEF
                 # '✏️ Cavabı düzəlt' düyməsini saxla
                 edit_kb = InlineKeyboardMarkup([[InlineKeyboardButton("✏️ Cavabı düzəlt", callback_data=f"edit_reply:{app_id}")]])
                 if has_photo:
-                    await context.bot.edit_message_caption(chat_id=exec_chat_id, message_id=exec_msg_id, caption=new_content, reply_markup=edit_kb)
+                    _sender(context).submit("edit_message_caption", chat_id=exec_chat_id, message_id=exec_msg_id, caption=new_content, reply_markup=edit_kb)
                 else:
-                    await context.bot.edit_message_text(chat_id=exec_chat_id, message_id=exec_msg_id, text=new_content, reply_markup=edit_kb)
+                    _sender(context).submit("edit_message_text", chat_id=exec_chat_id, message_id=exec_msg_id, text=new_content, reply_markup=edit_kb)
                 # Yeni məzmunu gələcək düzəlişlər üçün yadda saxla
                 user_data["exec_original_content"] = new_content
             except Exception as e2:
@@ -1074,27 +994,21 @@ async def exec_collect_reject_reason(update: Update, context: ContextTypes.DEFAU
     app_id = user_data.get("exec_app_id")
     exec_msg_id = user_data.get("exec_msg_id")
     exec_chat_id = user_data.get("exec_chat_id")
-    if not msg or not msg.text or not app_id or not from_user:
+    if not app_id:
+        # Vəziyyət silinib (TTL / LRU) - söhbət bağlanır ki, icraçının mesajları ilişib qalmasın
+        return ConversationHandler.END
+    if not msg or not msg.text or not from_user:
         return States.EXEC_REJECT_REASON
     reason = msg.text.strip()
     try:
-        if USE_SQLITE:
-            from db_sqlite import get_application_by_id_sqlite, update_application_status_sqlite
-            app = get_application_by_id_sqlite(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            await context.bot.send_message(chat_id=app["user_telegram_id"], text=f"❌ Müraciət rədd edildi. Səbəb:\n\n{reason}")
-            update_application_status_sqlite(app_id, "rejected", notes=f"Rejected by @{from_user.username or from_user.id}: {reason}")
-        else:
-            from db_operations import get_application_by_id, update_application_status, ApplicationStatus
-            app = get_application_by_id(app_id)
-            if not app:
-                await msg.reply_text("❌ Müraciət tapılmadı")
-                return ConversationHandler.END
-            await context.bot.send_message(chat_id=app.user_telegram_id, text=f"❌ Müraciət rədd edildi. Səbəb:\n\n{reason}")  # type: ignore[arg-type]
-            update_application_status(app_id, ApplicationStatus.REJECTED, notes=f"Rejected by @{from_user.username or from_user.id}: {reason}", reply_text=reason)
-        
+        repo = _repo(context)
+        rec = await repo.get_application_by_id(app_id) if repo is not None else None
+        if repo is None or not rec:
+            await msg.reply_text("❌ Müraciət tapılmadı")
+            return ConversationHandler.END
+        await _sender(context).send("send_message", chat_id=rec.user_telegram_id, text=f"❌ Müraciət rədd edildi. Səbəb:\n\n{reason}")
+        await repo.update_application_status(app_id, ApplicationStatus.REJECTED, notes=f"Rejected by @{from_user.username or from_user.id}: {reason}", reply_text=reason)
+
         # Qrup mesajında statusu yenilə (cavab mesajı göstərmə, sadəcə status dəyiş)
         if exec_msg_id and exec_chat_id:
             try:
@@ -1107,13 +1021,15 @@ async def exec_collect_reject_reason(update: Update, context: ContextTypes.DEFAU
                     orig_content
                 )
                 if has_photo:
-                    await context.bot.edit_message_caption(
+                    _sender(context).submit(
+                        "edit_message_caption",
                         chat_id=exec_chat_id,
                         message_id=exec_msg_id,
                         caption=new_content
                     )
                 else:
-                    await context.bot.edit_message_text(
+                    _sender(context).submit(
+                        "edit_message_text",
                         chat_id=exec_chat_id,
                         message_id=exec_msg_id,
                         text=new_content
@@ -1123,30 +1039,17 @@ async def exec_collect_reject_reason(update: Update, context: ContextTypes.DEFAU
         
         # Auto-blacklist qaydası: eyni istifadəçi çox imtina alıbsa qara siyahıya sal
         try:
-            # SQLite dict -> int, PostgreSQL ORM -> primitive int (runtime doğru tipdədir)
-            raw_uid = app["user_telegram_id"] if USE_SQLITE else app.user_telegram_id  # type: ignore[index]
-            target_uid: int = int(raw_uid)  # type: ignore[arg-type]
+            target_uid: int = int(rec.user_telegram_id)
             from config import ADMIN_USER_IDS, BLACKLIST_REJECTION_THRESHOLD, BLACKLIST_WINDOW_DAYS
             if target_uid not in ADMIN_USER_IDS:
-                rej_count = 0
-                if USE_SQLITE:
-                    from db_sqlite import count_user_rejections_sqlite, add_user_to_blacklist_sqlite, is_user_blacklisted_sqlite
-                    rej_count = count_user_rejections_sqlite(target_uid, days=BLACKLIST_WINDOW_DAYS)  # type: ignore[possibly-unbound]
-                    if rej_count >= BLACKLIST_REJECTION_THRESHOLD and not is_user_blacklisted_sqlite(target_uid):  # type: ignore[possibly-unbound]
-                        add_user_to_blacklist_sqlite(target_uid, reason=f"{rej_count} imtina / {BLACKLIST_WINDOW_DAYS} gün")  # type: ignore[possibly-unbound]
-                        try:
-                            await context.bot.send_message(chat_id=target_uid, text="⚠️ Çox sayda imtina səbəbilə müraciətləriniz müvəqqəti qəbul edilmir.")  # type: ignore[arg-type]
-                        except Exception:
-                            pass
-                else:
-                    from db_operations import count_user_rejections, add_user_to_blacklist, is_user_blacklisted
-                    rej_count = count_user_rejections(target_uid, days=BLACKLIST_WINDOW_DAYS)  # type: ignore[possibly-unbound]
-                    if rej_count >= BLACKLIST_REJECTION_THRESHOLD and not is_user_blacklisted(target_uid):  # type: ignore[possibly-unbound]
-                        add_user_to_blacklist(target_uid, reason=f"{rej_count} imtina / {BLACKLIST_WINDOW_DAYS} gün")  # type: ignore[possibly-unbound]
-                        try:
-                            await context.bot.send_message(chat_id=target_uid, text="⚠️ Çox sayda imtina səbəbilə müraciətləriniz müvəqqəti qəbul edilmir.")  # type: ignore[arg-type]
-                        except Exception:
-                            pass
+                rej_count = await repo.count_user_rejections(target_uid, days=BLACKLIST_WINDOW_DAYS)
+                if rej_count >= BLACKLIST_REJECTION_THRESHOLD and not await repo.is_user_blacklisted(target_uid):
+                    await repo.add_user_to_blacklist(target_uid, reason=f"{rej_count} imtina / {BLACKLIST_WINDOW_DAYS} gün")
+                    await _publish_blacklist_change(context)
+                    try:
+                        await _sender(context).send("send_message", chat_id=target_uid, text="⚠️ Çox sayda imtina səbəbilə müraciətləriniz müvəqqəti qəbul edilmir.")
+                    except Exception:
+                        pass
         except Exception as bl_e:
             logger.error(f"Auto-blacklist xətası: {bl_e}")
 
@@ -1175,74 +1078,204 @@ async def chatid_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_message and chat:
         await update.effective_message.reply_text(f"Chat ID: {chat.id}")
 
+def _parse_export_date(value: str) -> datetime:
+    """'2025-01-31' və ya '31.01.2025' formatlı tarixi Bakı gün başlanğıcına çevir"""
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            return BAKU_TZ.localize(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+# /export rejim açar sözləri
+EXPORT_INCREMENTAL_WORDS = {"inc", "yeni"}
+EXPORT_FULL_WORDS = {"full", "tam"}
+
+def _parse_export_args(args: list[str]) -> tuple[str, bool, Optional[datetime], Optional[datetime]]:
+    """/export arqumentləri -> (format, inkremental?, başlanğıc, son - daxil deyil)"""
+    fmt = "csv"
+    incremental = False
+    dates: list[datetime] = []
+    for arg in args:
+        word = arg.lower()
+        if word in EXPORT_INCREMENTAL_WORDS:
+            incremental = True
+        elif word in EXPORT_FULL_WORDS:
+            incremental = False
+        elif word in EXPORT_FORMATS:
+            fmt = word
+        else:
+            dates.append(_parse_export_date(arg))
+    if len(dates) > 2 or (incremental and dates):
+        raise ValueError("arqumentlər")
+    start = dates[0] if dates else None
+    end = dates[1] + timedelta(days=1) if len(dates) == 2 else None
+    return fmt, incremental, start, end
+
+EXPORT_USAGE = (
+    "İstifadə:\n"
+    "/export – bütün müraciətlər\n"
+    "/export inc – son export-dan bəri yeni və dəyişən müraciətlər\n"
+    "/export [başlanğıc] [son] – tarix aralığı (2025-01-31 və ya 31.01.2025)\n"
+    "Format: csv (default, Excel), csv.gz və ya parquet – məs. /export parquet inc"
+)
+
 async def export_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """CSV export - PostgreSQL və SQLite hər ikisində işləyir"""
+    """Export - /export [csv | csv.gz | parquet] [inc | başlanğıc son]; PostgreSQL və SQLite"""
     global ADMIN_USER_IDS
+    msg = update.effective_message
     user_id = getattr(update.effective_user, "id", None)
     if user_id not in ADMIN_USER_IDS:
-        if update.effective_message:
-            await update.effective_message.reply_text("❌ Bu komanda yalnız adminlər üçün açıqdır.")
+        if msg:
+            await msg.reply_text("❌ Bu komanda yalnız adminlər üçün açıqdır.")
         return
-    if not DB_ENABLED:
-        if update.effective_message:
-            await update.effective_message.reply_text("⚠️ Database deaktiv, export mümkün deyil.")
+    repo = _repo(context)
+    if repo is None:
+        if msg:
+            await msg.reply_text("⚠️ Database deaktiv, export mümkün deyil.")
         return
-    
+
     try:
-        csv_content = None
-        
-        if USE_SQLITE:
-            # SQLite JSON export
-            from db_sqlite import export_to_json as sqlite_export_json  # type: ignore[misc]
-            output_file = sqlite_export_json()
-            if update.effective_message:
-                await update.effective_message.reply_text(f"✅ Export hazırdır: {output_file}")
-            return
-        else:
-            # PostgreSQL CSV export
-            from db_operations import export_to_csv  # type: ignore[misc]
-            csv_content = export_to_csv()
-        
-        if csv_content:
-            # CSV-ni fayl olaraq göndər
-            import io
-            csv_file = io.BytesIO(csv_content.encode('utf-8'))
-            csv_file.name = "applications.csv"
-            
-            if update.effective_message:
-                await update.effective_message.reply_document(
-                    document=csv_file,
-                    filename="applications.csv",
-                    caption="📊 Müraciətlər CSV export (PostgreSQL)"
-                )
-                user_id = update.effective_user.id if update.effective_user else "unknown"
-                logger.info(f"✅ CSV export göndərildi. User: {user_id}")
-        else:
-            if update.effective_message:
-                await update.effective_message.reply_text("⚠️ Export ediləcək məlumat yoxdur.")
+        fmt, incremental, start, end = _parse_export_args(context.args or [])
+    except ValueError:
+        if msg:
+            await msg.reply_text(EXPORT_USAGE)
+        return
+    if not format_available(fmt):
+        if msg:
+            await msg.reply_text("⚠️ Parquet export üçün pyarrow quraşdırılmayıb. csv və ya csv.gz istifadə edin.")
+        return
+    ext = EXPORT_FORMATS[fmt][1]
+
+    # Nişan hər admin üçün ayrıca saxlanılır; tarix aralığı export-u nişana toxunmur
+    destination = f"admin:{user_id}"
+    track = start is None and end is None
+    since = await repo.get_export_watermark(destination) if incremental else None
+
+    period, filename_base = "", "applications"
+    if incremental:
+        period = " (yeni/dəyişən)"
+        filename_base += "_inc_" + datetime.now(BAKU_TZ).strftime("%Y%m%d_%H%M")
+    elif start is not None:
+        last_day = end - timedelta(days=1) if end else None
+        period = f" {start:%d.%m.%Y}–{last_day:%d.%m.%Y}" if last_day else f" {start:%d.%m.%Y}-dən"
+        filename_base += f"_{start:%Y%m%d}" + (f"_{last_day:%Y%m%d}" if last_day else "")
+
+    try:
+        tracker = WatermarkTracker(repo.iter_applications(start, end, since=since), since)
+        total = 0
+        part_no = 0
+        async for part, rows in export_parts(tracker, fmt):
+            part_no += 1
+            total += rows
+            with part:
+                filename = f"{filename_base}.{ext}" if part_no == 1 else f"{filename_base}_part{part_no}.{ext}"
+                if msg:
+                    # PTB faylı onsuz da tam oxuyur; yaddaşdakı spool faylının adı olmadığı üçün bayt ötürülür
+                    await msg.reply_document(
+                        document=part.read(),
+                        filename=filename,
+                        caption=f"📊 Müraciətlər {fmt.upper()} export{period} – hissə {part_no}, {rows} müraciət",
+                    )
+        # Nişan yalnız bütün hissələr göndərildikdən sonra irəli çəkilir
+        if track and total:
+            await repo.set_export_watermark(destination, tracker.watermark)
+        if total:
+            logger.info(f"✅ {fmt} export göndərildi. User: {user_id}, {total} müraciət, {part_no} hissə")
+        elif msg:
+            if incremental:
+                await msg.reply_text("✅ Son export-dan bəri yeni və ya dəyişən müraciət yoxdur.")
+            else:
+                await msg.reply_text("⚠️ Export ediləcək məlumat yoxdur.")
     except Exception as e:
         logger.error(f"Export error: {e}", exc_info=True)
-        if update.effective_message:
-            await update.effective_message.reply_text(f"❌ Export xətası: {e}")
+        if msg:
+            await msg.reply_text(f"❌ Export xətası: {e}")
 
 async def ping_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_message:
         await update.effective_message.reply_text("🏓 Pong")
 
+# ================== Outbox (icraçı bildirişləri) ==================
+# Bildiriş müraciətlə eyni tranzaksiyada yazılır və buradan göndərilir: Telegram xətası
+# (timeout, miqrasiya, bot restartı) bildirişi itirmir. Göndərmə "ən azı bir dəfə"dir -
+# mesaj gedib, amma `sent` qeyd olunmadan proses ölsə, lease bitəndən sonra təkrar gedəcək.
+OUTBOX_LEASE_SECONDS = 300
+OUTBOX_RETRY_MAX_SECONDS = 3600
+_outbox_lock = asyncio.Lock()
+
+def _kick_outbox(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """outbox_job-u handler-i gözlətmədən fon task-ı kimi işə sal (JobQueue olmasa da işləyir)"""
+    context.application.create_task(_dispatch_outbox(context), name="executor-dispatch")
+
+async def _dispatch_outbox(context: ContextTypes.DEFAULT_TYPE) -> None:
+    # Fon task-ının xətası handler-ə qayıtmır - burada tutulur və sayılır
+    try:
+        await outbox_job(context)
+    except Exception as e:
+        metrics.counter("executor_dispatch_errors_total", "İcraçı bildiriş task-ının xətaları").inc()
+        logger.error(f"❌ İcraçı bildirişi göndərilmədi (fon task): {e}", exc_info=True)
+
+async def outbox_job(context: ContextTypes.DEFAULT_TYPE):
+    """Outbox-dakı vaxtı çatmış bildirişləri partiya ilə icraçı qrupuna göndər"""
+    repo = _repo(context)
+    if repo is None or not EXECUTOR_CHAT_ID_RT or _outbox_lock.locked():
+        return
+    async with _outbox_lock:
+        while True:
+            try:
+                items = await repo.claim_outbox(OUTBOX_BATCH_SIZE, OUTBOX_LEASE_SECONDS)
+            except Exception as e:
+                metrics.counter("executor_dispatch_errors_total", "İcraçı bildiriş task-ının xətaları").inc()
+                logger.error(f"❌ Outbox oxunmadı: {e}")
+                return
+            if not items:
+                return
+            # Partiya sender növbəsinə birlikdə qoyulur (qrup limiti sender-dədir)
+            delivery = metrics.summary("executor_dispatch_delay_seconds", "Müraciət yazılandan icraçı bildirişinə qədər")
+            futures = [
+                _submit_executor_notification(
+                    context,
+                    f"Sıra №: {item.application_id}\n" + item.payload.get("caption", ""),
+                    item.payload.get("photo"),
+                    _executor_keyboard(item.application_id),
+                )
+                for item in items
+            ]
+            for item, result in zip(items, await asyncio.gather(*futures, return_exceptions=True)):
+                try:
+                    if not isinstance(result, BaseException):
+                        outcome = "sent"
+                        await repo.mark_outbox_sent(item.id)
+                        if item.created_at is not None:
+                            delivery.observe((datetime.now(timezone.utc) - item.created_at).total_seconds())
+                    elif item.attempts >= OUTBOX_MAX_ATTEMPTS:
+                        outcome = "dead"
+                        logger.error(f"❌ Outbox #{item.id} (müraciət {item.application_id}) {item.attempts} cəhddən sonra göndərilmədi: {result}")
+                        await repo.mark_outbox_failed(item.id, str(result), None)
+                    else:
+                        outcome = "retry"
+                        delay = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * 2 ** (item.attempts - 1))
+                        logger.warning(f"⚠️ Outbox #{item.id} göndərilmədi ({result}) - {delay}s sonra təkrar")
+                        await repo.mark_outbox_failed(item.id, str(result), datetime.now(timezone.utc) + timedelta(seconds=delay))
+                    metrics.counter("executor_dispatch_total", "İcraçı bildirişləri", result=outcome).inc()
+                except Exception as e:
+                    # Lease bitəndə sətir yenidən götürüləcək
+                    logger.error(f"❌ Outbox #{item.id} statusu yazılmadı: {e}")
+            if len(items) < OUTBOX_BATCH_SIZE:
+                return
+
 # ================== SLA xatırlatma job ==================
 async def sla_reminder_job(context: ContextTypes.DEFAULT_TYPE):
     """Hər gün SLA aşan müraciətləri yoxla və xatırlatma göndər"""
-    if not DB_ENABLED or not EXECUTOR_CHAT_ID_RT:
+    repo = _repo(context)
+    if repo is None or not EXECUTOR_CHAT_ID_RT:
         return
+    if _shared(context) is not None and not context.bot_data.get("leader"):
+        return  # Scale-out: xatırlatmanı yalnız leader worker göndərir
     
     try:
-        overdue_apps = []
-        if USE_SQLITE:
-            from db_sqlite import get_overdue_applications_sqlite
-            overdue_apps = get_overdue_applications_sqlite(days=3)  # type: ignore[possibly-unbound]
-        else:
-            from db_operations import get_overdue_applications
-            overdue_apps = get_overdue_applications(days=3)  # type: ignore[possibly-unbound]
+        overdue_apps = await repo.get_overdue_applications(days=SLA_DAYS)
         
         if not overdue_apps:
             logger.info("✅ SLA yoxlaması: Köhnə müraciət yoxdur")
@@ -1251,23 +1284,14 @@ async def sla_reminder_job(context: ContextTypes.DEFAULT_TYPE):
         count = len(overdue_apps)
         message = f"⚠️ SLA Xatırlatması\n\n{count} müraciət 3 gündən çoxdur cavabsızdır:\n\n"
         
-        for app in overdue_apps[:10]:  # İlk 10-u göstər
-            if USE_SQLITE:
-                app_id = app["id"]
-                title = (app.get("body") or "")
-                created = app["created_at"]
-            else:
-                app_id = app.id
-                title = app.body
-                # Type ignore for PostgreSQL Column type
-                created = app.created_at.strftime('%d.%m.%Y') if app.created_at is not None else "N/A"  # type: ignore[union-attr]
-            
-            message += f"🆔 {app_id} - {title[:30]}... ({created})\n"
+        for rec in overdue_apps[:10]:  # İlk 10-u göstər
+            created = _fmt_created(rec, '%d.%m.%Y') or "N/A"
+            message += f"🆔 {rec.id} - {rec.body[:30]}... ({created})\n"
         
         if count > 10:
             message += f"\n...və daha {count - 10} müraciət"
         
-        await context.bot.send_message(chat_id=EXECUTOR_CHAT_ID_RT, text=message)
+        await _sender(context).send("send_message", chat_id=EXECUTOR_CHAT_ID_RT, text=message)
         logger.info(f"✅ SLA xatırlatması göndərildi: {count} köhnə müraciət")
     except Exception as e:
         logger.error(f"❌ SLA reminder job xətası: {e}")
@@ -1284,30 +1308,84 @@ async def blacklist_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not _is_admin(uid):
         await update.effective_message.reply_text("❌ İcazə yoxdur")
         return
+    repo = _repo(context)
+    if repo is None:
+        await update.effective_message.reply_text("⚠️ Database deaktivdir")
+        return
     try:
-        if USE_SQLITE:
-            from db_sqlite import list_blacklisted_users_sqlite
-            rows = list_blacklisted_users_sqlite()
-            if not rows:
-                await update.effective_message.reply_text("✅ Qara siyahı boşdur")
-                return
-            text = "🛑 Qara Siyahı:\n\n" + "\n".join([
-                f"• {r['user_telegram_id']} – {r.get('reason','(səbəb yoxdur)')} – {r['created_at']}" for r in rows
-            ])
-        else:
-            from db_operations import list_blacklisted_users
-            rows = list_blacklisted_users()
-            if not rows:
-                await update.effective_message.reply_text("✅ Qara siyahı boşdur")
-                return
-            text = "🛑 Qara Siyahı:\n\n" + "\n".join([
-                f"• {r.user_telegram_id} – {r.reason or '(səbəb yoxdur)'} – {r.created_at.strftime('%d.%m.%Y')}" for r in rows
-            ])
+        rows = await repo.list_blacklisted_users()
+        if not rows:
+            await update.effective_message.reply_text("✅ Qara siyahı boşdur")
+            return
+        text = "🛑 Qara Siyahı:\n\n" + "\n".join([
+            f"• {r.user_telegram_id} – {r.reason or '(səbəb yoxdur)'} – {r.created_at.strftime('%d.%m.%Y') if r.created_at else ''}" for r in rows
+        ])
         await update.effective_message.reply_text(text[:4000])
     except Exception as e:
         logger.error(f"/blacklist xətası: {e}")
         await update.effective_message.reply_text("❌ Xəta baş verdi")
 
+_STATUS_LABELS = {"PENDING": "🟡 Gözləyir", "COMPLETED": "🟢 Cavablandırılıb", "REJECTED": "⚫ İmtina", "PROCESSING": "🔵 İcrada"}
+_FORM_LABELS = {"COMPLAINT": "Şikayət", "SUGGESTION": "Təklif", "APPLICATION": "Ərizə"}
+
+def _fmt_hours(hours: Optional[float]) -> str:
+    if hours is None:
+        return "—"
+    if hours < 48:
+        return f"{hours:.1f} saat"
+    return f"{hours / 24:.1f} gün"
+
+async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin statistikası - yalnız stats_counters cədvəlini oxuyur"""
+    if not update.effective_user or not update.effective_message:
+        return
+    if not _is_admin(update.effective_user.id):
+        await update.effective_message.reply_text("❌ İcazə yoxdur")
+        return
+    repo = _repo(context)
+    if repo is None:
+        await update.effective_message.reply_text("⚠️ Database deaktivdir")
+        return
+    try:
+        today = datetime.now(BAKU_TZ).date()
+        exact, prefixes = stats_counters.counter_keys(today, intake_days=7)
+        summary = stats_counters.summarize(
+            await repo.get_stats_counters(exact, prefixes), today, intake_days=7, sla_days=SLA_DAYS
+        )
+        by_status = " | ".join(
+            f"{label}: {summary.by_status.get(key, 0)}" for key, label in _STATUS_LABELS.items()
+            if key != "PROCESSING" or summary.by_status.get(key)
+        )
+        by_form = ", ".join(f"{label}: {summary.by_form.get(key, 0)}" for key, label in _FORM_LABELS.items())
+        intake = "\n".join(f"• {day}: {count}" for day, count in summary.intake)
+        text = (
+            "📊 Statistika\n\n"
+            f"📥 Cəmi müraciət: {summary.total}\n"
+            f"{by_status}\n"
+            f"📂 Növlər: {by_form}\n\n"
+            f"⏱ Cavab müddəti (n={summary.answered}): median {_fmt_hours(summary.median_hours)}, "
+            f"p95 {_fmt_hours(summary.p95_hours)}\n"
+            f"⏰ SLA aşan ({SLA_DAYS}+ gün): {summary.overdue}\n\n"
+            f"📅 Son 7 gün:\n{intake}"
+        )
+        await update.effective_message.reply_text(text)
+    except Exception as e:
+        logger.error(f"/stats xətası: {e}")
+        await update.effective_message.reply_text("❌ Xəta baş verdi")
+
+async def metrics_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin: handler, DB və Telegram API gecikmələri (p50/p95/p99). /metrics 20 - daha çox sətir"""
+    if not update.effective_user or not update.effective_message:
+        return
+    if not _is_admin(update.effective_user.id):
+        await update.effective_message.reply_text("❌ İcazə yoxdur")
+        return
+    limit = 8
+    if context.args and context.args[0].isdigit():
+        limit = max(1, min(int(context.args[0]), 30))
+    report = format_report(limit)
+    await update.effective_message.reply_text(f"📈 Gecikmələr\n\n{report}" if report else "📈 Hələ ölçü yoxdur")
+
 async def ban_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.effective_user or not update.effective_message:
         return
@@ -1325,19 +1403,16 @@ async def ban_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except ValueError:
         await update.effective_message.reply_text("user_id rəqəm olmalıdır")
         return
+    repo = _repo(context)
+    if repo is None:
+        await update.effective_message.reply_text("⚠️ Database deaktivdir")
+        return
     try:
-        if USE_SQLITE:
-            from db_sqlite import add_user_to_blacklist_sqlite, is_user_blacklisted_sqlite
-            if is_user_blacklisted_sqlite(target_id):
-                await update.effective_message.reply_text("Artıq qara siyahıdadır")
-                return
-            add_user_to_blacklist_sqlite(target_id, reason)
-        else:
-            from db_operations import add_user_to_blacklist, is_user_blacklisted
-            if is_user_blacklisted(target_id):
-                await update.effective_message.reply_text("Artıq qara siyahıdadır")
-                return
-            add_user_to_blacklist(target_id, reason)
+        if await repo.is_user_blacklisted(target_id):
+            await update.effective_message.reply_text("Artıq qara siyahıdadır")
+            return
+        await repo.add_user_to_blacklist(target_id, reason)
+        await _publish_blacklist_change(context)
         await update.effective_message.reply_text(f"✅ {target_id} qara siyahıya əlavə olundu")
     except Exception as e:
         logger.error(f"/ban xətası: {e}")
@@ -1359,19 +1434,16 @@ async def unban_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except ValueError:
         await update.effective_message.reply_text("user_id rəqəm olmalıdır")
         return
+    repo = _repo(context)
+    if repo is None:
+        await update.effective_message.reply_text("⚠️ Database deaktivdir")
+        return
     try:
-        if USE_SQLITE:
-            from db_sqlite import remove_user_from_blacklist_sqlite, is_user_blacklisted_sqlite
-            if not is_user_blacklisted_sqlite(target_id):
-                await update.effective_message.reply_text("Qara siyahıda deyil")
-                return
-            remove_user_from_blacklist_sqlite(target_id)
-        else:
-            from db_operations import remove_user_from_blacklist, is_user_blacklisted
-            if not is_user_blacklisted(target_id):
-                await update.effective_message.reply_text("Qara siyahıda deyil")
-                return
-            remove_user_from_blacklist(target_id)
+        if not await repo.is_user_blacklisted(target_id):
+            await update.effective_message.reply_text("Qara siyahıda deyil")
+            return
+        await repo.remove_user_from_blacklist(target_id)
+        await _publish_blacklist_change(context)
         await update.effective_message.reply_text(f"✅ {target_id} qara siyahıdan silindi")
     except Exception as e:
         logger.error(f"/unban xətası: {e}")
@@ -1411,13 +1483,12 @@ async def confirm_clearall_callback(update: Update, context: ContextTypes.DEFAUL
     if not query.from_user or not _is_admin(query.from_user.id):
         await query.answer("❌ İcazə yoxdur", show_alert=True)
         return
+    repo = _repo(context)
+    if repo is None:
+        await query.answer("⚠️ Database deaktivdir", show_alert=True)
+        return
     try:
-        if USE_SQLITE:
-            from db_sqlite import delete_all_applications_sqlite
-            count = delete_all_applications_sqlite()
-        else:
-            from db_operations import delete_all_applications
-            count = delete_all_applications()
+        count = await repo.delete_all_applications()
         await query.answer()
         await query.edit_message_text(f"✅ {count} müraciət silindi!")
     except Exception as e:
@@ -1431,9 +1502,234 @@ async def cancel_clearall_callback(update: Update, context: ContextTypes.DEFAULT
         await query.answer()
         await query.edit_message_text("❌ Ləğv edildi")
 
-def build_app() -> Application:
+async def blacklist_refresh_job(context: ContextTypes.DEFAULT_TYPE):
+    """Qara siyahı keşini DB ilə sinxronlaşdır (kənardan edilən dəyişikliklər üçün)"""
+    repo = _repo(context)
+    if repo is None:
+        return
+    try:
+        await repo.refresh_blacklist()
+    except Exception as e:
+        logger.warning(f"Qara siyahı keşi yenilənmədi: {e}")
+    # Pəncərədən çıxmış istifadəçiləri yaddaşdan təmizlə
+    repo.rate_limiter.prune()
+
+async def pool_metrics_job(context: ContextTypes.DEFAULT_TYPE):
+    """PostgreSQL connection pool metriklərini loqa yaz (/metrics və Prometheus onları oxunan anda hesablayır)"""
+    line = metrics.format_line("db_pool")
+    if line:
+        logger.info(f"📊 DB pool: {line}")
+
+# ================== Söhbət vəziyyətinin ömrü ==================
+def _sessions(context: ContextTypes.DEFAULT_TYPE) -> SessionStore:
+    return context.bot_data["sessions"]
+
+def _expire_session(application: Application, user_id: int) -> None:
+    # Söhbətin özü (ConversationHandler açarı) conversation_timeout ilə bağlanır
+    application.drop_user_data(user_id)
+
+async def session_touch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Hər update-də istifadəçinin son aktivliyini yenilə (group=-1, digər handler-lərdən əvvəl)"""
+    user = update.effective_user if isinstance(update, Update) else None
+    if user is None:
+        return
+    for user_id in _sessions(context).touch(user.id):
+        _expire_session(context.application, user_id)
+
+async def session_sweep_job(context: ContextTypes.DEFAULT_TYPE):
+    """SESSION_TTL_SECONDS ərzində aktiv olmayan istifadəçilərin user_data-sını sil"""
+    expired = _sessions(context).pop_expired()
+    for user_id in expired:
+        _expire_session(context.application, user_id)
+    if expired:
+        logger.info(f"🧹 {len(expired)} köhnə söhbət vəziyyəti silindi (aktiv: {len(_sessions(context))})")
+
+async def conversation_timed_out(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """ConversationHandler.TIMEOUT - söhbət SESSION_TTL_SECONDS ərzində davam etmədi"""
+    metrics.counter("conversations_timed_out_total", "Vaxtı bitmiş söhbətlər").inc()
+
+# ================== Scale-out (SHARED_STATE) ==================
+# Leader rolu: yalnız bir worker-in işlətdiyi job-lar (SLA xatırlatması, store təmizliyi)
+LEADER_ROLE = "scheduler"
+
+def _conversation_handlers(application: Application) -> list[ConversationHandler]:
+    return [h for h in application.handlers.get(0, []) if isinstance(h, ConversationHandler)]
+
+async def shared_state_load(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Update-dən əvvəl istifadəçinin vəziyyətini ümumi store-dan oxu (group=-2)
+
+    Əvvəlki mesajı başqa worker emal edibsə, yarımçıq anket və söhbət vəziyyəti ondadır.
+    """
+    persistence = context.application.persistence
+    user = update.effective_user if isinstance(update, Update) else None
+    if not isinstance(persistence, SharedPersistence) or user is None:
+        return
+    chat = update.effective_chat
+    handlers = {}
+    for handler in _conversation_handlers(context.application):
+        if handler.per_chat and chat is None:
+            continue
+        key = ((chat.id,) if handler.per_chat else ()) + ((user.id,) if handler.per_user else ())
+        handlers[(handler.name, key)] = handler
+    started = time.perf_counter()
+    try:
+        states = await persistence.load(user.id, _ud(context), list(handlers))
+    except Exception as e:
+        # Store əlçatan deyilsə bu worker-in yerli vəziyyəti ilə davam edirik
+        metrics.counter("shared_state_errors_total", "Ümumi store xətaları", op="load").inc()
+        logger.error(f"❌ Ümumi vəziyyət oxunmadı (user {user.id}): {e}")
+        return
+    metrics.summary("shared_state_load_seconds", "Update-dən əvvəl vəziyyətin oxunması").observe(
+        time.perf_counter() - started
+    )
+    for (name, key), state in states.items():
+        set_conversation_state(handlers[(name, key)], key, state)
+
+async def shared_state_flush(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Update-in dəyişikliklərini dərhal ümumi store-a yaz (group=2, bütün handler-lərdən sonra)"""
+    application = context.application
+    persistence = application.persistence
+    if not isinstance(persistence, SharedPersistence):
+        return
+    user = update.effective_user if isinstance(update, Update) else None
+    if user is not None:
+        # PTB istifadəçini yazılış üçün yalnız bütün qruplardan sonra qeyd edir
+        application.mark_data_for_update_persistence(user_ids=user.id)
+    try:
+        await application.update_persistence()
+        await persistence.write_pending()
+    except Exception as e:
+        # Yazılmayan dəyişikliklər buferdə qalır və növbəti update-də yenidən yazılır
+        metrics.counter("shared_state_errors_total", "Ümumi store xətaları", op="flush").inc()
+        logger.error(f"❌ Ümumi vəziyyət yazılmadı: {e}")
+
+async def _sync_shared_state(application: Application) -> None:
+    """Leader seçimi, icraçı chat ID-si və qara siyahı versiyası - bütün worker-lər üçün"""
+    global EXECUTOR_CHAT_ID_RT
+    shared: Optional[SharedState] = application.bot_data.get("shared")
+    if shared is None:
+        return
+    try:
+        # TTL - leader öləndə rolun nə qədər boş qalacağı (Redis)
+        leader = await shared.try_lead(LEADER_ROLE, ttl_seconds=3 * SHARED_SYNC_SECONDS)
+    except Exception as e:
+        leader = False
+        logger.warning(f"Leader seçimi alınmadı: {e}")
+    if leader != application.bot_data.get("leader"):
+        logger.info("👑 Bu worker leader-dir (SLA xatırlatması)" if leader else "Bu worker leader deyil")
+    application.bot_data["leader"] = leader
+    metrics.gauge("shared_leader", "Bu worker leader-dir (1/0)").set(1 if leader else 0)
+    try:
+        values = await shared.get_many([EXECUTOR_CHAT_KEY, BLACKLIST_VERSION_KEY])
+        chat_id = values.get(EXECUTOR_CHAT_KEY)
+        if chat_id and int(chat_id) != EXECUTOR_CHAT_ID_RT:
+            logger.warning(f"➡️ İcraçı chat ID-si digər worker-dən yeniləndi: {chat_id}")
+            EXECUTOR_CHAT_ID_RT = int(chat_id)
+        version = values.get(BLACKLIST_VERSION_KEY)
+        repo = application.bot_data.get("repo")
+        if version != application.bot_data.get("blacklist_version") and repo is not None:
+            await repo.refresh_blacklist()
+            application.bot_data["blacklist_version"] = version
+        if leader:
+            await shared.purge_expired()
+    except Exception as e:
+        metrics.counter("shared_state_errors_total", "Ümumi store xətaları", op="sync").inc()
+        logger.warning(f"Ümumi vəziyyət sinxronlaşmadı: {e}")
+
+async def shared_sync_job(context: ContextTypes.DEFAULT_TYPE):
+    await _sync_shared_state(context.application)
+
+async def _post_init(application: Application) -> None:
+    """Update qəbulundan əvvəl: bərpa olunmuş söhbətlər, ümumi store, metrik serveri; keşlər fonda"""
+    if application.persistence is not None and application.user_data:
+        # Restartdan əvvəlki söhbətlər də TTL ilə silinsin
+        for user_id in list(application.user_data):
+            application.bot_data["sessions"].touch(user_id)
+        logger.info(f"✅ {len(application.user_data)} istifadəçinin söhbət vəziyyəti bərpa olundu")
+    # Leader və runtime konfiq job-lar başlamazdan əvvəl məlum olsun
+    await _sync_shared_state(application)
+    if METRICS_PORT and RUN_MODE != "webhook":
+        # Webhook rejimində /metrics webhook serverindədir
+        from webserver import start_metrics_server, webhook_available
+        if webhook_available():
+            try:
+                application.bot_data["metrics_server"] = await start_metrics_server(METRICS_LISTEN, METRICS_PORT)
+            except OSError as e:
+                logger.error(f"❌ Metrik serveri başlamadı: {e}")
+    if application.bot_data.get("repo") is not None:
+        # Keşlər fonda yüklənir - update qəbulu DB sorğularını gözləmir. Yüklənənə qədər
+        # qara siyahı və müraciət limiti istifadəçi üzrə DB-dən yoxlanılır
+        application.bot_data["cache_warmup"] = asyncio.create_task(_warm_caches(application), name="cache-warmup")
+
+async def _warm_caches(application: Application) -> None:
+    """Qara siyahı, statistika sayğacları və müraciət limiti pəncərələrini DB-dən yüklə"""
+    repo = application.bot_data["repo"]
+    started = time.perf_counter()
+    try:
+        count = await repo.refresh_blacklist()
+        logger.info(f"✅ Qara siyahı keşi yükləndi: {count} istifadəçi")
+    except Exception as e:
+        # Keş yüklənməsə, yoxlama DB sorğusu ilə davam edir
+        logger.error(f"❌ Qara siyahı keşi yüklənmədi: {e}")
+    try:
+        count = await repo.backfill_stats()
+        if count is not None:
+            logger.info(f"✅ Statistika sayğacları mövcud {count} müraciətdən quruldu")
+    except Exception as e:
+        logger.error(f"❌ Statistika sayğacları qurulmadı: {e}")
+    try:
+        count = await repo.seed_rate_limiter()
+        logger.info(f"✅ Müraciət limiti pəncərələri yükləndi: {count} müraciət")
+    except Exception as e:
+        logger.error(f"❌ Müraciət limiti pəncərələri yüklənmədi: {e}")
+    logger.info(f"✅ Keşlər {time.perf_counter() - started:.2f}s-də yükləndi")
+
+async def _post_shutdown(application: Application) -> None:
+    """Bot dayananda çıxan mesaj növbəsini boşalt və async DB connection pool-larını bağla"""
+    warmup = application.bot_data.get("cache_warmup")
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    sender = application.bot_data.get("sender")
+    if sender is not None:
+        await sender.stop()
+    metrics_server = application.bot_data.get("metrics_server")
+    if metrics_server is not None:
+        await metrics_server.cleanup()
+    shared = application.bot_data.get("shared")
+    if shared is not None:
+        # Leader lock-u buraxılsın ki, digər worker dərhal götürsün
+        try:
+            await shared.close()
+        except Exception as e:
+            logger.warning(f"Ümumi store bağlanmadı: {e}")
+    if DB_ENABLED:
+        try:
+            await db_async.dispose_async_engines()
+        except Exception as e:
+            logger.warning(f"Async engine bağlanmadı: {e}")
+
+def build_app(request: Optional[BaseRequest] = None) -> Application:
+    """Handler-lərlə Application; `request` - Bot API backend-i (yük testi saxta backend verir)"""
     if not BOT_TOKEN:
         raise RuntimeError("BOT_TOKEN təyin edilməyib. .env faylını yoxlayın.")
+    # Scale-out: vəziyyət worker-lərin ümumi store-unda (bax: shared_state.py)
+    shared = None
+    if SHARED_STATE:
+        if SHARED_STATE == "postgres" and (not DB_ENABLED or USE_SQLITE):
+            raise RuntimeError("SHARED_STATE=postgres PostgreSQL tələb edir (SQLite fallback bir neçə worker-lə işləmir)")
+        shared = create_shared_state(SHARED_STATE, REDIS_URL)
+    # Yarımçıq anketlər restartdan sonra davam etsin (PERSISTENCE_PATH boşdursa söndürülür)
+    if shared is not None:
+        persistence = SharedPersistence(shared, ttl_seconds=SESSION_TTL_SECONDS)
+    elif PERSISTENCE_PATH:
+        persistence = SqlitePersistence(
+            PERSISTENCE_PATH, update_interval=PERSISTENCE_UPDATE_SECONDS, max_age_seconds=SESSION_TTL_SECONDS
+        )
+    else:
+        persistence = None
+    # Scale-out-da söhbətin ömrünü store-dakı TTL idarə edir: yerli timeout job-u
+    # istifadəçi başqa worker-də davam edəndə onun vəziyyətini silərdi
+    conversation_timeout = None if shared is not None else SESSION_TTL_SECONDS
     conv = ConversationHandler(
         entry_points=[CommandHandler("start", start)],
         states={
@@ -1447,19 +1743,46 @@ def build_app() -> Application:
             States.SUBJECT: [MessageHandler(filters.TEXT & ~filters.COMMAND, collect_subject)],
             States.BODY: [MessageHandler(filters.TEXT & ~filters.COMMAND, collect_body)],
             States.CONFIRM: [CallbackQueryHandler(confirm_or_edit)],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, conversation_timed_out)],
         },
         fallbacks=[CommandHandler("help", help_cmd)],
         allow_reentry=True,
+        name="intake",
+        persistent=persistence is not None,
+        conversation_timeout=conversation_timeout,
     )
-    app = (
+    builder = (
         ApplicationBuilder()
         .token(BOT_TOKEN)
-        .connect_timeout(30.0)
-        .read_timeout(30.0)
-        .write_timeout(30.0)
-        .pool_timeout(30.0)
-        .build()
+        # Bot API sorğularının müddəti metod üzrə ölçülür (bax: instrumentation.py)
+        .request(request or InstrumentedRequest(
+            connection_pool_size=256,
+            connect_timeout=30.0,
+            read_timeout=30.0,
+            write_timeout=30.0,
+            pool_timeout=30.0,
+        ))
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
     )
+    if persistence is not None:
+        builder = builder.persistence(persistence)
+    app = builder.build()
+    app.bot_data["sender"] = OutboundSender(
+        app.bot,
+        global_per_second=OUTBOUND_GLOBAL_PER_SECOND,
+        chat_per_second=OUTBOUND_CHAT_PER_SECOND,
+        group_per_minute=OUTBOUND_GROUP_PER_MINUTE,
+        max_retries=OUTBOUND_MAX_RETRIES,
+        workers=OUTBOUND_WORKERS,
+        on_chat_migrated=functools.partial(_on_chat_migrated, app),
+    )
+    app.bot_data["sessions"] = SessionStore(SESSION_TTL_SECONDS, SESSION_MAX_USERS)
+    if shared is not None:
+        app.bot_data["shared"] = shared
+        app.add_handler(TypeHandler(Update, shared_state_load), group=-2)
+        app.add_handler(TypeHandler(Update, shared_state_flush), group=2)
+    app.add_handler(TypeHandler(Update, session_touch), group=-1)
     app.add_handler(conv)
     # Global error handler
     app.add_error_handler(error_handler)
@@ -1468,31 +1791,43 @@ def build_app() -> Application:
         entry_points=[CallbackQueryHandler(exec_reply_entry, pattern=r"^exec_reply:\d+$")],
         states={
             States.EXEC_REPLY_TEXT: [MessageHandler(filters.TEXT & ~filters.COMMAND, exec_collect_reply_text)],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, conversation_timed_out)],
         },
         fallbacks=[],
         allow_reentry=False,
         per_chat=False,
         per_user=True,
+        name="exec_reply",
+        persistent=persistence is not None,
+        conversation_timeout=conversation_timeout,
     )
     exec_conv_reject = ConversationHandler(
         entry_points=[CallbackQueryHandler(exec_reject_entry, pattern=r"^exec_reject:\d+$")],
         states={
             States.EXEC_REJECT_REASON: [MessageHandler(filters.TEXT & ~filters.COMMAND, exec_collect_reject_reason)],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, conversation_timed_out)],
         },
         fallbacks=[],
         allow_reentry=False,
         per_chat=False,
         per_user=True,
+        name="exec_reject",
+        persistent=persistence is not None,
+        conversation_timeout=conversation_timeout,
     )
     exec_conv_edit = ConversationHandler(
         entry_points=[CallbackQueryHandler(exec_edit_entry, pattern=r"^edit_reply:\d+$")],
         states={
             States.EXEC_EDIT_REPLY_TEXT: [MessageHandler(filters.TEXT & ~filters.COMMAND, exec_collect_edit_reply_text)],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, conversation_timed_out)],
         },
         fallbacks=[],
         allow_reentry=False,
         per_chat=False,
         per_user=True,
+        name="exec_edit",
+        persistent=persistence is not None,
+        conversation_timeout=conversation_timeout,
     )
     app.add_handler(exec_conv_reply)
     app.add_handler(exec_conv_reject)
@@ -1502,6 +1837,8 @@ def build_app() -> Application:
     app.add_handler(CommandHandler("export", export_cmd))
     app.add_handler(CommandHandler("ping", ping_cmd))
     app.add_handler(CommandHandler("blacklist", blacklist_cmd))
+    app.add_handler(CommandHandler("stats", stats_cmd))
+    app.add_handler(CommandHandler("metrics", metrics_cmd))
     app.add_handler(CommandHandler("ban", ban_cmd))
     app.add_handler(CommandHandler("unban", unban_cmd))
     app.add_handler(CommandHandler("clearall", clearall_cmd))
@@ -1511,15 +1848,44 @@ def build_app() -> Application:
     # Kanal postu aşkarlandıqda məlumat verən sadə universal handler
     async def on_any_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.channel_post and update.effective_chat:
-            try:
-                await context.bot.send_message(chat_id=update.effective_chat.id, text="Zəhmət olmasa bot-a birbaşa mesaj yazın: /start")
-            except Exception:
-                pass
+            # Sender limitlərindən keçir; nəticə gözlənilmir (xəta sender-də loqlanır)
+            _sender(context).submit("send_message", chat_id=update.effective_chat.id, text="Zəhmət olmasa bot-a birbaşa mesaj yazın: /start")
     # Qrup=1 ilə əlavə edirik ki, əsas command-lardan sonra yoxlanılsın
     app.add_handler(MessageHandler(filters.ALL, on_any_update), group=1)
     app.add_handler(MessageHandler(filters.COMMAND, unknown))
+    # Bütün handler-lər qeyd olunandan sonra: gecikmə histogramları, xətalar, icrada olanlar
+    instrument_handlers(app)
+    if DB_ENABLED:
+        instrument_module(db_async)
+        if QUERY_BUDGET:
+            import query_budget
+            query_budget.wrap_handlers(
+                app, "sqlite" if USE_SQLITE else "postgres", strict=QUERY_BUDGET == "strict"
+            )
+            logger.info(f"🔎 SQL büdcəsi yoxlanılır ({QUERY_BUDGET})")
     return app
 
+def schedule_jobs(app: Application) -> None:
+    """Periodik job-lar: SLA xatırlatması, söhbət TTL-i, qara siyahı, outbox, pool metrikləri"""
+    job_queue = app.job_queue
+    if job_queue is None:
+        # Outbox təkrarları və söhbət TTL-i JobQueue-suz işləmir - səssizcə davam etmə
+        logger.error("❌ JobQueue yoxdur: pip install \"python-telegram-bot[job-queue]\"")
+        raise RuntimeError("python-telegram-bot[job-queue] quraşdırılmayıb")
+    # SLA xatırlatma job-u (hər gün səhər 09:00-da)
+    from datetime import time
+    job_queue.run_daily(sla_reminder_job, time=time(hour=9, minute=0, tzinfo=BAKU_TZ))
+    logger.info("✅ SLA xatırlatma job-u quruldu (hər gün 09:00)")
+    job_queue.run_repeating(session_sweep_job, interval=SESSION_SWEEP_SECONDS, first=SESSION_SWEEP_SECONDS)
+    if DB_ENABLED:
+        job_queue.run_repeating(blacklist_refresh_job, interval=BLACKLIST_REFRESH_SECONDS, first=BLACKLIST_REFRESH_SECONDS)
+        # Startda qalmış (əvvəlki instansiyanın göndərmədiyi) bildirişlər də buradan gedir
+        job_queue.run_repeating(outbox_job, interval=OUTBOX_POLL_SECONDS, first=1)
+    if SHARED_STATE:
+        job_queue.run_repeating(shared_sync_job, interval=SHARED_SYNC_SECONDS, first=SHARED_SYNC_SECONDS)
+    if DB_ENABLED and not USE_SQLITE and DB_POOL_METRICS_SECONDS > 0:
+        job_queue.run_repeating(pool_metrics_job, interval=DB_POOL_METRICS_SECONDS, first=DB_POOL_METRICS_SECONDS)
+
 def main():
     global USE_SQLITE, DB_ENABLED  # global-lar başda elan
     # Database-i initialize et (PostgreSQL və ya SQLite)
@@ -1529,22 +1895,15 @@ def main():
                 init_sqlite_db()  # type: ignore[possibly-unbound]
                 logger.info("✅ SQLite database hazırdır (fallback mode)")
             else:
-                init_db()  # type: ignore[possibly-unbound]
+                from db_operations import init_db
+                init_db()
                 logger.info("✅ PostgreSQL database hazırdır")
         except Exception as e:
             logger.error(f"❌ Database initialization error: {e}")
             # Runtime zamanı PostgreSQL alınmadısa, SQLite-a keçid et
             if not USE_SQLITE:
                 try:
-                    from db_sqlite import (
-                        save_application_sqlite as _save_application_sqlite,
-                        init_sqlite_db as _init_sqlite_db,
-                        export_to_json as _sqlite_export_json,
-                    )
-                    # Moduldaxili adları dinamik mənimsət
-                    globals()["save_application_sqlite"] = _save_application_sqlite
-                    globals()["init_sqlite_db"] = _init_sqlite_db
-                    globals()["sqlite_export_json"] = _sqlite_export_json
+                    from db_sqlite import init_sqlite_db as _init_sqlite_db
                     _init_sqlite_db()
                     USE_SQLITE = True
                     DB_ENABLED = True
@@ -1557,18 +1916,27 @@ def main():
                 logger.warning("⚠️ Bot DB-siz işləyəcək")
     
     app = build_app()
+    # Repository bir dəfə seçilir; handler-lər onu bot_data-dan götürür
+    if DB_ENABLED:
+        app.bot_data["repo"] = create_repository(use_sqlite=USE_SQLITE)
+        logger.info(f"✅ Repository: {app.bot_data['repo'].name}")
     
-    # SLA xatırlatma job-u qur (hər gün səhər 09:00-da)
-    job_queue = app.job_queue
-    if job_queue:
-        from datetime import time
-        job_queue.run_daily(sla_reminder_job, time=time(hour=9, minute=0, tzinfo=BAKU_TZ))
-        logger.info("✅ SLA xatırlatma job-u quruldu (hər gün 09:00)")
+    schedule_jobs(app)
     
+    if SHARED_STATE:
+        logger.info(f"✅ Scale-out rejimi: ümumi vəziyyət {SHARED_STATE}-da")
+        if RUN_MODE != "webhook":
+            logger.warning("⚠️ SHARED_STATE polling ilə bir neçə worker-i mümkün etmir - RUN_MODE=webhook istifadə edin")
     logger.info("🚀 DSMF Bot işə başlayır... (Bakı vaxtı)")
     logger.info(f"⏰ Start time: {datetime.now(BAKU_TZ).strftime('%d.%m.%Y %H:%M:%S')}")
     
     try:
+        if RUN_MODE == "webhook":
+            from webserver import run_webhook, webhook_available
+            if webhook_available():
+                asyncio.run(run_webhook(app))
+                return
+            logger.error("❌ RUN_MODE=webhook, amma aiohttp quraşdırılmayıb - polling rejiminə keçilir")
         # drop_pending_updates=True – əvvəlki instansiyadan qalan uzun polling sorğularını təmizləyir
         app.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
     except KeyboardInterrupt:
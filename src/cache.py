@@ -0,0 +1,79 @@
+"""
+Proses daxili keşlər (repository qatı tərəfindən istifadə olunur)
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+import metrics
+
+
+class BlacklistCache:
+    """Qara siyahıdakı istifadəçi ID-lərinin set-i.
+
+    Startup-da `blacklisted_users` cədvəlindən yüklənir, ban/unban zamanı yerində
+    yenilənir (write-through) və periodik olaraq DB-dən təzələnir.
+    """
+
+    def __init__(self) -> None:
+        self._ids: set[int] = set()
+        self.loaded = False
+
+    def replace(self, user_ids: Iterable[int]) -> None:
+        # Yeni set qurub bir dəfəyə dəyişirik ki, yoxlamalar yarımçıq set görməsin
+        self._ids = {int(uid) for uid in user_ids}
+        self.loaded = True
+
+    def add(self, user_telegram_id: int) -> None:
+        self._ids.add(int(user_telegram_id))
+
+    def discard(self, user_telegram_id: int) -> None:
+        self._ids.discard(int(user_telegram_id))
+
+    def __contains__(self, user_telegram_id: object) -> bool:
+        return user_telegram_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class AppealCache:
+    """Müraciət ID -> record, qısa ömürlü (TTL + LRU limit).
+
+    İcraçının cavab/imtina axını eyni müraciəti bir neçə dəfə oxuyur (qrup düyməsi,
+    DM deep link, cavab mətni). İlk oxunuşdan sonra record burada saxlanılır,
+    status dəyişəndə yenilənmiş sətirlə əvəz olunur.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[int, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, app_id: int) -> Optional[Any]:
+        entry = self._items.get(app_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._items[app_id]
+            metrics.counter("appeal_cache_total", "Müraciət keşinə müraciətlər", result="miss").inc()
+            return None
+        self._items.move_to_end(app_id)
+        metrics.counter("appeal_cache_total", "Müraciət keşinə müraciətlər", result="hit").inc()
+        return entry[1]
+
+    def put(self, app_id: int, record: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._items[app_id] = (time.monotonic() + self.ttl, record)
+        self._items.move_to_end(app_id)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def invalidate(self, app_id: int) -> None:
+        self._items.pop(app_id, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
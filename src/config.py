@@ -89,6 +89,79 @@ MAX_MONTHLY_SUBMISSIONS = 3  # İstifadəçi 30 gün ərzində max 3 müraciət
 BLACKLIST_REJECTION_THRESHOLD = 5  # Son pəncərədə bu qədər imtina olarsa
 BLACKLIST_WINDOW_DAYS = 30         # bu qədər gün ərzində
 
+# SLA - bu qədər gündən çox cavabsız qalan müraciət gecikmiş sayılır (xatırlatma və /stats)
+SLA_DAYS = 3
+# Qara siyahı keşinin DB-dən təzələnmə intervalı (kənardan edilən dəyişikliklər üçün)
+BLACKLIST_REFRESH_SECONDS = int(os.getenv("BLACKLIST_REFRESH_SECONDS", "300"))
+# İcraçı axınında oxunan müraciətlərin keşi (bax: cache.AppealCache), 0 - söndür
+APPEAL_CACHE_TTL_SECONDS = int(os.getenv("APPEAL_CACHE_TTL_SECONDS", "600"))
+APPEAL_CACHE_MAX = int(os.getenv("APPEAL_CACHE_MAX", "1000"))
+
+# PostgreSQL connection pool (bax: db_pool.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))      # pool-dan connection gözləmə (s)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # bu qədər saniyədən köhnə connection yenilənir
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle").lower()           # always | idle | off
+DB_PING_IDLE_SECONDS = int(os.getenv("DB_PING_IDLE_SECONDS", "60"))  # "idle": yalnız bu qədər boş qalandan sonra ping
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 - limitsiz
+DB_POOL_METRICS_SECONDS = int(os.getenv("DB_POOL_METRICS_SECONDS", "300"))  # pool metriklərinin loq intervalı, 0 - söndür
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "5000"))  # miqrasiya DDL-i cədvəl kilidini ən çox bu qədər gözləyir
+
+# Update qəbulu: "polling" (default) və ya "webhook" (bax: webserver.py)
+RUN_MODE = os.getenv("RUN_MODE", "polling").lower()
+# Telegram-ın müraciət edəcəyi ictimai ünvan; Railway-də RAILWAY_PUBLIC_DOMAIN-dən götürülür.
+# Boşdursa set_webhook çağırılmır (lokal test: update-lər əl ilə POST edilir)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/") or (
+    f"https://{os.getenv('RAILWAY_PUBLIC_DOMAIN')}" if os.getenv("RAILWAY_PUBLIC_DOMAIN") else ""
+)
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")  # boşdursa BOT_TOKEN-dən törədilir
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# Polling rejimində /metrics üçün lokal HTTP port (0 - söndür; webhook rejimində /metrics webhook serverindədir)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+# Handler başına SQL büdcəsinin yoxlanması (bax: query_budget.py): "" (söndür), warn, strict
+QUERY_BUDGET = os.getenv("QUERY_BUDGET", "").lower()
+
+# Çıxan mesaj növbəsi (bax: sender.py). Telegram limitləri: ümumi ~30 mesaj/s,
+# bir çata ~1 mesaj/s, qrupa 20 mesaj/dəq
+OUTBOUND_GLOBAL_PER_SECOND = float(os.getenv("OUTBOUND_GLOBAL_PER_SECOND", "25"))
+OUTBOUND_CHAT_PER_SECOND = float(os.getenv("OUTBOUND_CHAT_PER_SECOND", "1"))
+OUTBOUND_GROUP_PER_MINUTE = float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", "20"))
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "5"))
+OUTBOUND_WORKERS = int(os.getenv("OUTBOUND_WORKERS", "8"))
+
+# İcraçı bildirişlərinin outbox-u (bax: bot.outbox_job). Uğursuz göndərmə
+# OUTBOX_RETRY_BASE_SECONDS * 2^n (max 1 saat) sonra təkrarlanır
+OUTBOX_POLL_SECONDS = int(os.getenv("OUTBOX_POLL_SECONDS", "10"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+
+# Söhbət vəziyyəti (bax: session_store.py): bu qədər aktiv olmayan istifadəçinin
+# yarımçıq anketi / icraçı vəziyyəti silinir, yaddaşda ən çox SESSION_MAX_USERS istifadəçi
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(3 * 3600)))
+SESSION_MAX_USERS = int(os.getenv("SESSION_MAX_USERS", "20000"))
+SESSION_SWEEP_SECONDS = int(os.getenv("SESSION_SWEEP_SECONDS", "300"))
+
+# Söhbət vəziyyətinin diskdə saxlanılması (bax: persistence.py). Boş - söndürülür.
+# Railway-də redeploy-dan sağ çıxması üçün volume-da olmalıdır
+PERSISTENCE_PATH = os.getenv("PERSISTENCE_PATH", "data/bot_state.db")
+PERSISTENCE_UPDATE_SECONDS = float(os.getenv("PERSISTENCE_UPDATE_SECONDS", "10"))
+
+# Scale-out (bax: shared_state.py): bir webhook arxasında bir neçə worker. Boş - tək proses.
+# "postgres" - shared_state cədvəli + advisory lock, "redis" - REDIS_URL (Redis-uyğun store)
+SHARED_STATE = os.getenv("SHARED_STATE", "").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Leader seçimi, runtime konfiq və qara siyahı versiyasının yoxlanma intervalı
+SHARED_SYNC_SECONDS = int(os.getenv("SHARED_SYNC_SECONDS", "5"))
+
+# Export - Telegram bot API fayl limiti 50 MB-dır, böyük export bir neçə hissəyə bölünür
+EXPORT_PART_MAX_BYTES = int(os.getenv("EXPORT_PART_MAX_BYTES", str(45 * 1024 * 1024)))
+
 # Mətnlər (Azərbaycan dili)
 MESSAGES = {
     "welcome": (
@@ -114,8 +187,13 @@ MESSAGES = {
     ),
     "success": "",
     "cancelled": "❌ Müraciət ləğv edildi",
+    "session_expired": "⏳ Müraciətin vaxtı bitdi. Zəhmət olmasa /start ilə yenidən başlayın.",
     "help": "ℹ️ /start ilə yeni müraciət göndərə bilərsiniz. /chatid ilə bu qrup/kanalın ID-sini görə bilərsiniz.",
     "unknown": "⚠️ Anlaşılmadı. Zəhmət olmasa /start yazın.",
+    "daily_limit_exceeded": (
+        "⚠️ Son 24 saatda artıq {limit} müraciət göndərmisiniz. "
+        "Zəhmət olmasa bir az sonra yenidən cəhd edin."
+    ),
     "monthly_limit_exceeded": (
         "⚠️ Bu ay artıq {limit} müraciət göndərmisiniz. "
         "Daha çox müraciət etmək üçün bir az gözləyin və ya əvvəlki cavabları yoxlayın."
@@ -10,7 +10,9 @@ from sqlalchemy import (
     Text,
     DateTime,
     BigInteger,
-    Enum as SQLEnum
+    Enum as SQLEnum,
+    Index,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -28,6 +30,62 @@ class BlacklistedUser(Base):
     def __repr__(self):
         return f"<BlacklistedUser(user_telegram_id={self.user_telegram_id})>"
 
+class ExportWatermark(Base):
+    """İnkremental export üçün son export olunmuş sətrin nişanı (admin/təyinat üzrə)"""
+    __tablename__ = "export_watermarks"
+    destination = Column(String(64), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    last_updated_at = Column(DateTime, nullable=True)
+    exported_at = Column(DateTime, nullable=False, default=datetime.now)
+    def __repr__(self):
+        return f"<ExportWatermark(destination={self.destination}, last_id={self.last_id})>"
+
+class StatsCounter(Base):
+    """/stats üçün əvvəlcədən hesablanmış sayğac (bax: stats.py)"""
+    __tablename__ = "stats_counters"
+    key = Column(String(64), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    def __repr__(self):
+        return f"<StatsCounter({self.key}={self.value})>"
+
+class OutboxMessage(Base):
+    """Göndərilməli bildiriş - müraciətlə eyni tranzaksiyada yazılır, job göndərir (bax: bot.outbox_job)"""
+    __tablename__ = "outbox"
+    __table_args__ = (
+        # claim_outbox: status + next_attempt_at üzrə vaxtı çatmış sətirlər
+        Index("ix_outbox_due", "status", "next_attempt_at"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(100), nullable=False, unique=True)  # məs. "executor_notify:42"
+    kind = Column(String(50), nullable=False)
+    application_id = Column(Integer, nullable=True, index=True)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="pending")  # pending / sent / dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)  # UTC
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)  # UTC
+    sent_at = Column(DateTime, nullable=True)
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, key={self.idempotency_key}, status={self.status})>"
+
+class SharedStateEntry(Base):
+    """Scale-out rejimində worker-lərin ümumi açar/dəyər store-u (bax: shared_state.py)"""
+    __tablename__ = "shared_state"
+    key = Column(String(200), primary_key=True)  # məs. "ud:123", "conv:intake:[1,1]", "config:executor_chat_id"
+    value = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=True, index=True)  # UTC; NULL - müddətsiz
+    def __repr__(self):
+        return f"<SharedStateEntry(key={self.key})>"
+
+class SchemaVersion(Base):
+    """Tətbiq olunmuş miqrasiya versiyaları - startup bir sorğu ilə yoxlayır (bax: migrator.py)"""
+    __tablename__ = "schema_version"
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    applied_at = Column(DateTime, nullable=False, default=datetime.now)
+    def __repr__(self):
+        return f"<SchemaVersion({self.version})>"
+
 class ApplicationStatus(str, enum.Enum):
     PENDING = "waiting"        # 🟡 Gözləyir
     PROCESSING = "processing"  # (istifadə edilmir)
@@ -39,9 +97,23 @@ class FormTypeDB(str, enum.Enum):
     SUGGESTION = "suggestion"
     APPLICATION = "application"
 
+# Açıq (cavab gözləyən) müraciətlər. PostgreSQL enum adlarını, SQLite isə kiçik hərfli
+# dəyərləri saxlayır. Partial index və SLA sorğusu eyni literal predikatı istifadə edir ki,
+# planner (prepared statement-lərdə də) indeksi seçə bilsin.
+OPEN_STATUS_PREDICATE_PG = "status IN ('PENDING', 'PROCESSING')"
+OPEN_STATUS_PREDICATE_SQLITE = "status IN ('pending', 'processing')"
+
 class Application(Base):
     """Vətəndaş müraciəti"""
     __tablename__ = "applications"
+    __table_args__ = (
+        # count_user_rejections: user + status + created_at
+        Index("ix_applications_user_status_created", "user_telegram_id", "status", "created_at"),
+        # count_user_recent_applications / rate limiter: user + created_at
+        Index("ix_applications_user_created", "user_telegram_id", "created_at"),
+        # get_overdue_applications: yalnız açıq müraciətlər, created_at üzrə
+        Index("ix_applications_open_created", "created_at", postgresql_where=text(OPEN_STATUS_PREDICATE_PG)),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -64,7 +136,7 @@ class Application(Base):
     
     # Timestamps (Bakı vaxtı)
     created_at = Column(DateTime, nullable=False, index=True)
-    updated_at = Column(DateTime, nullable=False, onupdate=datetime.now)
+    updated_at = Column(DateTime, nullable=False, onupdate=datetime.now, index=True)
     
     def __repr__(self):
         return f"<Application(id={self.id}, fin={self.fin}, status={self.status})>"
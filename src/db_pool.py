@@ -0,0 +1,124 @@
+"""
+PostgreSQL connection pool ayarları və metrikləri
+
+Pool ölçüsü, overflow, recycle, ping strategiyası və statement timeout env-dən
+gəlir (config.py). Ping strategiyaları:
+- `always` - hər checkout-da ping (SQLAlchemy `pool_pre_ping`)
+- `idle` - yalnız `DB_PING_IDLE_SECONDS`-dən çox boş qalmış connection ping olunur
+- `off` - ping yoxdur, köhnə connection-lar yalnız `pool_recycle` ilə yenilənir
+
+Metriklər (`metrics.py`, `engine` label-i ilə): checkout/connect/invalidation
+sayları, ping sayı, pool-dan connection gözləmə vaxtı, timeout-lar, istifadədə
+olan connection-lar və overflow.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+import metrics
+from config import (
+    DB_MAX_OVERFLOW,
+    DB_PING_IDLE_SECONDS,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+    logger,
+)
+
+
+class _WaitTimingMixin:
+    """Pool-dan connection götürmə vaxtını ölçür (növbə gözləməsi + yeni connection)"""
+    metrics_label = ""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            metrics.counter("db_pool_timeouts_total", "Pool gözləmə timeout-ları", engine=self.metrics_label).inc()
+            raise
+        finally:
+            metrics.summary(
+                "db_pool_wait_seconds", "Pool-dan connection götürmə vaxtı", engine=self.metrics_label
+            ).observe(time.perf_counter() - t0)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    metrics_label = "pg_sync"
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    metrics_label = "pg_async"
+
+
+def engine_kwargs(async_driver: bool) -> dict:
+    """create_engine / create_async_engine üçün pool parametrləri"""
+    kwargs = {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_PRE_PING == "always",
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if async_driver:
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Pool event-lərinə metrik və "idle" ping strategiyasını bağla"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    checkouts = metrics.counter("db_pool_checkouts_total", "Pool checkout sayı", engine=label)
+    connects = metrics.counter("db_pool_connects_total", "Yeni DB connection sayı", engine=label)
+    invalidations = metrics.counter("db_pool_invalidations_total", "Etibarsız sayılan connection-lar", engine=label)
+    pings = metrics.counter("db_pool_pings_total", "Checkout zamanı edilən ping-lər", engine=label)
+    metrics.gauge("db_pool_checked_out", "İstifadədə olan connection-lar", engine=label).set_function(
+        lambda: sync_engine.pool.checkedout()
+    )
+    metrics.gauge("db_pool_overflow", "Pool ölçüsündən artıq açılmış connection-lar", engine=label).set_function(
+        lambda: max(0, sync_engine.pool.overflow())
+    )
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, record):
+        connects.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, record):
+        record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy):
+        checkouts.inc()
+        if DB_PRE_PING != "idle":
+            return
+        last = record.info.get("last_checkin")
+        if last is None or time.monotonic() - last < DB_PING_IDLE_SECONDS:
+            return
+        pings.inc()
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # Pool connection-u atıb yenisini açacaq
+            raise DisconnectionError(f"ping uğursuz: {e}") from e
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, record, exception):
+        invalidations.inc()
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, record, exception):
+        invalidations.inc()
+
+    logger.info(
+        f"DB pool ({label}): size={DB_POOL_SIZE} overflow={DB_MAX_OVERFLOW} recycle={DB_POOL_RECYCLE}s "
+        f"pre_ping={DB_PRE_PING} statement_timeout={DB_STATEMENT_TIMEOUT_MS or '-'}ms"
+    )
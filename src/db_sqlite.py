@@ -1,78 +1,92 @@
 """
 SQLite fallback database - PostgreSQL işləməzsə
+
+Hər thread bir daimi connection istifadə edir (WAL + pragmalar bir dəfə qurulur,
+sqlite3-ün hazır sorğu keşi connection ilə birlikdə yaşayır).
 """
 import sqlite3
+import threading
 from typing import Optional
-import json
 import os
 from datetime import datetime
 from contextlib import contextmanager
 from config import logger, BAKU_TZ
 
 SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/applications.db")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+# sqlite3 hər connection üçün hazırlanmış (prepared) sorğuları SQL mətni ilə keşləyir
+SQLITE_STATEMENT_CACHE = 256
+
+# Hər yeni connection-da icra olunur (aiosqlite engine-i də bunları istifadə edir).
+# WAL: oxucular yazanı gözləmir; synchronous=NORMAL: WAL-da commit zamanı fsync yoxdur,
+# yalnız checkpoint-də (elektrik kəsilsə son commit itə bilər, DB pozulmur).
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_local = threading.local()
+# Diaqnostika: yeni connection-lara qoşulan sqlite3 trace callback-i (bax: query_budget.py)
+_trace_callback = None
+
+
+def apply_sqlite_pragmas(conn) -> None:
+    """Connection-a SQLITE_PRAGMAS tətbiq et"""
+    cursor = conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
 
 def init_sqlite_db():
-    """SQLite database və cədvəllər yarat"""
+    """SQLite database-i hazırla: gözləyən sxem miqrasiyaları (bax: migrator.py)"""
     os.makedirs(os.path.dirname(SQLITE_DB_PATH), exist_ok=True)
-    
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_telegram_id INTEGER NOT NULL,
-                user_username TEXT,
-                fullname TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                fin TEXT NOT NULL,
-                id_photo_file_id TEXT,
-                form_type TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                body TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                notes TEXT,
-                reply_text TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        # Blacklist cədvəli
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS blacklisted_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_telegram_id INTEGER NOT NULL UNIQUE,
-                reason TEXT,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        
-        # Index-lər
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fin ON applications(fin)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON applications(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user ON applications(user_telegram_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_created ON applications(created_at)")
-        
-        # Migration: Add reply_text column if it doesn't exist (for existing SQLite dbs)
-        cursor.execute("PRAGMA table_info(applications)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'reply_text' not in columns:
-            logger.info("🔧 Adding reply_text column to SQLite applications table...")
-            try:
-                cursor.execute("ALTER TABLE applications ADD COLUMN reply_text TEXT")
-                logger.info("✅ reply_text column added to SQLite")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not add reply_text column: {e}")
-        
-        conn.commit()
-        logger.info(f"✅ SQLite database hazırdır: {SQLITE_DB_PATH}")
+    from migrator import MigrationError, migrate_sqlite
+    try:
+        version = migrate_sqlite(_thread_connection())
+    except MigrationError as e:
+        if e.current == 0:
+            raise
+        logger.error(f"❌ {e} - sxem v{e.current}-də qaldı")
+        version = e.current
+    logger.info(f"✅ SQLite database hazırdır: {SQLITE_DB_PATH} (sxem v{version})")
+
+def _thread_connection() -> sqlite3.Connection:
+    """Cari thread-in daimi connection-u (ilk çağırışda açılır)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != SQLITE_DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(SQLITE_DB_PATH, cached_statements=SQLITE_STATEMENT_CACHE)
+        conn.row_factory = sqlite3.Row  # Dict kimi əlçatan olsun
+        apply_sqlite_pragmas(conn)
+        if _trace_callback is not None:
+            conn.set_trace_callback(_trace_callback)
+        _local.conn, _local.path = conn, SQLITE_DB_PATH
+    return conn
+
+def set_trace_callback(callback) -> None:
+    """Hər icra olunan SQL ifadəsi üçün çağırılacaq funksiya (None - söndür)"""
+    global _trace_callback
+    _trace_callback = callback
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.set_trace_callback(callback)
+
+def close_sqlite_connection() -> None:
+    """Cari thread-in connection-unu bağla (digər thread-lərinkini yalnız onlar bağlaya bilər)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
 
 @contextmanager
 def get_sqlite_connection():
-    """SQLite connection context manager"""
-    conn = sqlite3.connect(SQLITE_DB_PATH)
-    conn.row_factory = sqlite3.Row  # Dict kimi əlçatan olsun
+    """SQLite connection context manager (thread-ə bağlı daimi connection; sonda commit/rollback)"""
+    conn = _thread_connection()
     try:
         yield conn
         conn.commit()
@@ -80,8 +94,6 @@ def get_sqlite_connection():
         conn.rollback()
         logger.error(f"SQLite error: {e}")
         raise
-    finally:
-        conn.close()
 
 def save_application_sqlite(
     user_telegram_id: int,
@@ -130,14 +142,6 @@ def save_application_sqlite(
             "created_at": created_str,
         }
 
-def get_all_applications_sqlite() -> list:
-    """Bütün müraciətləri gətir"""
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM applications ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-
 def get_application_by_id_sqlite(app_id: int) -> dict | None:
     """ID ilə tək müraciəti gətir"""
     with get_sqlite_connection() as conn:
@@ -146,24 +150,6 @@ def get_application_by_id_sqlite(app_id: int) -> dict | None:
         row = cursor.fetchone()
         return dict(row) if row else None
 
-def export_to_json(output_file: str = "data/applications_export.json"):
-    """SQLite database-i JSON-a export et"""
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    applications = get_all_applications_sqlite()
-    
-    export_data = {
-        "export_time": datetime.now(BAKU_TZ).isoformat(),
-        "total_count": len(applications),
-        "applications": applications
-    }
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, ensure_ascii=False, indent=2)
-    
-    logger.info(f"✅ JSON export: {output_file} ({len(applications)} müraciət)")
-    return output_file
-
 def update_application_status_sqlite(app_id: int, status: str, notes: Optional[str] = None):
     """Status yenilə"""
     with get_sqlite_connection() as conn:
@@ -183,18 +169,6 @@ def update_application_status_sqlite(app_id: int, status: str, notes: Optional[s
         
         logger.info(f"✅ SQLite status yeniləndi: ID={app_id}, status={status}")
 
-def count_user_rejections_sqlite(user_telegram_id: int, days: int = 30) -> int:
-    from datetime import datetime, timedelta
-    cutoff = (datetime.now(BAKU_TZ) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) as count FROM applications WHERE user_telegram_id=? AND status='rejected' AND created_at >= ?",
-            (user_telegram_id, cutoff)
-        )
-        row = cursor.fetchone()
-        return row["count"] if row else 0
-
 def is_user_blacklisted_sqlite(user_telegram_id: int) -> bool:
     with get_sqlite_connection() as conn:
         cursor = conn.cursor()
@@ -203,80 +177,6 @@ def is_user_blacklisted_sqlite(user_telegram_id: int) -> bool:
 
 from typing import Optional
 
-def add_user_to_blacklist_sqlite(user_telegram_id: int, reason: Optional[str] = None) -> None:
-    from datetime import datetime
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        created = datetime.now(BAKU_TZ).strftime('%Y-%m-%d %H:%M:%S')
-        try:
-            cursor.execute(
-                "INSERT OR IGNORE INTO blacklisted_users (user_telegram_id, reason, created_at) VALUES (?, ?, ?)",
-                (user_telegram_id, reason or "Çoxlu imtina", created)
-            )
-        except Exception as e:
-            logger.error(f"Blacklist insert xətası: {e}")
-
-def remove_user_from_blacklist_sqlite(user_telegram_id: int) -> None:
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM blacklisted_users WHERE user_telegram_id=?", (user_telegram_id,))
-        conn.commit()
-
-def list_blacklisted_users_sqlite(limit: int = 100) -> list:
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM blacklisted_users ORDER BY created_at DESC LIMIT ?", (limit,))
-        rows = cursor.fetchall()
-        return [dict(r) for r in rows]
-
-def search_applications_sqlite(fin: Optional[str] = None, phone: Optional[str] = None) -> list:
-    """FIN və ya telefon ilə axtarış"""
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        
-        if fin:
-            cursor.execute("SELECT * FROM applications WHERE fin=? ORDER BY created_at DESC", (fin.upper(),))
-        elif phone:
-            cursor.execute("SELECT * FROM applications WHERE phone=? ORDER BY created_at DESC", (phone,))
-        else:
-            return []
-        
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-
-def get_statistics_sqlite() -> dict:
-    """Statistika"""
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) as total FROM applications")
-        total = cursor.fetchone()["total"]
-        
-        cursor.execute("SELECT status, COUNT(*) as count FROM applications GROUP BY status")
-        by_status = {row["status"]: row["count"] for row in cursor.fetchall()}
-        
-        cursor.execute("SELECT form_type, COUNT(*) as count FROM applications GROUP BY form_type")
-        by_type = {row["form_type"]: row["count"] for row in cursor.fetchall()}
-        
-        return {
-            "total": total,
-            "by_status": by_status,
-            "by_type": by_type
-        }
-
-def get_overdue_applications_sqlite(days: int = 3) -> list:
-    """SLA aşan müraciətləri tap (N gündən çox pending/processing)"""
-    from datetime import datetime, timedelta
-    cutoff_date = (datetime.now(BAKU_TZ) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM applications WHERE status IN ('pending', 'processing') AND created_at <= ? ORDER BY created_at",
-            (cutoff_date,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-
 def count_user_recent_applications_sqlite(user_telegram_id: int, hours: int = 24) -> int:
     """Son N saat içində istifadəçinin müraciət sayını say"""
     from datetime import datetime, timedelta
@@ -289,15 +189,3 @@ def count_user_recent_applications_sqlite(user_telegram_id: int, hours: int = 24
         )
         result = cursor.fetchone()
         return result["count"] if result else 0
-
-def delete_all_applications_sqlite() -> int:
-    """Bütün müraciətləri silinə billər (test məlumatları üçün)"""
-    with get_sqlite_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM applications")
-        # ID sıfırlama (AUTOINCREMENT üçün)
-        cursor.execute("DELETE FROM sqlite_sequence WHERE name='applications'")
-        conn.commit()
-        deleted = cursor.rowcount
-        logger.info(f"✅ {deleted} müraciət silindi və ID sıfırlandı")
-        return deleted
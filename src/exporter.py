@@ -0,0 +1,300 @@
+"""
+Müraciətlərin export-u - axınla (streaming) CSV, CSV.gz və Parquet
+
+Sətirlər repository-dən partiya-partiya gəlir və birbaşa müvəqqəti fayla
+(`SpooledTemporaryFile`) yazılır; bütün cədvəl heç vaxt yaddaşa yığılmır.
+Fayl `EXPORT_PART_MAX_BYTES` həddini keçəndə yeni hissə başlanır ki, hər
+hissə Telegram-ın sənəd limitinə sığsın.
+
+Formatlar:
+- `csv` - Excel üçün: UTF-8 BOM, Azərbaycan dilində status/növ, Bakı vaxtı
+- `csv.gz` - analitika üçün: xam dəyərlər (enum dəyərləri, ISO UTC vaxt), gzip
+- `parquet` - tipli sütunlar, enum-lar dictionary, vaxtlar timestamp, zstd (pyarrow lazımdır)
+"""
+import csv
+import gzip
+import importlib.util
+import io
+from datetime import datetime, timezone
+from tempfile import SpooledTemporaryFile
+from typing import IO, AsyncIterator, Optional
+
+from config import BAKU_TZ, EXPORT_PART_MAX_BYTES
+from database import ApplicationStatus, FormTypeDB
+from repository import ApplicationRecord, Watermark
+
+# pyarrow opsionaldır və ağırdır - yalnız ilk /export parquet-də import olunur
+pa = pq = None
+
+# Bu ölçüyə qədər hissə yaddaşda qalır, sonra diskə keçir
+SPOOL_MAX_BYTES = 1024 * 1024
+
+CSV_HEADER = [
+    "ID", "SAA", "Telefon", "FIN", "Müraciət növü",
+    "Müraciət mətni", "Status", "Cavab", "Qeydiyyat tarixi", "Cavablandırılma tarixi",
+]
+
+FORM_TYPE_LABELS = {
+    FormTypeDB.COMPLAINT: "Şikayət",
+    FormTypeDB.SUGGESTION: "Təklif",
+    FormTypeDB.APPLICATION: "Ərizə",
+}
+
+STATUS_LABELS = {
+    ApplicationStatus.COMPLETED: "Cavablandırıldı ✉️",
+    ApplicationStatus.REJECTED: "İmtina edildi 🚫",
+    ApplicationStatus.PENDING: "Gözləyir 🟡",
+}
+
+
+def _fmt_baku(dt) -> str:
+    if dt is None:
+        return ""
+    try:
+        if getattr(dt, "tzinfo", None) is None:
+            # Assume UTC if tz is missing
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(BAKU_TZ).strftime("%d.%m.%Y %H:%M:%S")
+    except Exception:
+        try:
+            return dt.strftime("%d.%m.%Y %H:%M:%S")
+        except Exception:
+            return ""
+
+
+def csv_row(rec: ApplicationRecord) -> list:
+    return [
+        rec.id,
+        rec.fullname or "",
+        "'" + (rec.phone or ""),  # Excel üçün mətn formatı
+        rec.fin or "",
+        FORM_TYPE_LABELS.get(rec.form_type, "Ərizə"),
+        rec.body or "",
+        STATUS_LABELS.get(rec.status, getattr(rec.status, "value", rec.status)),
+        rec.reply_text or "",
+        _fmt_baku(rec.created_at),
+        _fmt_baku(rec.updated_at),
+    ]
+
+
+# Maşın üçün formatlarda (csv.gz, parquet) sütunlar
+RAW_COLUMNS = [
+    "id", "user_telegram_id", "user_username", "fullname", "phone", "fin", "form_type",
+    "body", "status", "notes", "reply_text", "created_at", "updated_at",
+]
+
+
+def _utc(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        # PostgreSQL-dəki naive dəyərlər UTC-dir
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def raw_row(rec: ApplicationRecord) -> list:
+    created, updated = _utc(rec.created_at), _utc(rec.updated_at)
+    return [
+        rec.id,
+        rec.user_telegram_id,
+        rec.user_username,
+        rec.fullname,
+        rec.phone,
+        rec.fin,
+        rec.form_type.value,
+        rec.body,
+        rec.status.value,
+        rec.notes,
+        rec.reply_text,
+        created.isoformat() if created else None,
+        updated.isoformat() if updated else None,
+    ]
+
+
+class WatermarkTracker:
+    """Export olunan sətirlərdən növbəti inkremental export üçün nişanı hesablayır"""
+
+    def __init__(self, records: AsyncIterator[ApplicationRecord], since: Optional[Watermark] = None) -> None:
+        self._records = records
+        self.last_id = since.last_id if since else 0
+        self.last_updated_at = since.last_updated_at if since else None
+
+    async def __aiter__(self) -> AsyncIterator[ApplicationRecord]:
+        async for rec in self._records:
+            if rec.id > self.last_id:
+                self.last_id = rec.id
+            if rec.updated_at is not None and (self.last_updated_at is None or rec.updated_at > self.last_updated_at):
+                self.last_updated_at = rec.updated_at
+            yield rec
+
+    @property
+    def watermark(self) -> Watermark:
+        return Watermark(self.last_id, self.last_updated_at)
+
+
+class _CsvPart:
+    """Bir CSV hissəsi: UTF-8 BOM + header, sonra sətirlər"""
+
+    def __init__(self) -> None:
+        self.file: IO[bytes] = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+        self.size = 0
+        self.rows = 0
+        # Excel və standart CSV tələblərinə uyğun: UTF-8 BOM, proper quoting
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        self._write("\ufeff", CSV_HEADER)
+
+    def _write(self, prefix: str, row: list) -> None:
+        self._writer.writerow(row)
+        data = (prefix + self._line.getvalue()).encode("utf-8")
+        self._line.seek(0)
+        self._line.truncate()
+        self.file.write(data)
+        self.size += len(data)
+
+    def add(self, rec: ApplicationRecord) -> None:
+        self._write("", csv_row(rec))
+        self.rows += 1
+
+    def finish(self) -> IO[bytes]:
+        self.file.seek(0)
+        return self.file
+
+
+class _CsvGzPart:
+    """gzip-lənmiş CSV hissəsi: xam dəyərlər, BOM və Excel düzəlişləri yoxdur"""
+
+    def __init__(self) -> None:
+        self.file: IO[bytes] = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+        self.rows = 0
+        self._gz = gzip.GzipFile(fileobj=self.file, mode="wb", compresslevel=6)
+        self._text = io.TextIOWrapper(self._gz, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        self._writer.writerow(RAW_COLUMNS)
+
+    @property
+    def size(self) -> int:
+        # Sıxılmış baytlar (gzip buferi qədər az hesablanır)
+        return self.file.tell()
+
+    def add(self, rec: ApplicationRecord) -> None:
+        self._writer.writerow(raw_row(rec))
+        self.rows += 1
+
+    def finish(self) -> IO[bytes]:
+        self._text.flush()
+        self._text.detach()
+        self._gz.close()
+        self.file.seek(0)
+        return self.file
+
+
+# Parquet sxemi: enum-lar dictionary (int8 indeks), vaxtlar UTC timestamp
+_PARQUET_ROW_GROUP = 10_000
+
+
+def _load_pyarrow() -> None:
+    global pa, pq
+    if pa is None:
+        import pyarrow
+        import pyarrow.parquet
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def _parquet_schema():
+    enum_type = pa.dictionary(pa.int8(), pa.string())
+    ts_type = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("id", pa.int64()),
+        ("user_telegram_id", pa.int64()),
+        ("user_username", pa.string()),
+        ("fullname", pa.string()),
+        ("phone", pa.string()),
+        ("fin", pa.string()),
+        ("form_type", enum_type),
+        ("body", pa.string()),
+        ("status", enum_type),
+        ("notes", pa.string()),
+        ("reply_text", pa.string()),
+        ("created_at", ts_type),
+        ("updated_at", ts_type),
+    ])
+
+
+class _ParquetPart:
+    """Bir Parquet faylı: sətirlər sütunlara yığılır və hər N sətirdən bir row group yazılır"""
+
+    def __init__(self) -> None:
+        self.file: IO[bytes] = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+        self.rows = 0
+        _load_pyarrow()
+        self._schema = _parquet_schema()
+        self._writer = pq.ParquetWriter(self.file, self._schema, compression="zstd")
+        self._columns: list[list] = [[] for _ in self._schema]
+
+    @property
+    def size(self) -> int:
+        return self.file.tell()
+
+    def add(self, rec: ApplicationRecord) -> None:
+        values = (
+            rec.id, rec.user_telegram_id, rec.user_username, rec.fullname, rec.phone, rec.fin,
+            rec.form_type.value, rec.body, rec.status.value, rec.notes, rec.reply_text,
+            _utc(rec.created_at), _utc(rec.updated_at),
+        )
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        self.rows += 1
+        if len(self._columns[0]) >= _PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns[0]:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(col, type=field.type) for col, field in zip(self._columns, self._schema)],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+        self._columns = [[] for _ in self._schema]
+
+    def finish(self) -> IO[bytes]:
+        self._flush()
+        self._writer.close()
+        self.file.seek(0)
+        return self.file
+
+
+# format -> (hissə sinfi, fayl uzantısı)
+EXPORT_FORMATS = {
+    "csv": (_CsvPart, "csv"),
+    "csv.gz": (_CsvGzPart, "csv.gz"),
+    "parquet": (_ParquetPart, "parquet"),
+}
+
+
+def format_available(fmt: str) -> bool:
+    return fmt != "parquet" or pa is not None or importlib.util.find_spec("pyarrow") is not None
+
+
+async def export_parts(
+    records: AsyncIterator[ApplicationRecord],
+    fmt: str = "csv",
+    max_bytes: int = EXPORT_PART_MAX_BYTES,
+) -> AsyncIterator[tuple[IO[bytes], int]]:
+    """Hazır export hissələrini (fayl, sətir sayı) kimi ver; faylı çağıran bağlayır
+
+    Heç bir sətir yoxdursa, heç nə vermir.
+    """
+    part_cls, _ = EXPORT_FORMATS[fmt]
+    part = part_cls()
+    async for rec in records:
+        if part.rows and part.size >= max_bytes:
+            yield part.finish(), part.rows
+            part = part_cls()
+        part.add(rec)
+    if part.rows:
+        yield part.finish(), part.rows
+    else:
+        part.finish().close()
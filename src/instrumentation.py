@@ -0,0 +1,168 @@
+"""
+İsti yolun ölçülməsi - handler-lər, DB sorğuları və Telegram Bot API çağırışları
+
+Hər qat üçün gecikmə histogramı (p50/p95/p99), xəta sayğacı və icrada olan
+çağırışların gauge-u yazılır:
+- `handler_seconds{handler}` - `build_app`-də qeyd olunan hər callback (ConversationHandler daxilindəkilər də);
+- `db_seconds{op}` - `db_async`-in ictimai korutinləri (repository, export, shared state buradan keçir);
+- `telegram_api_seconds{method}` - botun HTTP sorğuları (getUpdates long polling-i istisna).
+
+Metriklər `/metrics` (webhook serveri və ya `METRICS_PORT`) və admin `/metrics`
+komandası ilə görünür. Metrik obyektləri sarğı qurulanda bir dəfə alınır - hər
+çağırış yalnız `perf_counter` və bir neçə toplama əlavə edir.
+"""
+import functools
+import inspect
+import time
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+from telegram.ext import Application, ApplicationHandlerStop, BaseHandler, ConversationHandler
+from telegram.request import HTTPXRequest
+
+import metrics
+
+# Sarğının ikinci dəfə qurulmaması üçün nişan
+_MARK = "__instrumented__"
+
+
+def _timed(fn: Callable, histogram: metrics.Histogram, errors: metrics.Counter,
+           in_flight: metrics.Gauge, ignore: tuple[type[BaseException], ...] = ()) -> Callable:
+    """Korutini ölç: müddət, xəta (ignore istisna) və icrada olanların sayı"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except ignore:
+            raise
+        except BaseException:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+            in_flight.dec()
+
+    setattr(wrapper, _MARK, True)
+    return wrapper
+
+
+# ================== Handler-lər ==================
+
+def iter_handlers(handlers: Iterable[BaseHandler]) -> Iterable[BaseHandler]:
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            yield from iter_handlers(handler.entry_points)
+            for state_handlers in handler.states.values():
+                yield from iter_handlers(state_handlers)
+            yield from iter_handlers(handler.fallbacks)
+        else:
+            yield handler
+
+
+def instrument_handlers(app: Application) -> int:
+    """Qeyd olunmuş bütün handler callback-lərini ölçən sarğı ilə əvəz et"""
+    wrapped = 0
+    for group in app.handlers.values():
+        for handler in iter_handlers(group):
+            callback = handler.callback
+            if getattr(callback, _MARK, False) or not inspect.iscoroutinefunction(callback):
+                continue
+            name = callback.__name__
+            handler.callback = _timed(
+                callback,
+                metrics.histogram("handler_seconds", "Handler-in icra müddəti", handler=name),
+                metrics.counter("handler_errors_total", "Handler-də tutulmamış xətalar", handler=name),
+                metrics.gauge("handler_in_flight", "İcrada olan handler-lər", handler=name),
+                # Dispatch-i dayandırmaq üçün istifadə olunur, xəta deyil
+                ignore=(ApplicationHandlerStop,),
+            )
+            wrapped += 1
+    return wrapped
+
+
+# ================== DB ==================
+
+def instrument_module(module: ModuleType) -> int:
+    """Modulun ictimai korutinlərini ölç (`module.func(...)` çağırışları sarğıdan keçir)"""
+    wrapped = 0
+    for name, fn in list(vars(module).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(fn) or getattr(fn, _MARK, False):
+            continue
+        if getattr(fn, "__module__", None) != module.__name__:
+            continue  # import olunmuş funksiyalar
+        setattr(module, name, _timed(
+            fn,
+            metrics.histogram("db_seconds", "DB əməliyyatının müddəti", op=name),
+            metrics.counter("db_errors_total", "Uğursuz DB əməliyyatları", op=name),
+            metrics.gauge("db_in_flight", "İcrada olan DB əməliyyatları", op=name),
+        ))
+        wrapped += 1
+    return wrapped
+
+
+# ================== Telegram Bot API ==================
+
+class InstrumentedRequest(HTTPXRequest):
+    """Bot API sorğularının müddəti metod adı üzrə (sendMessage, editMessageText, ...)"""
+
+    async def do_request(self, url: str, method: str, *args: Any, **kwargs: Any) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        in_flight = metrics.gauge("telegram_api_in_flight", "İcrada olan Bot API sorğuları", method=api_method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except BaseException:
+            metrics.counter("telegram_api_errors_total", "Uğursuz Bot API sorğuları", method=api_method).inc()
+            raise
+        finally:
+            metrics.histogram("telegram_api_seconds", "Bot API sorğusunun müddəti", method=api_method).observe(
+                time.perf_counter() - started
+            )
+            in_flight.dec()
+        if code >= 400:
+            metrics.counter("telegram_api_errors_total", "Uğursuz Bot API sorğuları", method=api_method).inc()
+        return code, payload
+
+
+# ================== Hesabat ==================
+
+_SECTIONS = (
+    ("handler_seconds", "handler_errors_total", "handler", "🧩 Handler-lər"),
+    ("db_seconds", "db_errors_total", "op", "🗄 DB"),
+    ("telegram_api_seconds", "telegram_api_errors_total", "method", "📨 Telegram API"),
+)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}" if seconds >= 0.01 else f"{seconds * 1000:.1f}"
+
+
+def format_report(limit: int = 8) -> str:
+    """Admin /metrics: hər qatda ən çox vaxt aparanlar (cəmi müddətə görə)"""
+    blocks = []
+    for hist_name, err_name, label, title in _SECTIONS:
+        errors = {dict(m.labels).get(label): m.value for m in metrics.snapshot(err_name) if m.name == err_name}
+        rows = [m for m in metrics.snapshot(hist_name) if m.name == hist_name and m.count]
+        if not rows:
+            continue
+        rows.sort(key=lambda m: m.sum, reverse=True)
+        lines = [f"{title} (n / p50 / p95 / p99 ms / xəta)"]
+        for m in rows[:limit]:
+            key = dict(m.labels).get(label, "?")
+            lines.append(
+                f"• {key}: {m.count} / {_ms(m.quantile(0.5))} / {_ms(m.quantile(0.95))} / "
+                f"{_ms(m.quantile(0.99))} / {errors.get(key, 0):g}"
+            )
+        if len(rows) > limit:
+            lines.append(f"… və daha {len(rows) - limit}")
+        blocks.append("\n".join(lines))
+    # Pool gauge-ləri oxunan anda hesablanır (set_function) - loq job-unu gözləmir
+    pool = [m for m in metrics.snapshot("db_pool_") if m.kind == "gauge"]
+    if pool:
+        lines = ["🔌 DB pool (indi)"]
+        lines += [f"• {m.name.removeprefix('db_pool_')}{metrics.format_labels(m.labels)}: {m.get():g}" for m in pool]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
@@ -0,0 +1,234 @@
+"""
+Sadə proses daxili metrik reyestri (sayğac, gauge, summary, histogram)
+
+Metriklər ad + label-lərlə bir dəfə yaradılır və modul səviyyəsində saxlanılır;
+`snapshot()` hamısını loq / HTTP / admin komandası üçün qaytarır.
+"""
+import abc
+import threading
+from bisect import bisect_left
+from typing import Callable, Optional, Sequence
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Labels) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def samples(self) -> list[tuple[str, float]]:
+        """(suffix, dəyər) cütləri"""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels) -> None:
+        super().__init__(name, help, labels)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [("", self.value)]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Labels) -> None:
+        super().__init__(name, help, labels)
+        self.value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Dəyər oxunanda hesablanır (məs. pool.checkedout)"""
+        self._fn = fn
+
+    def get(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return 0.0
+        return self.value
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [("", self.get())]
+
+
+class Summary(Metric):
+    """Müşahidələrin sayı, cəmi və maksimumu"""
+    kind = "summary"
+
+    def __init__(self, name: str, help: str, labels: Labels) -> None:
+        super().__init__(name, help, labels)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [("_count", self.count), ("_sum", self.sum), ("_max", self.max)]
+
+
+# Gecikmə bucket-ləri (saniyə): DB sorğusundan Telegram-ın uzun cavabına qədər
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram(Metric):
+    """Sabit bucket-lərlə paylanma; p50/p95/p99 bucket-lər daxilində interpolyasiya ilə"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Labels, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # sonuncu: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """(yuxarı sərhəd, kumulyativ say) - Prometheus `le` bucket-ləri"""
+        out, total = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Prometheus `histogram_quantile` kimi: bucket daxilində xətti interpolyasiya"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower, prev = 0.0, 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == float("inf"):
+                    return lower  # ən böyük sonlu sərhəd
+                return lower + (bound - lower) * (rank - prev) / max(total - prev, 1)
+            lower, prev = bound, total
+        return lower
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [("_count", self.count), ("_sum", self.sum)]
+
+
+_registry: dict[tuple[str, Labels], Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _get(cls, name: str, help: str, labels: dict[str, str]):
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _registry_lock:
+        metric = _registry.get(key)
+        if metric is None:
+            metric = _registry[key] = cls(name, help, key[1])
+    return metric
+
+
+def counter(name: str, help: str = "", **labels: str) -> Counter:
+    return _get(Counter, name, help, labels)
+
+
+def gauge(name: str, help: str = "", **labels: str) -> Gauge:
+    return _get(Gauge, name, help, labels)
+
+
+def summary(name: str, help: str = "", **labels: str) -> Summary:
+    return _get(Summary, name, help, labels)
+
+
+def histogram(name: str, help: str = "", **labels: str) -> Histogram:
+    return _get(Histogram, name, help, labels)
+
+
+def snapshot(prefix: str = "") -> list[Metric]:
+    """Adı `prefix` ilə başlayan metriklər (ada görə sıralı)"""
+    with _registry_lock:
+        metrics = [m for (name, _), m in _registry.items() if name.startswith(prefix)]
+    return sorted(metrics, key=lambda m: (m.name, m.labels))
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def format_line(prefix: str = "") -> str:
+    """Bir sətirlik xülasə (loq üçün): ad{label}=dəyər ..."""
+    parts = []
+    for m in snapshot(prefix):
+        for suffix, value in m.samples():
+            parts.append(f"{m.name}{suffix}{format_labels(m.labels)}={value:g}")
+    return " ".join(parts)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(prefix: str = "") -> str:
+    """Prometheus text formatı (/metrics). Summary-nin max-ı ayrıca gauge kimi verilir,
+    histogram bucket-ləri `le` label-i ilə."""
+    lines: list[str] = []
+    declared: set[str] = set()
+
+    def declare(name: str, kind: str, help: str) -> None:
+        if name in declared:
+            return
+        declared.add(name)
+        if help:
+            lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    extra: list[tuple[str, str, str, float]] = []
+    for m in snapshot(prefix):
+        labels = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in m.labels) + "}" if m.labels else ""
+        declare(m.name, m.kind, m.help)
+        if isinstance(m, Histogram):
+            pairs = [f'{k}="{_escape(v)}"' for k, v in m.labels]
+            for bound, total in m.cumulative():
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{m.name}_bucket{{{bucket_labels}}} {total}")
+        for suffix, value in m.samples():
+            if m.kind == "summary" and suffix == "_max":
+                extra.append((m.name + suffix, m.help, labels, value))
+                continue
+            lines.append(f"{m.name}{suffix}{labels} {value:g}")
+    for name, help, labels, value in extra:
+        declare(name, "gauge", f"{help} (max)" if help else "")
+        lines.append(f"{name}{labels} {value:g}")
+    return "\n".join(lines) + "\n"
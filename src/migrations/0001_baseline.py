@@ -0,0 +1,99 @@
+"""
+0001 - Baseline: versiyalı miqrasiyalardan əvvəl hər startda yoxlanılan sxem
+
+Boş bazada bütün cədvəlləri yaradır; mövcud bazada köhnə startup yoxlamalarını
+(reply_text sütunu, silinmiş subject / id_photo_file_id sütunları, updated_at indeksi)
+bir dəfə tətbiq edir. Hamısı idempotentdir.
+"""
+from sqlalchemy import text
+
+
+def upgrade_postgres(conn) -> None:
+    from database import Base
+
+    # Mövcud cədvəllərə toxunmur (checkfirst)
+    Base.metadata.create_all(conn)
+    conn.execute(text("ALTER TABLE applications ADD COLUMN IF NOT EXISTS reply_text TEXT NULL"))
+    conn.execute(text("ALTER TABLE applications DROP COLUMN IF EXISTS subject"))
+    conn.execute(text("ALTER TABLE applications DROP COLUMN IF EXISTS id_photo_file_id"))
+    # İnkremental export üçün updated_at indeksi (create_all-dan əvvəlki cədvəllər)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_applications_updated_at ON applications (updated_at)"))
+
+
+def upgrade_sqlite(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_telegram_id INTEGER NOT NULL,
+            user_username TEXT,
+            fullname TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            fin TEXT NOT NULL,
+            id_photo_file_id TEXT,
+            form_type TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            notes TEXT,
+            reply_text TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    # Blacklist cədvəli
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blacklisted_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_telegram_id INTEGER NOT NULL UNIQUE,
+            reason TEXT,
+            created_at TEXT NOT NULL
+        )
+    """)
+    # İnkremental export nişanları
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            destination TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            last_updated_at TEXT,
+            exported_at TEXT NOT NULL
+        )
+    """)
+    # /stats sayğacları
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # İcraçı bildirişləri üçün outbox (bax: database.OutboxMessage)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            application_id INTEGER,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox(status, next_attempt_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_outbox_application_id ON outbox(application_id)")
+
+    # Index-lər
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fin ON applications(fin)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON applications(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user ON applications(user_telegram_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_created ON applications(created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_updated ON applications(updated_at)")
+
+    # reply_text sütunundan əvvəl yaradılmış SQLite bazaları (ADD COLUMN-da IF NOT EXISTS yoxdur)
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(applications)").fetchall()]
+    if "reply_text" not in columns:
+        cursor.execute("ALTER TABLE applications ADD COLUMN reply_text TEXT")
+    cursor.close()
@@ -0,0 +1,13 @@
+"""
+0002 - `formtypedb` enum-una APPLICATION ("Ərizə") dəyəri (yalnız PostgreSQL)
+
+SQLite form_type-ı TEXT saxlayır - dəyişiklik lazım deyil.
+"""
+from sqlalchemy import text
+
+# ALTER TYPE ... ADD VALUE PostgreSQL 12-dən əvvəl tranzaksiya daxilində işləmir
+TRANSACTIONAL = False
+
+
+def upgrade_postgres(conn) -> None:
+    conn.execute(text("ALTER TYPE formtypedb ADD VALUE IF NOT EXISTS 'APPLICATION'"))
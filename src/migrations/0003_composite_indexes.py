@@ -0,0 +1,17 @@
+"""
+0003 - Hot sorğular üçün composite və partial index-lər (bax: add_composite_indexes.py)
+
+PostgreSQL-də CONCURRENTLY yaradılır - cədvələ yazılış bloklanmır.
+"""
+from migrations.add_composite_indexes import create_pg_indexes, create_sqlite_indexes
+
+# CREATE INDEX CONCURRENTLY tranzaksiya daxilində işləmir
+TRANSACTIONAL = False
+
+
+def upgrade_postgres(conn) -> None:
+    create_pg_indexes(conn)
+
+
+def upgrade_sqlite(conn) -> None:
+    create_sqlite_indexes(conn)
@@ -0,0 +1,53 @@
+"""
+Composite və partial index tərifləri - hot lookup yolları üçün
+Məqsəd: count_user_rejections, count_user_recent_applications və SLA sorğusu
+(get_overdue_applications) üçün çoxsütunlu və partial index-lər
+
+Tətbiq: `migrations/0003_composite_indexes.py` (bax: migrator.py). PostgreSQL-də
+index-lər CONCURRENTLY yaradılır (cədvələ yazılış bloklanmır).
+"""
+from sqlalchemy import text
+from config import logger
+from database import OPEN_STATUS_PREDICATE_PG, OPEN_STATUS_PREDICATE_SQLITE
+
+# (ad, sütunlar, WHERE) - database.Application.__table_args__ ilə eyni
+PG_INDEXES = [
+    ("ix_applications_user_status_created", "user_telegram_id, status, created_at", None),
+    ("ix_applications_user_created", "user_telegram_id, created_at", None),
+    ("ix_applications_open_created", "created_at", OPEN_STATUS_PREDICATE_PG),
+]
+
+SQLITE_INDEXES = [
+    ("idx_user_status_created", "user_telegram_id, status, created_at", None),
+    ("idx_user_created", "user_telegram_id, created_at", None),
+    ("idx_open_created", "created_at", OPEN_STATUS_PREDICATE_SQLITE),
+]
+
+
+def _ddl(name: str, columns: str, where, concurrently: bool = False) -> str:
+    sql = f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} ON applications ({columns})"
+    return sql + (f" WHERE {where}" if where else "")
+
+
+def create_pg_indexes(conn) -> None:
+    """PostgreSQL index-lərini yarat (yarımçıq qalmış INVALID index yenidən qurulur)
+
+    `conn` AUTOCOMMIT rejimində olmalıdır - CONCURRENTLY tranzaksiya daxilində işləmir.
+    """
+    for name, columns, where in PG_INDEXES:
+        invalid = conn.execute(text("""
+            SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """), {"name": name}).fetchone()
+        if invalid:
+            logger.warning(f"🔧 {name} INVALID vəziyyətdədir, yenidən qurulur")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(_ddl(name, columns, where, concurrently=True)))
+    conn.execute(text("ANALYZE applications"))
+
+
+def create_sqlite_indexes(cursor) -> None:
+    """SQLite index-lərini yarat (sqlite3 cursor və ya connection)"""
+    for name, columns, where in SQLITE_INDEXES:
+        cursor.execute(_ddl(name, columns, where))
+
@@ -0,0 +1,227 @@
+"""
+Versiyalı sxem miqrasiyaları - PostgreSQL və SQLite
+
+`src/migrations/NNNN_ad.py` faylları versiya sırası ilə tətbiq olunur, hər tətbiq
+olunan versiya `schema_version` cədvəlinə yazılır. Startda yalnız bir sorğu gedir
+(`SELECT MAX(version)`); gözləyən miqrasiya yoxdursa, heç bir modul import olunmur.
+
+Miqrasiya modulu:
+- `upgrade_postgres(conn)` - SQLAlchemy `Connection`;
+- `upgrade_sqlite(conn)` - `sqlite3.Connection`;
+- `TRANSACTIONAL = False` - PostgreSQL-də tranzaksiyadan kənar (AUTOCOMMIT) icra olunur:
+  `CREATE INDEX CONCURRENTLY`, `ALTER TYPE ... ADD VALUE`.
+Backend üçün funksiya yoxdursa, versiya sadəcə qeyd olunur. Tranzaksiyasız addım
+yarımçıq qala bilər, ona görə miqrasiyalar idempotent yazılır (`IF NOT EXISTS`).
+
+Yeni dəyişiklik - növbəti nömrə ilə yeni fayl; tətbiq olunmuş fayl dəyişdirilmir.
+Əl ilə:
+    cd src && python -m migrator [--sqlite] [--status]
+"""
+import hashlib
+import importlib
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import ProgrammingError
+
+from config import MIGRATION_LOCK_TIMEOUT_MS, logger
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Bir neçə replika eyni anda start olanda miqrasiyaları yalnız biri icra edir
+_PG_LOCK_ID = int.from_bytes(hashlib.blake2b(b"dsmf-bot:migrations", digest_size=8).digest(), "big", signed=True)
+
+_SQLITE_TABLE = "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL)"
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    name: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+    def load(self) -> ModuleType:
+        return importlib.import_module(f"migrations.{self.label}")
+
+
+class MigrationError(RuntimeError):
+    """Miqrasiya uğursuz oldu; `current` - sonuncu uğurla tətbiq olunmuş versiya"""
+
+    def __init__(self, migration: Migration, current: int, cause: BaseException) -> None:
+        super().__init__(f"Miqrasiya {migration.label} uğursuz oldu: {type(cause).__name__}: {cause}")
+        self.migration = migration
+        self.current = current
+
+
+def discover() -> list[Migration]:
+    """`migrations/` qovluğundakı versiyalı fayllar (versiyaya görə sıralı)"""
+    found: dict[int, Migration] = {}
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        migration = Migration(int(match.group(1)), match.group(2))
+        if migration.version in found:
+            raise RuntimeError(f"Təkrarlanan miqrasiya versiyası: {found[migration.version].label}, {migration.label}")
+        found[migration.version] = migration
+    return [found[v] for v in sorted(found)]
+
+
+def _pending(current: int) -> list[Migration]:
+    migrations = discover()
+    head = migrations[-1].version if migrations else 0
+    if current > head:
+        # Köhnə kod yeni sxemlə işə salınıb (məs. deploy geri qaytarılıb)
+        logger.warning(f"⚠️ Bazadakı sxem (v{current}) koddakından (v{head}) yenidir")
+    return [m for m in migrations if m.version > current]
+
+
+# ================== PostgreSQL ==================
+
+def pg_current_version(conn: Connection) -> int:
+    try:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+    except ProgrammingError:  # cədvəl yoxdur - boş baza
+        conn.rollback()
+        return 0
+
+
+def _pg_limits(conn: Connection, local: bool = False) -> None:
+    # DDL cədvəl kilidini uzun gözləyib bütün sorğuları arxasında saxlamasın (lock_timeout);
+    # DB_STATEMENT_TIMEOUT_MS isə böyük cədvəldə index qurulmasını kəsməsin
+    scope = "LOCAL " if local else ""
+    conn.execute(text(f"SET {scope}lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}"))
+    conn.execute(text(f"SET {scope}statement_timeout = 0"))
+
+
+def _pg_stamp(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_version (version, applied_at) VALUES (:v, :at) ON CONFLICT (version) DO NOTHING"),
+        {"v": migration.version, "at": datetime.now()},
+    )
+
+
+def migrate_postgres(engine: Engine) -> int:
+    """Gözləyən miqrasiyaları tətbiq et və cari versiyanı qaytar"""
+    with engine.connect() as conn:
+        current = pg_current_version(conn)
+    if not _pending(current):
+        return current
+
+    from database import SchemaVersion
+
+    # Advisory lock session səviyyəlidir - bütün proses boyu eyni connection saxlanılır
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _PG_LOCK_ID})
+        try:
+            SchemaVersion.__table__.create(lock_conn, checkfirst=True)
+            # Lock-u gözləyərkən başqa replika tətbiq etmiş ola bilər
+            current = pg_current_version(lock_conn)
+            _pg_limits(lock_conn)
+            for migration in _pending(current):
+                logger.info(f"🔧 Miqrasiya {migration.label} tətbiq olunur…")
+                try:
+                    module = migration.load()
+                    upgrade = getattr(module, "upgrade_postgres", None)
+                    if getattr(module, "TRANSACTIONAL", True):
+                        with engine.begin() as tx:
+                            _pg_limits(tx, local=True)
+                            if upgrade is not None:
+                                upgrade(tx)
+                            _pg_stamp(tx, migration)
+                    else:
+                        if upgrade is not None:
+                            upgrade(lock_conn)
+                        _pg_stamp(lock_conn, migration)
+                except Exception as e:
+                    raise MigrationError(migration, current, e) from e
+                current = migration.version
+                logger.info(f"✅ Miqrasiya {migration.label} tətbiq olundu")
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _PG_LOCK_ID})
+            # Connection pool-a qayıdır - session ayarları növbəti istifadəçiyə keçməsin
+            lock_conn.execute(text("RESET lock_timeout"))
+            lock_conn.execute(text("RESET statement_timeout"))
+    return current
+
+
+# ================== SQLite ==================
+
+def sqlite_current_version(conn: sqlite3.Connection) -> int:
+    try:
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+    except sqlite3.OperationalError:  # cədvəl yoxdur - boş baza
+        return 0
+
+
+def migrate_sqlite(conn: sqlite3.Connection) -> int:
+    """Gözləyən miqrasiyaları tətbiq et (hər biri öz tranzaksiyasında) və cari versiyanı qaytar"""
+    current = sqlite_current_version(conn)
+    pending = _pending(current)
+    if not pending:
+        return current
+    conn.execute(_SQLITE_TABLE)
+    conn.commit()
+    for migration in pending:
+        logger.info(f"🔧 Miqrasiya {migration.label} tətbiq olunur…")
+        try:
+            module = migration.load()
+            upgrade = getattr(module, "upgrade_sqlite", None)
+            # sqlite3 DDL-dən əvvəl tranzaksiya açmır - açıq BEGIN ilə bütöv geri qaytarılır
+            conn.execute("BEGIN")
+            if upgrade is not None:
+                upgrade(conn)
+            conn.execute(
+                "INSERT OR IGNORE INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (migration.version, datetime.now().isoformat()),
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise MigrationError(migration, current, e) from e
+        current = migration.version
+        logger.info(f"✅ Miqrasiya {migration.label} tətbiq olundu")
+    return current
+
+
+# ================== CLI ==================
+
+def _main(argv: list[str]) -> int:
+    use_sqlite = "--sqlite" in argv
+    try:
+        if use_sqlite:
+            import db_sqlite
+            os.makedirs(os.path.dirname(db_sqlite.SQLITE_DB_PATH), exist_ok=True)
+            with db_sqlite.get_sqlite_connection() as conn:
+                current = sqlite_current_version(conn) if "--status" in argv else migrate_sqlite(conn)
+        else:
+            from db_operations import engine
+            if "--status" in argv:
+                with engine.connect() as conn:
+                    current = pg_current_version(conn)
+            else:
+                current = migrate_postgres(engine)
+    except MigrationError as e:
+        logger.error(f"❌ {e}")
+        return 1
+    for migration in discover():
+        print(f"{'✅' if migration.version <= current else '⏳'} {migration.label}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    from config import setup_logging
+    setup_logging()
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,370 @@
+"""
+Söhbət vəziyyətinin diskdə saxlanılması - PTB persistence (SQLite)
+
+Restart / redeploy zamanı yarımçıq anketlər (`user_data`) və ConversationHandler
+vəziyyətləri itməsin deyə PTB-yə kiçik SQLite faylı verilir. Pickle əvəzinə
+kompakt JSON yazılır (dataclass, Enum və datetime `register_types` ilə tanıdılır).
+
+PTB dəyişiklikləri hər `update_interval` saniyədən bir toplu ötürür; burada onlar
+yaddaşda yığılıb bir tranzaksiya ilə (ayrıca thread-də) yazılır - mesajın emalına
+heç bir disk gecikməsi əlavə olunmur. Bot dayananda PTB `flush()` çağırır.
+
+Railway-də fayl yalnız volume-da (məs. `/app/data`) redeploy-dan sağ çıxır.
+
+Bir neçə worker (SHARED_STATE) işləyəndə fayl əvəzinə `SharedPersistence` istifadə
+olunur: vəziyyət worker-lərin ümumi store-unda saxlanılır və hər update-də oxunur.
+"""
+import abc
+import asyncio
+import dataclasses
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from telegram.ext import BasePersistence, ConversationHandler, PersistenceInput
+
+from config import logger
+
+# Toplu yazmadan əvvəl gözləmə - eyni `update_persistence` çağırışının bütün dəyişiklikləri yığılsın
+FLUSH_DELAY_SECONDS = 0.5
+
+_TYPES: dict[str, type] = {}
+
+
+def register_types(*classes: type) -> None:
+    """Persistence-də saxlanılan dataclass / Enum tiplərini tanıt (ada görə bərpa olunur)"""
+    for cls in classes:
+        _TYPES[cls.__name__] = cls
+
+
+def _pack(obj: Any) -> Any:
+    # Enum yoxlaması str/int-dən əvvəl gəlir: FormType(str, Enum) adi sətrə çevrilməsin
+    if isinstance(obj, Enum):
+        return {"$e": [type(obj).__name__, obj.name]}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, datetime):
+        return {"$t": obj.isoformat()}
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        packed = {"$d": type(obj).__name__}
+        for f in dataclasses.fields(obj):
+            value = getattr(obj, f.name)
+            if value is not None:  # default None - yazılmır
+                packed[f.name] = _pack(value)
+        return packed
+    if isinstance(obj, dict):
+        return {str(k): _pack(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [_pack(v) for v in obj]
+    raise TypeError(f"Persistence: {type(obj).__name__} saxlanıla bilmir")
+
+
+def _unpack(obj: Any) -> Any:
+    if isinstance(obj, list):
+        return [_unpack(v) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "$e" in obj:
+        name, member = obj["$e"]
+        return _TYPES[name][member]
+    if "$t" in obj:
+        return datetime.fromisoformat(obj["$t"])
+    if "$d" in obj:
+        cls = _TYPES[obj["$d"]]
+        return cls(**{k: _unpack(v) for k, v in obj.items() if k != "$d"})
+    return {k: _unpack(v) for k, v in obj.items()}
+
+
+def dumps(obj: Any) -> str:
+    return json.dumps(_pack(obj), ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(raw: str) -> Any:
+    return _unpack(json.loads(raw))
+
+
+class _BufferedPersistence(BasePersistence):
+    """Dəyişiklikləri yaddaşda yığıb bir dəfəyə yazan əsas sinif (yalnız `user_data` və söhbətlər)
+
+    Alt siniflər `_store` (toplu yazma) və oxuma metodlarını verir.
+    """
+
+    def __init__(self, update_interval: float) -> None:
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self._pending_users: dict[int, Optional[str]] = {}  # None - silinəcək
+        self._pending_convs: dict[tuple[str, str], Optional[str]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    @abc.abstractmethod
+    async def _store(self, users: dict[int, Optional[str]], convs: dict[tuple[str, str], Optional[str]]) -> None:
+        """Yığılmış dəyişiklikləri bir əməliyyatla yaz (None - sil)"""
+
+    # ---------- toplu yazma ----------
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(FLUSH_DELAY_SECONDS)
+        try:
+            await self.write_pending()
+        except Exception as e:
+            # Buferdəki dəyişikliklər itmir - növbəti cəhddə yenidən yazılır
+            logger.error(f"❌ Persistence yazılmadı: {e}")
+
+    async def write_pending(self) -> None:
+        """Buferdəki dəyişiklikləri indi yaz"""
+        async with self._write_lock:
+            if not self._pending_users and not self._pending_convs:
+                return
+            users, self._pending_users = self._pending_users, {}
+            convs, self._pending_convs = self._pending_convs, {}
+            try:
+                await self._store(users, convs)
+            except Exception:
+                # Yazılmayanları geri qaytar (yeni dəyişikliklər üstün tutulur)
+                self._pending_users = {**users, **self._pending_users}
+                self._pending_convs = {**convs, **self._pending_convs}
+                raise
+
+    # ---------- BasePersistence ----------
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> None:
+        self._pending_convs[(name, json.dumps(list(key)))] = None if new_state is None else dumps(new_state)
+        self._schedule_flush()
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._pending_users[user_id] = dumps(data) if data else None
+        self._schedule_flush()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending_users[user_id] = None
+        self._schedule_flush()
+
+    async def flush(self) -> None:
+        """Bot dayananda: gözləyən bütün dəyişiklikləri yaz"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self.write_pending()
+
+    # bot_data / chat_data / callback_data saxlanılmır
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+
+class SqlitePersistence(_BufferedPersistence):
+    """`user_data` və ConversationHandler vəziyyətləri SQLite-da (bot_data / chat_data saxlanılmır)"""
+
+    def __init__(self, path: str, update_interval: float = 10, max_age_seconds: Optional[float] = None) -> None:
+        super().__init__(update_interval=update_interval)
+        self.path = path
+        # Bu müddətdən köhnə sətirlər (tərk edilmiş söhbətlər) yüklənmir
+        self.max_age_seconds = max_age_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    # ---------- SQLite ----------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_data ("
+                "user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, updated_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "name TEXT NOT NULL, key TEXT NOT NULL, state TEXT NOT NULL, updated_at INTEGER NOT NULL, "
+                "PRIMARY KEY (name, key)) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self, sql: str, params: tuple) -> list[tuple]:
+        with self._conn_lock:
+            conn = self._connection()
+            if self.max_age_seconds:
+                # Köhnə sətirlər həm də fayldan silinir
+                cutoff = int(time.time() - self.max_age_seconds)
+                conn.execute("DELETE FROM user_data WHERE updated_at < ?", (cutoff,))
+                conn.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,))
+                conn.commit()
+            return conn.execute(sql, params).fetchall()
+
+    def _write(self, users: dict[int, Optional[str]], convs: dict[tuple[str, str], Optional[str]]) -> None:
+        now = int(time.time())
+        with self._conn_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?)",
+                    [(uid, data, now) for uid, data in users.items() if data is not None],
+                )
+                conn.executemany(
+                    "DELETE FROM user_data WHERE user_id = ?", [(uid,) for uid, data in users.items() if data is None]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO conversations (name, key, state, updated_at) VALUES (?, ?, ?, ?)",
+                    [(name, key, state, now) for (name, key), state in convs.items() if state is not None],
+                )
+                conn.executemany(
+                    "DELETE FROM conversations WHERE name = ? AND key = ?",
+                    [(name, key) for (name, key), state in convs.items() if state is None],
+                )
+
+    async def _store(self, users: dict[int, Optional[str]], convs: dict[tuple[str, str], Optional[str]]) -> None:
+        await asyncio.to_thread(self._write, users, convs)
+
+    # ---------- BasePersistence ----------
+    async def get_user_data(self) -> dict[int, dict]:
+        rows = await asyncio.to_thread(self._load, "SELECT user_id, data FROM user_data", ())
+        result = {}
+        for user_id, raw in rows:
+            try:
+                result[user_id] = loads(raw)
+            except Exception as e:
+                logger.warning(f"Persistence: user {user_id} məlumatı oxunmadı: {e}")
+        return result
+
+    async def get_conversations(self, name: str) -> dict:
+        rows = await asyncio.to_thread(self._load, "SELECT key, state FROM conversations WHERE name = ?", (name,))
+        result = {}
+        for key, raw in rows:
+            try:
+                result[tuple(json.loads(key))] = loads(raw)
+            except Exception as e:
+                logger.warning(f"Persistence: {name} söhbəti {key} oxunmadı: {e}")
+        return result
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass  # Yeganə yazan bu prosesdir
+
+    async def flush(self) -> None:
+        """Bot dayananda: gözləyən bütün dəyişiklikləri yaz və faylı bağla"""
+        await super().flush()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SharedPersistence(_BufferedPersistence):
+    """Scale-out: `user_data` və söhbət vəziyyətləri worker-lərin ümumi store-unda (bax: shared_state.py)
+
+    Startup-da heç nə yüklənmir. Hər update-dən əvvəl həmin istifadəçinin vəziyyəti
+    bir sorğu ilə oxunur (`load`), update-dən sonra dərhal yazılır (bax: bot.shared_state_flush),
+    ona görə istifadəçinin növbəti mesajı istənilən worker-ə düşə bilər.
+    """
+
+    def __init__(self, state, ttl_seconds: Optional[float] = None, update_interval: float = 10) -> None:
+        super().__init__(update_interval=update_interval)
+        self.state = state
+        # Tərk edilmiş söhbətlər store-dan özü silinir
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"ud:{user_id}"
+
+    @staticmethod
+    def _conv_key(name: str, key: str) -> str:
+        return f"conv:{name}:{key}"
+
+    async def _store(self, users: dict[int, Optional[str]], convs: dict[tuple[str, str], Optional[str]]) -> None:
+        items = {self._user_key(uid): data for uid, data in users.items()}
+        items.update({self._conv_key(name, key): state for (name, key), state in convs.items()})
+        await self.state.set_many(items, ttl_seconds=self.ttl_seconds)
+
+    async def load(
+        self, user_id: int, user_data: dict, conversations: list[tuple[str, tuple]]
+    ) -> dict[tuple[str, tuple], Optional[object]]:
+        """İstifadəçinin `user_data`-sını yerində yenilə və söhbət vəziyyətlərini qaytar
+
+        Store-da olmayan söhbət None-dur; hələ yazılmamış yerli dəyişikliklər toxunulmur.
+        """
+        conv_keys = {
+            (name, key): json.dumps(list(key))
+            for name, key in conversations
+            if (name, json.dumps(list(key))) not in self._pending_convs
+        }
+        raw = await self.state.get_many(
+            [self._user_key(user_id), *(self._conv_key(name, k) for (name, _), k in conv_keys.items())]
+        )
+        if user_id not in self._pending_users:  # yazılmamış yerli dəyişiklik üstündür
+            data = raw.get(self._user_key(user_id))
+            user_data.clear()
+            if data:
+                try:
+                    user_data.update(loads(data))
+                except Exception as e:
+                    logger.warning(f"Persistence: user {user_id} məlumatı oxunmadı: {e}")
+        states: dict[tuple[str, tuple], Optional[object]] = {}
+        for (name, key), json_key in conv_keys.items():
+            data = raw.get(self._conv_key(name, json_key))
+            try:
+                states[(name, key)] = loads(data) if data else None
+            except Exception as e:
+                logger.warning(f"Persistence: {name} söhbəti {json_key} oxunmadı: {e}")
+        return states
+
+    async def get_user_data(self) -> dict[int, dict]:
+        return {}
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass  # `load` söhbət vəziyyətləri ilə birlikdə bir sorğuda oxuyur
+
+    async def drop_user_data(self, user_id: int) -> None:
+        # Yerli keşdən silinmə (bot._expire_session) store-a ötürülmür: istifadəçi başqa
+        # worker-də aktiv ola bilər, köhnə vəziyyəti store TTL ilə özü silir
+        pass
+
+
+def set_conversation_state(handler: ConversationHandler, key: tuple, state: Optional[object]) -> None:
+    """Store-dan oxunmuş vəziyyəti ConversationHandler-ə yaz (PTB-də bunun üçün açıq API yoxdur)
+
+    Yazılış izlənmir - eyni dəyər yenidən store-a göndərilməsin.
+    """
+    conversations = handler._conversations  # noqa: SLF001 - persistent handler-də TrackingDict
+    if state is None or state == ConversationHandler.END:
+        conversations.data.pop(key, None)  # UserDict.data - silinmə də izlənmir
+    else:
+        conversations.update_no_track({key: state})
@@ -0,0 +1,145 @@
+"""
+Handler başına SQL sorğu büdcəsi - gizli əlavə round trip-lərin qarşısını almaq üçün
+
+`QUERY_BUDGET=warn|strict` olanda `build_app` hər handler callback-ini sayğacla əhatə
+edir: handler icra olunarkən göndərilən SQL ifadələri (SQLAlchemy `before_cursor_execute`
+- asyncpg və aiosqlite; `db_sqlite`-ın sqlite3 connection-ları üçün trace callback)
+sayılır və `BUDGETS`-dəki limitlə müqayisə olunur. `warn` - loq + metrik, `strict` -
+`QueryBudgetExceeded` (PTB error handler-ə düşür). Default söndürülüb, production-da
+heç bir əlavə iş yoxdur.
+
+Yoxlama: `python -m pytest tests/test_query_budget.py` əsas axınları `strict` rejimdə
+işə salır - büdcə aşılanda test düşür.
+"""
+import asyncio
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from telegram.ext import Application
+
+import metrics
+from config import logger
+
+# Handler -> backend üzrə maksimal SQL ifadəsi (BEGIN/COMMIT sayılmır).
+# Qara siyahı və müraciət limiti yaddaşdan oxunur; icraçı axınında müraciət
+# AppealCache-dən gəlir. Büdcələr SHARED_STATE söndürülmüş rejim üçündür.
+BUDGETS: dict[str, dict[str, int]] = {
+    # Deep link (reply_<id> / edit_<id>) keşdə olmayan müraciəti bir dəfə oxuyur
+    "start": {"postgres": 1, "sqlite": 1},
+    # INSERT ... RETURNING + stats sayğacları + outbox
+    "confirm_or_edit": {"postgres": 3, "sqlite": 3},
+    # Qrup düyməsi: keşdə olmayan müraciət bir dəfə oxunur
+    "exec_reply_entry": {"postgres": 1, "sqlite": 1},
+    "exec_reject_entry": {"postgres": 1, "sqlite": 1},
+    "exec_edit_entry": {"postgres": 1, "sqlite": 1},
+    # UPDATE ... RETURNING + sayğaclar (+ bağlanmış günün silinməsi); SQLite köhnə statusu ayrıca oxuyur
+    "exec_collect_reply_text": {"postgres": 3, "sqlite": 4},
+    # Status dəyişmir - sayğaclar yazılmır
+    "exec_collect_edit_reply_text": {"postgres": 1, "sqlite": 2},
+    # + imtinaların sayı və avtomatik qara siyahı
+    "exec_collect_reject_reason": {"postgres": 5, "sqlite": 6},
+    # INSERT ... ON CONFLICT DO NOTHING / INSERT OR IGNORE
+    "ban_cmd": {"postgres": 1, "sqlite": 1},
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Handler büdcəsindən çox SQL ifadəsi göndərdi"""
+
+
+class _Tally:
+    __slots__ = ("count", "closed", "task")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.closed = False
+        self.task = asyncio.current_task()
+
+
+# Cari handler-in sayğacı. Handler-in yaratdığı fon task-ları (məs. icraçı bildirişi)
+# konteksti miras alır - onların sorğuları sayılmır, handler bitəndə sayğac bağlanır
+_current: ContextVar[Optional[_Tally]] = ContextVar("query_budget_tally", default=None)
+
+# Handler -> müşahidə olunan maksimum (test üçün)
+observed: dict[str, int] = {}
+violations: list[tuple[str, int, int]] = []
+_installed = False
+
+
+def _count(*_args) -> None:
+    tally = _current.get()
+    if tally is None or tally.closed:
+        return
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:  # sqlite3 trace callback-i thread-dən (asyncio.to_thread)
+        task = tally.task
+    if task is tally.task:
+        tally.count += 1
+
+
+def _count_sqlite(statement: str) -> None:
+    # sqlite3 modulunun özünün göndərdiyi tranzaksiya ifadələri SQLAlchemy-dəki kimi sayılmır
+    if not statement.lstrip().upper().startswith(("BEGIN", "COMMIT", "ROLLBACK")):
+        _count()
+
+
+def install() -> None:
+    """SQL sayğaclarını qoş (bir dəfə)"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _count)
+    import db_sqlite
+    db_sqlite.set_trace_callback(_count_sqlite)
+    _installed = True
+
+
+def _check(name: str, count: int, budget: Optional[int], strict: bool) -> None:
+    if count > observed.get(name, -1):
+        observed[name] = count
+    if budget is None or count <= budget:
+        return
+    violations.append((name, count, budget))
+    metrics.counter("query_budget_exceeded_total", "SQL büdcəsini aşan handler çağırışları", handler=name).inc()
+    message = f"🚨 SQL büdcəsi aşıldı: {name} - {count} ifadə (limit {budget})"
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _wrap(callback: Callable, name: str, budget: Optional[int], strict: bool) -> Callable:
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        tally = _Tally()
+        token = _current.set(tally)
+        try:
+            result = await callback(*args, **kwargs)
+        finally:
+            tally.closed = True
+            _current.reset(token)
+        _check(name, tally.count, budget, strict)
+        return result
+
+    return wrapper
+
+
+def wrap_handlers(app: Application, backend: str, strict: bool = False) -> int:
+    """Bütün handler callback-lərində SQL ifadələrini say (büdcəsi olmayanlar yalnız qeyd olunur)"""
+    from instrumentation import iter_handlers
+
+    install()
+    wrapped = 0
+    for group in app.handlers.values():
+        for handler in iter_handlers(group):
+            callback = handler.callback
+            if not inspect.iscoroutinefunction(callback):
+                continue
+            name = callback.__name__
+            handler.callback = _wrap(callback, name, BUDGETS.get(name, {}).get(backend), strict)
+            wrapped += 1
+    return wrapped
@@ -0,0 +1,99 @@
+"""
+Müraciət sayı limiti - istifadəçi başına yaddaşda sürüşən pəncərə (sliding window)
+
+`MAX_DAILY_SUBMISSIONS` / `MAX_MONTHLY_SUBMISSIONS` yoxlaması hər /start-da
+`COUNT(*)` sorğusu etmədən aparılır. Pəncərələr startup-da DB-dən doldurulur
+və hər uğurlu `save_application`-dan sonra yenilənir.
+"""
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+
+def _epoch(dt: datetime) -> float:
+    # PostgreSQL-dəki naive dəyərlər UTC-dir (bax: _fmt_created)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class SubmissionRateLimiter:
+    """Hər istifadəçi üçün son müraciət vaxtlarının növbəsi (deque).
+
+    `limits` - (pəncərə, maksimum say) cütləri; ən uzun pəncərədən artıq köhnə
+    vaxtlar yoxlama zamanı atılır, ona görə yaddaş aktiv istifadəçilərlə məhduddur.
+    """
+
+    def __init__(self, limits: Iterable[tuple[timedelta, int]]) -> None:
+        # Uzun pəncərə əvvəl yoxlanılır: aylıq limit dolubsa, gündəlik gözləmək kömək etmir
+        self.limits = sorted(
+            ((w.total_seconds(), n) for w, n in limits), key=lambda item: item[0], reverse=True
+        )
+        self.horizon = self.limits[0][0] if self.limits else 0.0
+        self._events: dict[int, deque[float]] = {}
+        self.seeded = False  # startup-da DB-dən doldurulubmu
+
+    def _window(self, user_telegram_id: int, now: float) -> Optional[deque[float]]:
+        events = self._events.get(user_telegram_id)
+        if events is None:
+            return None
+        cutoff = now - self.horizon
+        while events and events[0] <= cutoff:
+            events.popleft()
+        if not events:
+            del self._events[user_telegram_id]
+            return None
+        return events
+
+    def seed(self, submissions: Iterable[tuple[int, datetime]]) -> int:
+        """DB-dəki son müraciətlərlə pəncərələri doldur"""
+        self._events.clear()
+        count = 0
+        for uid, created_at in sorted(
+            ((int(u), _epoch(c)) for u, c in submissions if c is not None), key=lambda item: item[1]
+        ):
+            self._events.setdefault(uid, deque()).append(created_at)
+            count += 1
+        self.seeded = True
+        return count
+
+    def replace_user(self, user_telegram_id: int, submissions: Iterable[datetime]) -> None:
+        """Bir istifadəçinin pəncərəsini verilən vaxtlarla əvəz et"""
+        events = deque(sorted(_epoch(c) for c in submissions))
+        if events:
+            self._events[int(user_telegram_id)] = events
+        else:
+            self._events.pop(int(user_telegram_id), None)
+
+    def record(self, user_telegram_id: int, when: Optional[datetime] = None) -> None:
+        """Uğurla yazılmış müraciəti qeyd et"""
+        ts = _epoch(when) if when is not None else time.time()
+        self._events.setdefault(int(user_telegram_id), deque()).append(ts)
+
+    def check(self, user_telegram_id: int, now: Optional[float] = None) -> Optional[tuple[timedelta, int]]:
+        """Limit aşılıbsa (pəncərə, limit) qaytar, əks halda None"""
+        now = time.time() if now is None else now
+        events = self._window(user_telegram_id, now)
+        if not events:
+            return None
+        for window, limit in self.limits:
+            cutoff = now - window
+            # deque sıralıdır: sondan geri sayırıq, limitə çatan kimi dayanırıq
+            recent = 0
+            for ts in reversed(events):
+                if ts <= cutoff:
+                    break
+                recent += 1
+                if recent >= limit:
+                    return timedelta(seconds=window), limit
+        return None
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Pəncərədən tam çıxmış istifadəçiləri sil"""
+        now = time.time() if now is None else now
+        for uid in list(self._events):
+            self._window(uid, now)
+
+    def __len__(self) -> int:
+        return len(self._events)
@@ -0,0 +1,476 @@
+"""
+Müraciət repository-si - PostgreSQL və SQLite üçün vahid interfeys
+
+Backend `main()`-də bir dəfə seçilir (`create_repository`) və handler-lər yalnız
+`ApplicationRepository` protokolu ilə işləyir. Hər iki implementasiya eyni
+`ApplicationRecord` tipini qaytarır; keşləmə və ya batching kimi əlavələr bu
+qatda bir yerdə yaşayır.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Optional, Protocol
+
+import db_async
+from cache import AppealCache, BlacklistCache
+from config import (
+    APPEAL_CACHE_MAX,
+    APPEAL_CACHE_TTL_SECONDS,
+    MAX_DAILY_SUBMISSIONS,
+    MAX_MONTHLY_SUBMISSIONS,
+    logger,
+)
+from rate_limiter import SubmissionRateLimiter
+from database import ApplicationStatus, FormTypeDB
+
+
+@dataclass(frozen=True, slots=True)
+class ApplicationRecord:
+    """Backend-dən asılı olmayan müraciət sətri
+
+    Sahələrin sırası `db_async.APPLICATION_COLUMNS` ilə eynidir - DB sətri birbaşa
+    (`ApplicationRecord(*row)`) çevrilir, aralıq dict / ORM obyekti yaranmır.
+    """
+    id: int
+    user_telegram_id: int
+    user_username: Optional[str]
+    fullname: str
+    phone: str
+    fin: str
+    form_type: FormTypeDB
+    body: str
+    status: ApplicationStatus
+    notes: Optional[str]
+    reply_text: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    id_photo_file_id: Optional[str] = None  # Yalnız SQLite-da saxlanılır
+
+
+@dataclass(frozen=True, slots=True)
+class BlacklistEntry:
+    user_telegram_id: int
+    reason: Optional[str]
+    created_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class Watermark:
+    """Son export olunmuş sətrin nişanı: ondan sonrakı yeni/dəyişən sətirlər export olunur"""
+    last_id: int
+    last_updated_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxItem:
+    """Göndərilməli bildiriş (outbox sətri); `attempts` bu cəhd daxil"""
+    id: int
+    kind: str
+    application_id: Optional[int]
+    payload: dict[str, Any]
+    attempts: int
+    created_at: Optional[datetime] = None  # UTC
+
+
+class ApplicationRepository(Protocol):
+    name: str
+
+    async def save_application(
+        self,
+        *,
+        user_telegram_id: int,
+        user_username: str,
+        fullname: str,
+        phone: str,
+        fin: str,
+        id_photo_file_id: str,
+        form_type: str,
+        subject: str,
+        body: str,
+        created_at: datetime,
+        notification: Optional[dict] = None,
+    ) -> ApplicationRecord: ...
+
+    async def get_application_by_id(self, app_id: int) -> Optional[ApplicationRecord]: ...
+
+    async def update_application_status(
+        self,
+        app_id: int,
+        status: ApplicationStatus,
+        notes: Optional[str] = None,
+        reply_text: Optional[str] = None,
+    ) -> Optional[ApplicationRecord]: ...
+
+    async def is_user_blacklisted(self, user_telegram_id: int) -> bool: ...
+
+    async def add_user_to_blacklist(self, user_telegram_id: int, reason: Optional[str] = None) -> None: ...
+
+    async def remove_user_from_blacklist(self, user_telegram_id: int) -> None: ...
+
+    async def list_blacklisted_users(self, limit: int = 100) -> list[BlacklistEntry]: ...
+
+    async def list_blacklisted_user_ids(self) -> list[int]: ...
+
+    async def count_user_rejections(self, user_telegram_id: int, days: int = 30) -> int: ...
+
+    async def count_user_recent_applications(self, user_telegram_id: int, hours: int = 24) -> int: ...
+
+    async def list_recent_submissions(self, hours: int) -> list[tuple[int, datetime]]: ...
+
+    async def list_user_submissions(self, user_telegram_id: int, hours: int) -> list[datetime]: ...
+
+    async def get_overdue_applications(self, days: int = 3) -> list[ApplicationRecord]: ...
+
+    def iter_applications(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        since: Optional[Watermark] = None,
+    ) -> AsyncIterator[ApplicationRecord]: ...
+
+    async def get_export_watermark(self, destination: str) -> Optional[Watermark]: ...
+
+    async def set_export_watermark(self, destination: str, mark: Watermark) -> None: ...
+
+    async def get_stats_counters(self, exact: list[str], prefixes: list[str]) -> dict[str, int]: ...
+
+    async def backfill_stats(self) -> Optional[int]: ...
+
+    async def delete_all_applications(self) -> int: ...
+
+    async def claim_outbox(self, limit: int, lease_seconds: int) -> list[OutboxItem]: ...
+
+    async def mark_outbox_sent(self, outbox_id: int) -> None: ...
+
+    async def mark_outbox_failed(self, outbox_id: int, error: str, retry_at: Optional[datetime]) -> None: ...
+
+
+# ================== PostgreSQL ==================
+
+class PostgresApplicationRepository:
+    name = "postgres"
+
+    @staticmethod
+    def _record(row) -> ApplicationRecord:
+        # Sətir `APPLICATION_COLUMNS` sırasındadır, tiplər SQLAlchemy tərəfindən çevrilib
+        return ApplicationRecord(*row)
+
+    async def save_application(self, *, user_telegram_id, user_username, fullname, phone, fin,
+                               id_photo_file_id, form_type, subject, body, created_at,
+                               notification=None) -> ApplicationRecord:
+        # PostgreSQL-də foto və mövzu saxlanılmır (foto icraçı bildirişinin payload-ındadır)
+        row = await db_async.save_application(
+            user_telegram_id=user_telegram_id,
+            user_username=user_username,
+            fullname=fullname,
+            phone=phone,
+            fin=fin,
+            form_type=form_type,
+            body=body,
+            created_at=created_at,
+            notification=notification,
+        )
+        return self._record(row)
+
+    async def get_application_by_id(self, app_id: int) -> Optional[ApplicationRecord]:
+        row = await db_async.get_application_by_id(app_id)
+        return self._record(row) if row else None
+
+    async def update_application_status(self, app_id, status, notes=None, reply_text=None) -> Optional[ApplicationRecord]:
+        row = await db_async.update_application_status(app_id, status, notes=notes, reply_text=reply_text)
+        return self._record(row) if row else None
+
+    async def is_user_blacklisted(self, user_telegram_id: int) -> bool:
+        return await db_async.is_user_blacklisted(user_telegram_id)
+
+    async def add_user_to_blacklist(self, user_telegram_id: int, reason: Optional[str] = None) -> None:
+        await db_async.add_user_to_blacklist(user_telegram_id, reason)
+
+    async def remove_user_from_blacklist(self, user_telegram_id: int) -> None:
+        await db_async.remove_user_from_blacklist(user_telegram_id)
+
+    async def list_blacklisted_users(self, limit: int = 100) -> list[BlacklistEntry]:
+        rows = await db_async.list_blacklisted_users(limit)
+        return [BlacklistEntry(r.user_telegram_id, r.reason, r.created_at) for r in rows]
+
+    async def list_blacklisted_user_ids(self) -> list[int]:
+        return await db_async.list_blacklisted_user_ids()
+
+    async def count_user_rejections(self, user_telegram_id: int, days: int = 30) -> int:
+        return await db_async.count_user_rejections(user_telegram_id, days=days)
+
+    async def count_user_recent_applications(self, user_telegram_id: int, hours: int = 24) -> int:
+        return await db_async.count_user_recent_applications(user_telegram_id, hours=hours)
+
+    async def list_recent_submissions(self, hours: int) -> list[tuple[int, datetime]]:
+        return await db_async.list_recent_submissions(hours)
+
+    async def list_user_submissions(self, user_telegram_id: int, hours: int) -> list[datetime]:
+        return await db_async.list_user_submissions(user_telegram_id, hours)
+
+    async def get_overdue_applications(self, days: int = 3) -> list[ApplicationRecord]:
+        return [self._record(r) for r in await db_async.get_overdue_applications(days=days)]
+
+    async def iter_applications(self, start=None, end=None, since=None) -> AsyncIterator[ApplicationRecord]:
+        rows = db_async.stream_applications(
+            start, end,
+            since_id=since.last_id if since else None,
+            since_updated_at=since.last_updated_at if since else None,
+        )
+        async for row in rows:
+            yield self._record(row)
+
+    async def get_export_watermark(self, destination: str) -> Optional[Watermark]:
+        mark = await db_async.get_export_watermark(destination)
+        return Watermark(mark.last_id, mark.last_updated_at) if mark else None
+
+    async def set_export_watermark(self, destination: str, mark: Watermark) -> None:
+        await db_async.set_export_watermark(destination, mark.last_id, mark.last_updated_at)
+
+    async def get_stats_counters(self, exact: list[str], prefixes: list[str]) -> dict[str, int]:
+        return await db_async.get_stats_counters(exact, prefixes)
+
+    async def backfill_stats(self) -> Optional[int]:
+        return await db_async.backfill_stats()
+
+    async def delete_all_applications(self) -> int:
+        return await db_async.delete_all_applications()
+
+    async def claim_outbox(self, limit: int, lease_seconds: int) -> list[OutboxItem]:
+        return [OutboxItem(**row) for row in await db_async.claim_outbox(limit, lease_seconds)]
+
+    async def mark_outbox_sent(self, outbox_id: int) -> None:
+        await db_async.mark_outbox_sent(outbox_id)
+
+    async def mark_outbox_failed(self, outbox_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        await db_async.mark_outbox_failed(outbox_id, error, retry_at)
+
+
+# ================== SQLite fallback ==================
+
+# SQLite cədvəlində status kiçik hərfli sətir kimi saxlanılır
+_SQLITE_STATUS = {
+    ApplicationStatus.PENDING: "pending",
+    ApplicationStatus.PROCESSING: "processing",
+    ApplicationStatus.COMPLETED: "completed",
+    ApplicationStatus.REJECTED: "rejected",
+}
+_SQLITE_STATUS_REVERSE = {v: k for k, v in _SQLITE_STATUS.items()}
+
+
+_parse_sqlite_dt = db_async.parse_sqlite_dt
+
+
+class SqliteApplicationRepository:
+    name = "sqlite"
+
+    @staticmethod
+    def _record(row) -> ApplicationRecord:
+        # Sətir `SQLITE_APPLICATION_COLUMNS` sırasındadır; enum və tarixlər burada çevrilir
+        (app_id, user_telegram_id, user_username, fullname, phone, fin, form_type, body,
+         status, notes, reply_text, created_at, updated_at, id_photo_file_id) = row
+        return ApplicationRecord(
+            app_id,
+            user_telegram_id,
+            user_username,
+            fullname or "",
+            phone or "",
+            fin or "",
+            db_async.form_type_to_db(form_type),
+            body or "",
+            _SQLITE_STATUS_REVERSE.get(status or "", ApplicationStatus.PENDING),
+            notes,
+            reply_text,
+            _parse_sqlite_dt(created_at),
+            _parse_sqlite_dt(updated_at or created_at),
+            id_photo_file_id or None,
+        )
+
+    async def save_application(self, *, user_telegram_id, user_username, fullname, phone, fin,
+                               id_photo_file_id, form_type, subject, body, created_at,
+                               notification=None) -> ApplicationRecord:
+        row = await db_async.save_application_sqlite(
+            user_telegram_id=user_telegram_id,
+            user_username=user_username,
+            fullname=fullname,
+            phone=phone,
+            fin=fin,
+            id_photo_file_id=id_photo_file_id,
+            form_type=form_type,
+            subject=subject,
+            body=body,
+            created_at=created_at,
+            notification=notification,
+        )
+        return self._record(row)
+
+    async def get_application_by_id(self, app_id: int) -> Optional[ApplicationRecord]:
+        row = await db_async.get_application_by_id_sqlite(app_id)
+        return self._record(row) if row else None
+
+    async def update_application_status(self, app_id, status, notes=None, reply_text=None) -> Optional[ApplicationRecord]:
+        row = await db_async.update_application_status_sqlite(
+            app_id, _SQLITE_STATUS[status], notes=notes, reply_text=reply_text
+        )
+        return self._record(row) if row else None
+
+    async def is_user_blacklisted(self, user_telegram_id: int) -> bool:
+        return await db_async.is_user_blacklisted_sqlite(user_telegram_id)
+
+    async def add_user_to_blacklist(self, user_telegram_id: int, reason: Optional[str] = None) -> None:
+        await db_async.add_user_to_blacklist_sqlite(user_telegram_id, reason)
+
+    async def remove_user_from_blacklist(self, user_telegram_id: int) -> None:
+        await db_async.remove_user_from_blacklist_sqlite(user_telegram_id)
+
+    async def list_blacklisted_users(self, limit: int = 100) -> list[BlacklistEntry]:
+        rows = await db_async.list_blacklisted_users_sqlite(limit)
+        return [
+            BlacklistEntry(r["user_telegram_id"], r.get("reason"), _parse_sqlite_dt(r.get("created_at")))
+            for r in rows
+        ]
+
+    async def list_blacklisted_user_ids(self) -> list[int]:
+        return await db_async.list_blacklisted_user_ids_sqlite()
+
+    async def count_user_rejections(self, user_telegram_id: int, days: int = 30) -> int:
+        return await db_async.count_user_rejections_sqlite(user_telegram_id, days=days)
+
+    async def count_user_recent_applications(self, user_telegram_id: int, hours: int = 24) -> int:
+        return await db_async.count_user_recent_applications_sqlite(user_telegram_id, hours=hours)
+
+    async def list_recent_submissions(self, hours: int) -> list[tuple[int, datetime]]:
+        rows = await db_async.list_recent_submissions_sqlite(hours)
+        return [(uid, dt) for uid, dt in ((u, _parse_sqlite_dt(c)) for u, c in rows) if dt is not None]
+
+    async def list_user_submissions(self, user_telegram_id: int, hours: int) -> list[datetime]:
+        rows = await db_async.list_user_submissions_sqlite(user_telegram_id, hours)
+        return [dt for dt in map(_parse_sqlite_dt, rows) if dt is not None]
+
+    async def get_overdue_applications(self, days: int = 3) -> list[ApplicationRecord]:
+        return [self._record(r) for r in await db_async.get_overdue_applications_sqlite(days=days)]
+
+    async def iter_applications(self, start=None, end=None, since=None) -> AsyncIterator[ApplicationRecord]:
+        rows = db_async.stream_applications_sqlite(
+            start, end,
+            since_id=since.last_id if since else None,
+            since_updated_at=since.last_updated_at if since else None,
+        )
+        async for row in rows:
+            yield self._record(row)
+
+    async def get_export_watermark(self, destination: str) -> Optional[Watermark]:
+        row = await db_async.get_export_watermark_sqlite(destination)
+        return Watermark(row["last_id"], _parse_sqlite_dt(row["last_updated_at"])) if row else None
+
+    async def set_export_watermark(self, destination: str, mark: Watermark) -> None:
+        await db_async.set_export_watermark_sqlite(destination, mark.last_id, mark.last_updated_at)
+
+    async def get_stats_counters(self, exact: list[str], prefixes: list[str]) -> dict[str, int]:
+        return await db_async.get_stats_counters_sqlite(exact, prefixes)
+
+    async def backfill_stats(self) -> Optional[int]:
+        return await db_async.backfill_stats_sqlite()
+
+    async def delete_all_applications(self) -> int:
+        return await db_async.delete_all_applications_sqlite()
+
+    async def claim_outbox(self, limit: int, lease_seconds: int) -> list[OutboxItem]:
+        return [OutboxItem(**row) for row in await db_async.claim_outbox_sqlite(limit, lease_seconds)]
+
+    async def mark_outbox_sent(self, outbox_id: int) -> None:
+        await db_async.mark_outbox_sent_sqlite(outbox_id)
+
+    async def mark_outbox_failed(self, outbox_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        await db_async.mark_outbox_failed_sqlite(outbox_id, error, retry_at)
+
+
+# ================== Keşləyən qat ==================
+
+class CachedApplicationRepository:
+    """Backend repository-ni proses daxili keşlərlə əhatə edir.
+
+    Qara siyahı yoxlaması set-dən oxunur; əlavə/silmə əvvəlcə DB-yə yazılır,
+    sonra keş yerində yenilənir. Müraciət limiti pəncərələri hər uğurlu yazılışda
+    yenilənir. ID ilə oxunan müraciətlər qısa müddət keşdə qalır, status dəyişəndə
+    `RETURNING` sətri ilə əvəz olunur. Digər metodlar birbaşa backend-ə ötürülür.
+    """
+
+    def __init__(self, inner: ApplicationRepository) -> None:
+        self._inner = inner
+        self.blacklist = BlacklistCache()
+        self.rate_limiter = SubmissionRateLimiter([
+            (timedelta(hours=24), MAX_DAILY_SUBMISSIONS),
+            (timedelta(days=30), MAX_MONTHLY_SUBMISSIONS),
+        ])
+        self.appeals = AppealCache(APPEAL_CACHE_TTL_SECONDS, APPEAL_CACHE_MAX)
+
+    def __getattr__(self, item):
+        return getattr(self._inner, item)
+
+    async def refresh_blacklist(self) -> int:
+        """Qara siyahını DB-dən yenidən yüklə (startup və periodik job)"""
+        ids = await self._inner.list_blacklisted_user_ids()
+        self.blacklist.replace(ids)
+        logger.debug(f"Qara siyahı keşi yeniləndi: {len(ids)} istifadəçi")
+        return len(ids)
+
+    async def seed_rate_limiter(self) -> int:
+        """Son 30 günün müraciətləri ilə limit pəncərələrini doldur"""
+        hours = int(self.rate_limiter.horizon // 3600)
+        return self.rate_limiter.seed(await self._inner.list_recent_submissions(hours))
+
+    async def refresh_user_submissions(self, user_telegram_id: int) -> None:
+        """Bir istifadəçinin pəncərəsini DB-dən yenilə (scale-out: digər worker-lərin yazdıqları)"""
+        hours = int(self.rate_limiter.horizon // 3600)
+        self.rate_limiter.replace_user(
+            user_telegram_id, await self._inner.list_user_submissions(user_telegram_id, hours)
+        )
+
+    async def save_application(self, **kwargs) -> ApplicationRecord:
+        rec = await self._inner.save_application(**kwargs)
+        self.rate_limiter.record(rec.user_telegram_id, rec.created_at)
+        return rec
+
+    async def get_application_by_id(self, app_id: int) -> Optional[ApplicationRecord]:
+        rec = self.appeals.get(app_id)
+        if rec is None:
+            rec = await self._inner.get_application_by_id(app_id)
+            if rec is not None:
+                self.appeals.put(app_id, rec)
+        return rec
+
+    async def update_application_status(self, app_id, status, notes=None, reply_text=None) -> Optional[ApplicationRecord]:
+        # Yazı uğursuz olsa da köhnə record keşdə qalmasın
+        self.appeals.invalidate(app_id)
+        rec = await self._inner.update_application_status(app_id, status, notes=notes, reply_text=reply_text)
+        if rec is not None:
+            self.appeals.put(app_id, rec)
+        return rec
+
+    async def delete_all_applications(self) -> int:
+        try:
+            return await self._inner.delete_all_applications()
+        finally:
+            # ID sayğacı sıfırlanır - yeni müraciət köhnənin keşdəki record-unu almasın
+            self.appeals.clear()
+            # Limitlər əvvəl DB sayı idi və təmizləmə ilə sıfırlanırdı - pəncərələr də boşalsın
+            self.rate_limiter.seed(())
+
+    async def is_user_blacklisted(self, user_telegram_id: int) -> bool:
+        if self.blacklist.loaded:
+            return user_telegram_id in self.blacklist
+        return await self._inner.is_user_blacklisted(user_telegram_id)
+
+    async def add_user_to_blacklist(self, user_telegram_id: int, reason: Optional[str] = None) -> None:
+        await self._inner.add_user_to_blacklist(user_telegram_id, reason)
+        self.blacklist.add(user_telegram_id)
+
+    async def remove_user_from_blacklist(self, user_telegram_id: int) -> None:
+        await self._inner.remove_user_from_blacklist(user_telegram_id)
+        self.blacklist.discard(user_telegram_id)
+
+
+def create_repository(use_sqlite: bool) -> CachedApplicationRepository:
+    """Startup-da seçilmiş backend üçün (keşlənmiş) repository yarat"""
+    inner: ApplicationRepository = SqliteApplicationRepository() if use_sqlite else PostgresApplicationRepository()
+    return CachedApplicationRepository(inner)
@@ -0,0 +1,288 @@
+"""
+Çıxan mesaj növbəsi - Telegram flood limitlərinə uyğun göndərmə
+
+Handler-lər `context.bot.send_*` / `edit_*` əvəzinə `OutboundSender`-ə iş verir:
+- ümumi və hər çat üçün token bucket (şəxsi çat ~1 mesaj/s, qrup 20 mesaj/dəq);
+- bir çata gedən mesajların sırası saxlanılır, müxtəlif çatlar paralel göndərilir;
+- eyni mesajın hələ göndərilməmiş redaktələri birləşdirilir (sonuncu qalır);
+- `RetryAfter` gələndə həmin çat göstərilən müddət dayandırılır, timeout / şəbəkə
+  xətasında eksponensial backoff ilə təkrar cəhd edilir;
+- `ChatMigrated` gələndə mesaj yeni chat ID-yə göndərilir (`on_chat_migrated` çağırılır).
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from telegram.error import BadRequest, ChatMigrated, NetworkError, RetryAfter
+
+import metrics
+from config import logger
+
+# Bu metodların növbədəki (hələ göndərilməmiş) təkrarları birləşdirilir
+COALESCE_METHODS = frozenset({"edit_message_text", "edit_message_caption", "edit_message_reply_markup"})
+CHAT_BURST = 3
+GROUP_BURST = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+IDLE_CHATS_PRUNE_AT = 1000
+
+
+def _seconds(value) -> float:
+    # PTB 21-də int, 22-də timedelta
+    return value.total_seconds() if hasattr(value, "total_seconds") else float(value)
+
+
+class TokenBucket:
+    """`rate` token/s ilə dolan, ən çox `capacity` token saxlayan vedrə"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Növbəti token üçün gözləmə (saniyə)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class _Job:
+    method: str
+    kwargs: dict[str, Any]
+    futures: list[asyncio.Future]
+    enqueued: float
+    attempts: int = 0
+    coalesce_key: Optional[tuple] = None
+
+
+@dataclass
+class _Chat:
+    bucket: TokenBucket
+    jobs: list[_Job] = field(default_factory=list)
+    not_before: float = 0.0
+    # Növbədədir / gözləmədədir / worker-dədir - eyni çatı iki worker götürməsin (sıra qorunur)
+    scheduled: bool = False
+
+
+class OutboundSender:
+    """Bot API çağırışları üçün növbə + worker-lər (ilk `submit`-də işə düşür)"""
+
+    def __init__(
+        self,
+        bot,
+        *,
+        global_per_second: float,
+        chat_per_second: float,
+        group_per_minute: float,
+        max_retries: int,
+        workers: int,
+        on_chat_migrated: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        self.bot = bot
+        self.chat_per_second = chat_per_second
+        self.group_per_second = group_per_minute / 60.0
+        self.max_retries = max_retries
+        self.workers = workers
+        self.on_chat_migrated = on_chat_migrated
+        self._global = TokenBucket(global_per_second, global_per_second)
+        self._chats: dict[Any, _Chat] = {}
+        self._pending_edits: dict[tuple, _Job] = {}
+        self._pending = 0
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        metrics.gauge("outbound_queue_depth", "Göndərilməyi gözləyən çağırışlar").set_function(lambda: self._pending)
+        metrics.gauge("outbound_chats_waiting", "Növbəsində iş olan çatlar").set_function(
+            lambda: sum(1 for c in self._chats.values() if c.jobs)
+        )
+        self._wait = metrics.summary("outbound_queue_wait_seconds", "Növbədə gözləmə (ilk cəhdə qədər)")
+        self._coalesced = metrics.counter("outbound_coalesced_total", "Birləşdirilmiş redaktələr")
+
+    def __len__(self) -> int:
+        return self._pending
+
+    # ---------- API ----------
+    def submit(self, method: str, **kwargs) -> asyncio.Future:
+        """Çağırışı növbəyə qoy; nəticə (Message və s.) future-dən alınır. Xəta sender-də loqlanır."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve)
+        key = None
+        if method in COALESCE_METHODS:
+            key = (method, kwargs.get("chat_id"), kwargs.get("message_id"), kwargs.get("inline_message_id"))
+            job = self._pending_edits.get(key)
+            if job is not None:
+                job.kwargs = kwargs
+                job.futures.append(future)
+                self._coalesced.inc()
+                return future
+        job = _Job(method, kwargs, [future], time.monotonic(), coalesce_key=key)
+        if key is not None:
+            self._pending_edits[key] = job
+        self._enqueue(job)
+        return future
+
+    async def send(self, method: str, **kwargs):
+        """submit + nəticəni gözlə (xəta çağırana ötürülür)"""
+        return await self.submit(method, **kwargs)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Növbəni `timeout` saniyəyə qədər boşalt, sonra worker-ləri dayandır"""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._pending:
+            logger.warning(f"⚠️ Sender dayandırılır, {self._pending} mesaj göndərilmədi")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for chat in self._chats.values():
+            for job in chat.jobs:
+                _finish(job, error=RuntimeError("sender dayandırıldı"))
+        self._chats.clear()
+        self._pending_edits.clear()
+        self._pending = 0
+        self._ready = None
+
+    # ---------- daxili ----------
+    def _ensure_started(self) -> None:
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"outbound-{i}") for i in range(self.workers)]
+
+    def _enqueue(self, job: _Job) -> None:
+        chat_id = job.kwargs.get("chat_id")
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            group = isinstance(chat_id, int) and chat_id < 0
+            bucket = (
+                TokenBucket(self.group_per_second, GROUP_BURST) if group
+                else TokenBucket(self.chat_per_second, CHAT_BURST)
+            )
+            chat = self._chats[chat_id] = _Chat(bucket)
+        chat.jobs.append(job)
+        self._pending += 1
+        # Çat yalnız bir dəfə növbədə olur; işi bitən worker onu yenidən qoyur
+        if not chat.scheduled:
+            chat.scheduled = True
+            self._ready.put_nowait(chat_id)
+        if len(self._chats) > IDLE_CHATS_PRUNE_AT:
+            self._prune_idle()
+
+    def _prune_idle(self) -> None:
+        now = time.monotonic()
+        for chat_id in [k for k, c in self._chats.items() if not c.scheduled and c.bucket.full(now)]:
+            del self._chats[chat_id]
+
+    def _schedule(self, chat_id, delay: float) -> None:
+        ready = self._ready
+        asyncio.get_running_loop().call_later(delay, ready.put_nowait, chat_id)
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                continue
+            if not chat.jobs:
+                chat.scheduled = False
+                continue
+            now = time.monotonic()
+            delay = max(chat.not_before - now, chat.bucket.delay(now), self._global.delay(now))
+            if delay > 0:
+                self._schedule(chat_id, delay)
+                continue
+            chat.bucket.take(now)
+            self._global.take(now)
+            job = chat.jobs.pop(0)
+            if job.coalesce_key is not None and self._pending_edits.get(job.coalesce_key) is job:
+                # Göndərilməyə başladı - yeni redaktə artıq ayrıca iş olacaq
+                del self._pending_edits[job.coalesce_key]
+            if job.attempts == 0:
+                self._wait.observe(now - job.enqueued)
+            retry_in = await self._attempt(chat_id, chat, job)
+            if retry_in is not None:
+                chat.jobs.insert(0, job)
+                chat.not_before = time.monotonic() + retry_in
+                self._schedule(chat_id, retry_in)
+            elif chat.jobs:
+                self._ready.put_nowait(chat_id)
+            else:
+                chat.scheduled = False
+
+    async def _attempt(self, chat_id, chat: _Chat, job: _Job) -> Optional[float]:
+        """Çağırışı icra et; təkrar lazımdırsa gözləmə müddətini qaytar"""
+        try:
+            result = await getattr(self.bot, job.method)(**job.kwargs)
+        except RetryAfter as e:
+            reason, retry_in = "retry_after", _seconds(e.retry_after)
+        except ChatMigrated as e:
+            logger.warning(f"➡️ Çat {chat_id} supergroup-a köçüb: {e.new_chat_id}")
+            if self.on_chat_migrated:
+                self.on_chat_migrated(chat_id, e.new_chat_id)
+            # Bu və köhnə çata qalan bütün işlər (sıra ilə) yeni çatın növbəsinə keçir
+            moved = [job, *chat.jobs]
+            chat.jobs.clear()
+            for item in moved:
+                self._pending -= 1
+                item.kwargs = {**item.kwargs, "chat_id": e.new_chat_id}
+                self._enqueue(item)
+            return None
+        except BadRequest as e:
+            return self._complete(job, error=e)
+        except NetworkError as e:  # TimedOut daxil
+            reason = "network"
+            retry_in = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** job.attempts)
+            logger.warning(f"⚠️ {job.method} chat={chat_id}: {e} - {retry_in:.0f}s sonra təkrar")
+        except Exception as e:
+            return self._complete(job, error=e)
+        else:
+            return self._complete(job, result=result)
+        job.attempts += 1
+        metrics.counter("outbound_retries_total", "Təkrar cəhdlər", reason=reason).inc()
+        if job.attempts > self.max_retries:
+            return self._complete(job, error=RuntimeError(f"{job.attempts} cəhddən sonra göndərilmədi ({reason})"))
+        return retry_in
+
+    def _complete(self, job: _Job, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self._pending -= 1
+        if error is None:
+            metrics.counter("outbound_sent_total", "Göndərilmiş çağırışlar", method=job.method).inc()
+        else:
+            metrics.counter("outbound_failed_total", "Göndərilməyən çağırışlar", method=job.method).inc()
+            logger.error(f"❌ {job.method} chat={job.kwargs.get('chat_id')} göndərilmədi: {error}")
+        _finish(job, result, error)
+        return None
+
+
+def _finish(job: _Job, result: Any = None, error: Optional[BaseException] = None) -> None:
+    for future in job.futures:
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    # Gözlənilməyən (fire-and-forget) future-lərin xətası sender-də artıq loqlanıb
+    if not future.cancelled():
+        future.exception()
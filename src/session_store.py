@@ -0,0 +1,59 @@
+"""
+Söhbət vəziyyətinin ömrü - istifadəçi başına son aktivlik (TTL + LRU limit)
+
+PTB `user_data`-nı (yarımçıq anket, icraçının `exec_*` açarları) heç vaxt silmir:
+tərk edilmiş söhbətlər uzun işləyən prosesdə yığılır. `SessionStore` hər update-də
+istifadəçinin son aktivliyini yeniləyir; `ttl_seconds` ərzində aktiv olmayan və ya
+`max_entries` limitini aşanda ən köhnə istifadəçilər qaytarılır ki, onların
+`user_data`-sı silinsin (bax: bot._expire_session).
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import metrics
+
+
+class SessionStore:
+    """user_id -> son aktivlik (monotonic); sıra = LRU (əvvəldə ən köhnə)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[int, float]" = OrderedDict()
+        metrics.gauge("sessions_active", "Vəziyyəti saxlanılan istifadəçilər").set_function(lambda: len(self._seen))
+
+    def touch(self, user_id: int, now: Optional[float] = None) -> list[int]:
+        """Aktivliyi qeyd et; limit aşılıbsa çıxarılan (ən köhnə) istifadəçiləri qaytar"""
+        self._seen[user_id] = time.monotonic() if now is None else now
+        self._seen.move_to_end(user_id)
+        evicted = []
+        while len(self._seen) > self.max_entries:
+            evicted.append(self._seen.popitem(last=False)[0])
+        if evicted:
+            metrics.counter("sessions_expired_total", "Silinmiş söhbət vəziyyətləri", reason="lru").inc(len(evicted))
+        return evicted
+
+    def pop_expired(self, now: Optional[float] = None) -> list[int]:
+        """TTL-i keçmiş istifadəçiləri çıxar və qaytar"""
+        deadline = (time.monotonic() if now is None else now) - self.ttl
+        expired = []
+        # Sıra son aktivliyə görədir - ilk təzə sətirdə dayanmaq olar
+        while self._seen:
+            user_id, seen = next(iter(self._seen.items()))
+            if seen > deadline:
+                break
+            del self._seen[user_id]
+            expired.append(user_id)
+        if expired:
+            metrics.counter("sessions_expired_total", "Silinmiş söhbət vəziyyətləri", reason="ttl").inc(len(expired))
+        return expired
+
+    def discard(self, user_id: int) -> None:
+        self._seen.pop(user_id, None)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
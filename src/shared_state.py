@@ -0,0 +1,217 @@
+"""
+Bir neçə bot worker-inin ümumi vəziyyəti - scale-out rejimi (SHARED_STATE)
+
+Webhook bir ingress arxasında bir neçə worker-ə paylananda proses daxili vəziyyət
+worker-lər arasında bölüşdürülməlidir:
+- açar/dəyər (TTL ilə): söhbət vəziyyəti (persistence.SharedPersistence), runtime
+  konfiq (supergroup miqrasiyasından sonrakı icraçı chat ID-si), qara siyahı versiyası;
+- leader seçimi: yalnız bir worker-in işlətməli olduğu job-lar (SLA xatırlatması).
+
+PostgreSQL: `shared_state` cədvəli və session səviyyəli advisory lock - leader-in
+connection-u qopan kimi lock buraxılır. Redis (və uyğun store-lar): MGET / pipeline
+və `SET NX PX` leader açarı - müddətini store-un öz fon task-ı uzadır.
+"""
+import asyncio
+import hashlib
+import uuid
+from typing import Optional, Protocol
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+import db_async
+from config import logger
+
+# Runtime konfiq və sinxronizasiya açarları (müddətsiz)
+EXECUTOR_CHAT_KEY = "config:executor_chat_id"
+BLACKLIST_VERSION_KEY = "blacklist:version"
+
+
+class SharedState(Protocol):
+    name: str
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]: ...
+
+    async def set_many(self, items: dict[str, Optional[str]], ttl_seconds: Optional[float] = None) -> None: ...
+
+    async def try_lead(self, role: str, ttl_seconds: float) -> bool: ...
+
+    async def purge_expired(self) -> int: ...
+
+    async def close(self) -> None: ...
+
+
+# ================== PostgreSQL ==================
+
+def _lock_id(role: str) -> int:
+    """Rolun adından sabit int64 (pg_advisory_lock açarı)"""
+    digest = hashlib.blake2b(f"dsmf-bot:{role}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class PostgresSharedState:
+    """`shared_state` cədvəli + `pg_try_advisory_lock` (bax: db_async, Shared state bölməsi)"""
+    name = "postgres"
+
+    def __init__(self) -> None:
+        # Rol -> advisory lock-u saxlayan ayrıca connection (pool-a qaytarılmır)
+        self._leader_conns: dict[str, AsyncConnection] = {}
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        return await db_async.get_shared_state(keys)
+
+    async def set_many(self, items: dict[str, Optional[str]], ttl_seconds: Optional[float] = None) -> None:
+        if items:
+            await db_async.set_shared_state(items, ttl_seconds)
+
+    async def purge_expired(self) -> int:
+        return await db_async.purge_shared_state()
+
+    async def try_lead(self, role: str, ttl_seconds: float) -> bool:
+        """Lock bizdədirsə connection-un sağ olduğunu yoxla, deyilsə götürməyə cəhd et
+
+        `ttl_seconds` istifadə olunmur: lock connection qopanda PostgreSQL tərəfindən buraxılır.
+        """
+        conn = self._leader_conns.get(role)
+        if conn is not None:
+            try:
+                await conn.execute(text("SELECT 1"))
+                await conn.commit()
+                return True
+            except Exception as e:
+                logger.warning(f"⚠️ Leader connection-u ({role}) itdi: {e}")
+                del self._leader_conns[role]
+                await conn.invalidate()
+                return False
+        conn = await db_async.get_async_engine().connect()
+        try:
+            acquired = (
+                await conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _lock_id(role)})
+            ).scalar()
+            await conn.commit()  # lock session səviyyəlidir, tranzaksiya açıq qalmasın
+        except Exception:
+            await conn.invalidate()
+            raise
+        if acquired:
+            self._leader_conns[role] = conn
+            return True
+        await conn.close()
+        return False
+
+    async def close(self) -> None:
+        for role, conn in list(self._leader_conns.items()):
+            try:
+                await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _lock_id(role)})
+                await conn.commit()
+                await conn.close()
+            except Exception:
+                # Connection bağlananda lock onsuz da buraxılır
+                await conn.invalidate()
+        self._leader_conns.clear()
+
+
+# ================== Redis ==================
+
+# Açar hələ bu worker-indirsə müddətini uzat / sil
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSharedState:
+    """Redis-uyğun store (Redis, Valkey, KeyDB); TTL-i store özü idarə edir"""
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        try:
+            # Yalnız SHARED_STATE=redis üçün lazımdır; import-u startup-a yük olmasın
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE=redis üçün `redis` paketi quraşdırılmalıdır") from None
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._token = uuid.uuid4().hex  # bu worker-in leader nişanı
+        self._roles: set[str] = set()
+        # Rol -> leader açarının müddətini uzadan task (sinxronizasiya job-undan asılı deyil)
+        self._renewers: dict[str, asyncio.Task] = {}
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        if not keys:
+            return {}
+        values = await self._redis.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: dict[str, Optional[str]], ttl_seconds: Optional[float] = None) -> None:
+        if not items:
+            return
+        px = int(ttl_seconds * 1000) if ttl_seconds else None
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for key, value in items.items():
+                if value is None:
+                    pipe.delete(key)
+                else:
+                    pipe.set(key, value, px=px)
+            await pipe.execute()
+
+    async def try_lead(self, role: str, ttl_seconds: float) -> bool:
+        """Leader açarını götür və ya (artıq bizdədirsə) müddətini uzat"""
+        key, px = f"leader:{role}", int(ttl_seconds * 1000)
+        leader = bool(await self._redis.set(key, self._token, nx=True, px=px))
+        if not leader:
+            leader = bool(await self._redis.eval(_RENEW_SCRIPT, 1, key, self._token, px))
+        if leader:
+            self._roles.add(role)
+            renewer = self._renewers.get(role)
+            if renewer is None or renewer.done():
+                self._renewers[role] = asyncio.create_task(self._keep_lead(role, key, px), name=f"leader-lease:{role}")
+        else:
+            self._roles.discard(role)
+        return leader
+
+    async def _keep_lead(self, role: str, key: str, px: int) -> None:
+        """Leader açarının müddətini TTL-in üçdə birindən bir uzat; açar başqasına keçəndə dayan"""
+        while True:
+            await asyncio.sleep(px / 3000)
+            try:
+                renewed = await self._redis.eval(_RENEW_SCRIPT, 1, key, self._token, px)
+            except Exception as e:
+                # Növbəti cəhd TTL bitməmiş ola bilər; bitibsə, açar başqasına keçəcək
+                logger.warning(f"⚠️ Leader açarı ({role}) uzadılmadı: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"⚠️ Leader rolu ({role}) itdi")
+                self._roles.discard(role)
+                return
+
+    async def purge_expired(self) -> int:
+        return 0  # Redis müddəti bitmiş açarları özü silir
+
+    async def close(self) -> None:
+        for renewer in self._renewers.values():
+            renewer.cancel()
+        self._renewers.clear()
+        # Növbəti leader TTL-in bitməsini gözləməsin
+        for role in self._roles:
+            try:
+                await self._redis.eval(_RELEASE_SCRIPT, 1, f"leader:{role}", self._token)
+            except Exception:
+                pass
+        self._roles.clear()
+        await self._redis.aclose()
+
+
+def create_shared_state(backend: str, redis_url: str) -> SharedState:
+    """SHARED_STATE dəyərinə görə store yarat"""
+    if backend == "postgres":
+        return PostgresSharedState()
+    if backend == "redis":
+        return RedisSharedState(redis_url)
+    raise ValueError(f"SHARED_STATE={backend!r} dəstəklənmir (postgres | redis)")
@@ -0,0 +1,140 @@
+"""
+Statistika sayğacları - `/stats` üçün əvvəlcədən hesablanmış göstəricilər
+
+Sayğaclar `stats_counters(key, value)` cədvəlində saxlanılır və müraciət
+yazılanda / statusu dəyişəndə eyni tranzaksiyada artırılıb-azaldılır.
+`/stats` yalnız bu kiçik cədvəli oxuyur, `applications` cədvəlini heç vaxt
+skan etmir.
+
+Açarlar (status və növ enum adları ilə, backend-dən asılı deyil):
+- `total`, `status:<STATUS>`, `form:<FORM>`
+- `intake:<YYYY-MM-DD>` - həmin gün (Bakı vaxtı) daxil olan müraciətlər
+- `open:<YYYY-MM-DD>` - həmin gün yaranıb hələ açıq qalan müraciətlər (SLA üçün)
+- `tta:<i>` - cavab müddəti histoqramı (saat intervalları, bax `TTA_BUCKET_HOURS`)
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from config import BAKU_TZ
+
+# Açıq (cavab gözləyən) statuslar
+OPEN_STATUSES = frozenset({"PENDING", "PROCESSING"})
+
+# Cavab müddəti histoqramının yuxarı sərhədləri (saat); sonuncu bucket - daha uzun
+TTA_BUCKET_HOURS = (1, 2, 4, 8, 12, 24, 48, 72, 96, 120, 168, 240, 336, 720)
+
+# Bu açar olduqda köhnə məlumatlardan backfill artıq edilib
+BACKFILL_KEY = "meta:backfilled"
+
+
+def day_key(dt: datetime) -> str:
+    """Vaxtın Bakı tarixi (naive dəyərlər UTC sayılır)"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(BAKU_TZ).strftime("%Y-%m-%d")
+
+
+def tta_bucket(hours: float) -> int:
+    for i, bound in enumerate(TTA_BUCKET_HOURS):
+        if hours <= bound:
+            return i
+    return len(TTA_BUCKET_HOURS)
+
+
+def _elapsed_hours(start: datetime, end: datetime) -> float:
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return max(0.0, (end - start).total_seconds() / 3600)
+
+
+def on_created(form: str, created_at: datetime, status: str = "PENDING") -> dict[str, int]:
+    """Yeni müraciət üçün sayğac dəyişiklikləri"""
+    day = day_key(created_at)
+    deltas = {"total": 1, f"status:{status}": 1, f"form:{form}": 1, f"intake:{day}": 1}
+    if status in OPEN_STATUSES:
+        deltas[f"open:{day}"] = 1
+    return deltas
+
+
+def on_status_change(old: str, new: str, created_at: Optional[datetime], now: datetime) -> dict[str, int]:
+    """Status keçidi üçün sayğac dəyişiklikləri (eyni status - dəyişiklik yoxdur)"""
+    if old == new:
+        return {}
+    deltas = {f"status:{old}": -1, f"status:{new}": 1}
+    if created_at is None:
+        return deltas
+    was_open, is_open = old in OPEN_STATUSES, new in OPEN_STATUSES
+    day = day_key(created_at)
+    if was_open and not is_open:
+        deltas[f"open:{day}"] = -1
+        deltas[f"tta:{tta_bucket(_elapsed_hours(created_at, now))}"] = 1
+    elif is_open and not was_open:
+        deltas[f"open:{day}"] = 1
+    return deltas
+
+
+def merge(target: dict[str, int], deltas: dict[str, int]) -> dict[str, int]:
+    for key, value in deltas.items():
+        target[key] = target.get(key, 0) + value
+    return target
+
+
+def counter_keys(today: date, intake_days: int) -> tuple[list[str], list[str]]:
+    """`/stats` üçün oxunacaq açarlar: (dəqiq açarlar, prefikslər)"""
+    exact = ["total"]
+    exact += [f"tta:{i}" for i in range(len(TTA_BUCKET_HOURS) + 1)]
+    exact += [f"intake:{today - timedelta(days=i):%Y-%m-%d}" for i in range(intake_days)]
+    return exact, ["status:", "form:", "open:"]
+
+
+@dataclass
+class StatsSummary:
+    total: int
+    by_status: dict[str, int]
+    by_form: dict[str, int]
+    answered: int
+    median_hours: Optional[float]
+    p95_hours: Optional[float]
+    overdue: int
+    intake: list[tuple[str, int]] = field(default_factory=list)
+
+
+def _percentile_hours(buckets: list[int], q: float) -> Optional[float]:
+    """Histoqramdan percentile - bucket daxilində xətti interpolyasiya"""
+    total = sum(buckets)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    lower = 0.0
+    for i, count in enumerate(buckets):
+        if count and seen + count >= target:
+            if i >= len(TTA_BUCKET_HOURS):
+                return float(TTA_BUCKET_HOURS[-1])
+            upper = float(TTA_BUCKET_HOURS[i])
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+        lower = float(TTA_BUCKET_HOURS[i]) if i < len(TTA_BUCKET_HOURS) else lower
+    return float(TTA_BUCKET_HOURS[-1])
+
+
+def summarize(counters: dict[str, int], today: date, intake_days: int = 7, sla_days: int = 3) -> StatsSummary:
+    buckets = [max(0, counters.get(f"tta:{i}", 0)) for i in range(len(TTA_BUCKET_HOURS) + 1)]
+    cutoff = f"{today - timedelta(days=sla_days):%Y-%m-%d}"
+    overdue = sum(v for k, v in counters.items() if k.startswith("open:") and k[5:] <= cutoff and v > 0)
+    return StatsSummary(
+        total=counters.get("total", 0),
+        by_status={k[7:]: v for k, v in counters.items() if k.startswith("status:")},
+        by_form={k[5:]: v for k, v in counters.items() if k.startswith("form:")},
+        answered=sum(buckets),
+        median_hours=_percentile_hours(buckets, 0.5),
+        p95_hours=_percentile_hours(buckets, 0.95),
+        overdue=overdue,
+        intake=[
+            (f"{today - timedelta(days=i):%d.%m}", counters.get(f"intake:{today - timedelta(days=i):%Y-%m-%d}", 0))
+            for i in range(intake_days)
+        ],
+    )
@@ -0,0 +1,163 @@
+"""
+Webhook rejimi - aiohttp serveri (RUN_MODE=webhook)
+
+Telegram update-ləri `WEBHOOK_PATH`-a POST edir; `X-Telegram-Bot-Api-Secret-Token`
+başlığı yoxlanılır və update PTB-nin `update_queue`-suna qoyulur (cavab dərhal 200).
+Eyni server `/health` (Railway healthcheck) və `/metrics` (Prometheus text) verir.
+
+Redeploy zamanı köhnə instansiya webhook-u SİLMİR: yeni instansiya eyni URL-i
+yenidən qeyd edir, Telegram isə arada gələn update-ləri növbədə saxlayır. Polling-dəki
+kimi iki instansiya arasında `Conflict` yaranmır.
+
+Polling rejimində eyni `/metrics` ayrıca lokal serverdə verilir (`METRICS_PORT`,
+bax: start_metrics_server).
+
+Lokal test: WEBHOOK_URL boş olanda set_webhook çağırılmır, update-ləri əl ilə
+göndərmək olar (bax: benchmarks/webhook_replay.py).
+"""
+import asyncio
+import hashlib
+import hmac
+import signal
+import time
+from datetime import datetime, timezone
+
+try:
+    from aiohttp import web
+except ImportError:  # requirements.txt-də var; yoxdursa bot polling rejimində qalır
+    web = None
+
+from telegram import Update
+from telegram.ext import Application
+
+import metrics
+from config import (
+    BOT_TOKEN,
+    WEBHOOK_LISTEN,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    logger,
+)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Köhnə (replay / uzun fasilədən sonra gələn) update-lər gecikmə statistikasını pozmasın
+MAX_TRACKED_AGE_SECONDS = 3600
+
+
+def webhook_available() -> bool:
+    return web is not None
+
+
+def webhook_secret() -> str:
+    """WEBHOOK_SECRET və ya BOT_TOKEN-dən törədilmiş sabit dəyər (bütün instansiyalarda eyni)"""
+    if WEBHOOK_SECRET:
+        return WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{BOT_TOKEN}".encode()).hexdigest()
+
+
+async def metrics_route(request: "web.Request") -> "web.Response":
+    return web.Response(
+        body=metrics.render_prometheus().encode(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+def create_web_app(application: Application, secret: str, path: str = WEBHOOK_PATH) -> "web.Application":
+    """Webhook, /health və /metrics marşrutları olan aiohttp tətbiqi"""
+    started = time.monotonic()
+    received = metrics.counter("webhook_updates_total", "Qəbul edilən update-lər")
+    rejected = metrics.counter("webhook_rejected_total", "Secret token-i səhv olan sorğular")
+    invalid = metrics.counter("webhook_invalid_total", "Parse olunmayan sorğular")
+    delivery = metrics.summary("webhook_update_age_seconds", "Mesaj yaranandan serverə çatana qədər keçən vaxt")
+    metrics.gauge("ptb_update_queue_size", "PTB update növbəsinin uzunluğu").set_function(
+        lambda: application.update_queue.qsize()
+    )
+
+    async def telegram_webhook(request: "web.Request") -> "web.Response":
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            rejected.inc()
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except Exception as e:
+            invalid.inc()
+            logger.warning(f"Webhook: update parse olunmadı: {e}")
+            return web.Response(status=400)
+        received.inc()
+        message = update.effective_message if update else None
+        if message is not None and message.date:
+            age = (datetime.now(timezone.utc) - message.date).total_seconds()
+            if 0 <= age < MAX_TRACKED_AGE_SECONDS:
+                delivery.observe(age)
+        await application.update_queue.put(update)
+        return web.Response()
+
+    async def health(request: "web.Request") -> "web.Response":
+        return web.json_response(
+            {
+                "status": "ok" if application.running else "starting",
+                "uptime_seconds": round(time.monotonic() - started),
+                "update_queue": application.update_queue.qsize(),
+            },
+            status=200 if application.running else 503,
+        )
+
+    app = web.Application()
+    app.router.add_post(path, telegram_webhook)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics_route)
+    return app
+
+
+async def start_metrics_server(host: str, port: int) -> "web.AppRunner":
+    """Yalnız /metrics olan lokal server (polling rejimi); dayandırmaq: `await runner.cleanup()`"""
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_route)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"📊 Metrik serveri: http://{host}:{port}/metrics")
+    return runner
+
+
+async def run_webhook(application: Application) -> None:
+    """PTB tətbiqini webhook serveri ilə işə sal, SIGTERM/SIGINT gələnə qədər gözlə"""
+    secret = webhook_secret()
+    runner = web.AppRunner(create_web_app(application, secret), access_log=None)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    # run_polling-in etdiyi kimi: initialize -> post_init -> start ... stop -> shutdown -> post_shutdown
+    async with application:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await runner.setup()
+        await web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT).start()
+        logger.info(f"🌐 Webhook serveri: {WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH} (+ /health, /metrics)")
+        if WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=WEBHOOK_URL + WEBHOOK_PATH,
+                secret_token=secret,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+            )
+            logger.info(f"✅ Webhook qeyd edildi: {WEBHOOK_URL}{WEBHOOK_PATH}")
+        else:
+            logger.warning("⚠️ WEBHOOK_URL yoxdur - set_webhook çağırılmadı (lokal test rejimi)")
+        try:
+            await stop.wait()
+        finally:
+            logger.info("Webhook serveri dayandırılır...")
+            await runner.cleanup()
+            await application.stop()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
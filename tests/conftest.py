@@ -0,0 +1,24 @@
+"""
+Testlər üçün ümumi mühit: src (və src/benchmarks) path-də, müvəqqəti SQLite bazası və persistence faylı
+
+config.py import olunmamışdan əvvəl təyin olunmalıdır.
+"""
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# benchmarks/ - saxta Bot API və sintetik söhbətlər (load_test.py)
+for _path in (os.path.join(SRC_DIR, "benchmarks"), SRC_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+_TMP = tempfile.mkdtemp(prefix="dsmf-test-")
+os.environ.setdefault("BOT_TOKEN", "0:test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("FORCE_SQLITE", "1")
+os.environ.setdefault("EXECUTOR_CHAT_ID", "-100555000")
+os.environ.setdefault("SQLITE_DB_PATH", os.path.join(_TMP, "test.db"))
+os.environ.setdefault("PERSISTENCE_PATH", os.path.join(_TMP, "state.db"))
+# Telegram flood limitləri testdə gözləmə yaratmasın (saxta Bot API, bax: load_test.py)
+for _name in ("OUTBOUND_GLOBAL_PER_SECOND", "OUTBOUND_CHAT_PER_SECOND", "OUTBOUND_GROUP_PER_MINUTE"):
+    os.environ.setdefault(_name, "1000000")
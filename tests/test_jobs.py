@@ -0,0 +1,36 @@
+"""
+Periodik job-lar real `build_app()` + `schedule_jobs()` üzərində qurulurmu
+
+JobQueue olmasa `conversation_timeout` və TTL təmizliyi səssizcə işləmir -
+bu test `python-telegram-bot[job-queue]` asılılığını da yoxlayır.
+"""
+from telegram.ext import ConversationHandler
+
+import bot
+
+
+def _scheduled(app) -> set:
+    return {job.callback for job in app.job_queue.jobs()}
+
+
+def test_session_sweep_job_is_scheduled():
+    app = bot.build_app()
+    assert app.job_queue is not None
+    bot.schedule_jobs(app)
+    assert bot.session_sweep_job in _scheduled(app)
+
+
+def test_blacklist_refresh_job_is_scheduled():
+    # Kənardan (digər worker, birbaşa DB) edilən dəyişikliklər keşə yalnız bu job ilə çatır
+    assert bot.DB_ENABLED
+    app = bot.build_app()
+    bot.schedule_jobs(app)
+    assert bot.blacklist_refresh_job in _scheduled(app)
+
+
+def test_conversations_expire_by_ttl():
+    app = bot.build_app()
+    handlers = [h for h in app.handlers[0] if isinstance(h, ConversationHandler)]
+    assert handlers
+    for handler in handlers:
+        assert handler.conversation_timeout == bot.SESSION_TTL_SECONDS
@@ -0,0 +1,93 @@
+"""
+Handler-lərin SQL büdcəsi (query_budget.BUDGETS) - reqressiyada test düşür
+
+Real `build_app()` saxta Bot API ilə (bax: benchmarks/load_test.py), `wrap_handlers(strict=True)`
+ilə müvəqqəti SQLite bazasında əsas axınlar keçilir: vətəndaş anketi (/start → CONFIRM),
+icraçının cavabı, düzəlişi və imtinası, deep link (/start reply_<id>), /ban, /unban.
+"""
+import asyncio
+
+import pytest
+from telegram import Update
+
+import bot
+import db_async
+import query_budget
+from config import ADMIN_USER_IDS
+from db_sqlite import init_sqlite_db
+from load_test import (
+    CITIZEN_BASE,
+    EXECUTOR_BASE,
+    EXECUTOR_CHAT_ID,
+    _answer,
+    _callback,
+    _drain,
+    _fake_request_class,
+    _intake,
+    _message,
+    _pending_ids,
+)
+from repository import create_repository
+
+CITIZENS = 6
+BACKEND = "sqlite"
+
+
+async def _flows() -> None:
+    init_sqlite_db()
+    app = bot.build_app(request=_fake_request_class()(0))
+    app.bot_data["repo"] = create_repository(use_sqlite=True)
+    # strict: büdcəni aşan handler QueryBudgetExceeded atır (və violations-a düşür)
+    query_budget.wrap_handlers(app, BACKEND, strict=True)
+    admin = next(iter(ADMIN_USER_IDS))
+    executor = EXECUTOR_BASE
+
+    async def feed(updates: list[dict]) -> None:
+        for data in updates:
+            await app.process_update(Update.de_json(data, app.bot))
+
+    async with app:
+        await app.post_init(app)
+        # Keşlər fonda yüklənir; ölçmə isti vəziyyətdən başlasın
+        await app.bot_data["cache_warmup"]
+        await app.start()
+        for i in range(CITIZENS):
+            await feed(_intake(CITIZEN_BASE + i))
+        ids = await _pending_ids(app.bot_data["repo"], CITIZENS)
+        assert len(ids) == CITIZENS
+        for n, app_id in enumerate(ids):
+            if n % 3 == 2:
+                await feed(_answer(executor, app_id, reject=True))
+                continue
+            await feed(_answer(executor, app_id, reject=False))
+            # Keş soyuqdursa deep link müraciəti DB-dən oxuyur
+            app.bot_data["repo"].appeals.invalidate(app_id)
+            await feed([_message(executor, f"/start reply_{app_id}")])
+            caption = f"Sıra №: {app_id}\n🟢 Status: İcra edildi\n\n✉️ Cavab: ..."
+            await feed([_callback(executor, f"edit_reply:{app_id}", chat_id=EXECUTOR_CHAT_ID, caption=caption),
+                        _message(executor, "Düzəldilmiş cavab")])
+        await feed([_message(admin, f"/ban {CITIZEN_BASE + 10_000} yoxlama")])
+        await feed([_message(admin, f"/unban {CITIZEN_BASE + 10_000}")])
+        await _drain(app)
+        await app.stop()
+    await app.post_shutdown(app)
+    await db_async.dispose_async_engines()
+
+
+@pytest.fixture(scope="module")
+def observed() -> dict[str, int]:
+    query_budget.observed.clear()
+    query_budget.violations.clear()
+    asyncio.run(_flows())
+    return dict(query_budget.observed)
+
+
+def test_handlers_within_sql_budget(observed):
+    # PTB handler xətasını error handler-ə ötürür - pozuntular buradan yoxlanılır
+    assert query_budget.violations == []
+
+
+@pytest.mark.parametrize("handler", sorted(query_budget.BUDGETS))
+def test_budgeted_handler_is_exercised(observed, handler):
+    assert handler in observed, f"{handler} axınlarda işlənmədi - büdcə yoxlanılmır"
+    assert observed[handler] <= query_budget.BUDGETS[handler][BACKEND]
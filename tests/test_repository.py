@@ -0,0 +1,63 @@
+"""
+CachedApplicationRepository keşləri /clearall-dan sonra köhnə məlumat qaytarmamalıdır
+(müraciət keşi, müraciət limiti pəncərələri)
+
+`delete_all_applications` ID sayğacını sıfırlayır - yeni müraciət köhnənin ID-sini alır.
+"""
+import asyncio
+from datetime import datetime
+
+import db_async
+from config import BAKU_TZ, MAX_DAILY_SUBMISSIONS
+from db_sqlite import init_sqlite_db
+from repository import create_repository
+
+
+def _run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            # Async engine event loop-a bağlıdır - hər testdən sonra bağlanır
+            await db_async.dispose_async_engines()
+    return asyncio.run(main())
+
+
+def _application(user_telegram_id: int, fullname: str) -> dict:
+    return dict(
+        user_telegram_id=user_telegram_id, user_username="test", fullname=fullname,
+        phone="+994501234567", fin="ABC1234", id_photo_file_id="", form_type="Şikayət",
+        subject="test", body="test müraciəti", created_at=datetime.now(BAKU_TZ),
+    )
+
+
+def setup_module():
+    init_sqlite_db()
+
+
+def test_clearall_does_not_serve_cached_appeal_for_reused_id():
+    async def scenario():
+        repo = create_repository(use_sqlite=True)
+        await repo.delete_all_applications()
+        old = await repo.save_application(**_application(111, "Old Citizen"))
+        assert (await repo.get_application_by_id(old.id)).user_telegram_id == 111
+        await repo.delete_all_applications()
+        new = await repo.save_application(**_application(222, "New Citizen"))
+        assert new.id == old.id
+        rec = await repo.get_application_by_id(new.id)
+        assert (rec.user_telegram_id, rec.fullname) == (222, "New Citizen")
+
+    _run(scenario())
+
+
+def test_clearall_resets_submission_limits():
+    async def scenario():
+        repo = create_repository(use_sqlite=True)
+        await repo.delete_all_applications()
+        for _ in range(MAX_DAILY_SUBMISSIONS):
+            await repo.save_application(**_application(333, "Limit Citizen"))
+        assert repo.rate_limiter.check(333) is not None
+        await repo.delete_all_applications()
+        assert repo.rate_limiter.check(333) is None
+
+    _run(scenario())